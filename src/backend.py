@@ -0,0 +1,105 @@
+from typing import Union
+import numpy as np
+import os
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+BACKENDS = ('python', 'gmpy2')
+
+# Integers of at most NATIVE_BITS bits are stored as int64, so that the sum or product of two of them still fits.
+NATIVE_BITS = 31
+# Largest bit size of intermediate results of native arithmetic before they are reduced.
+NATIVE_INTERMEDIATE_BITS = 62
+
+
+def _default_backend() -> str:
+    """
+    :return: backend named by the HOMOMORPHIC_ENCRYPTION_BACKEND environment variable, otherwise gmpy2 if it is
+    importable, otherwise python.
+    """
+    name = os.environ.get('HOMOMORPHIC_ENCRYPTION_BACKEND')
+    if name is not None:
+        return name
+    return 'python' if gmpy2 is None else 'gmpy2'
+
+
+def get_backend() -> str:
+    """
+    :return: name of the backend big integers of keys and ciphertexts are stored in.
+    """
+    return _backend
+
+
+def set_backend(name: str) -> None:
+    """
+    Select the backend big integers of keys and ciphertexts are stored in. "python" stores Python ints, "gmpy2" stores
+    gmpy2.mpz, whose multiplication, addition and modular reduction are faster for large integers.
+    :param name: one of BACKENDS
+    """
+    global _backend, _to_integer
+    if name not in BACKENDS:
+        raise ValueError("unknown backend %r, expected one of %s" % (name, BACKENDS))
+    if name == 'gmpy2' and gmpy2 is None:
+        raise ImportError("the gmpy2 backend requires the gmpy2 package")
+    _backend = name
+    _to_integer = np.frompyfunc(gmpy2.mpz if name == 'gmpy2' else int, 1, 1)
+
+
+def dtype(num_bits: int,
+          intermediate_num_bits: int = 0):
+    """
+    Choose how to store integers of a given bit size.
+    :param num_bits: bit size of the stored integers
+    :param intermediate_num_bits: bit size of intermediate results computing them
+    :return: np.int64 if both fit native arithmetic, otherwise object, i.e. integers of the current backend
+    """
+    if num_bits <= NATIVE_BITS and intermediate_num_bits <= NATIVE_INTERMEDIATE_BITS:
+        return np.int64
+    return object
+
+
+def integer(value: int) -> int:
+    """
+    :param value: an integer
+    :return: "value" as an integer of the current backend
+    """
+    return _to_integer(value)
+
+
+def asarray(values) -> np.ndarray:
+    """
+    :param values: array of integers
+    :return: "values" if it is a native integer array, otherwise an object array of the same shape holding integers
+    of the current backend
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'iu':
+        return values
+    return np.asarray(_to_integer(np.asarray(values, dtype=object)), dtype=object)
+
+
+def subset_sum(selection: np.ndarray,
+               numbers: np.ndarray) -> Union[int, np.ndarray]:
+    """
+    Sum the subsets of "numbers" selected by each row of "selection", adding only selected numbers instead of
+    multiplying every number by 0 or 1.
+    :param selection: array of 0s and 1s of shape (..., len(numbers))
+    :param numbers: 1D array of integers
+    :return: array of shape selection.shape[:-1] of sums
+    """
+    numbers = asarray(numbers)
+    if numbers.dtype != object:
+        max_bits = int(np.max(np.abs(numbers), initial=0)).bit_length() + len(numbers).bit_length()
+        if max_bits <= NATIVE_INTERMEDIATE_BITS:
+            return np.asarray(selection, dtype=numbers.dtype) @ numbers
+        numbers = asarray(numbers.astype(object))
+
+    zero = integer(0)
+    masks = np.asarray(selection, dtype=bool)
+    sums = np.array([sum(numbers[mask], zero) for mask in masks.reshape(-1, len(numbers))], dtype=object)
+    return sums.reshape(masks.shape[:-1])
+
+
+set_backend(_default_backend())
@@ -0,0 +1,192 @@
+from typing import Tuple, Optional
+import math
+import numpy as np
+from src import randomness, backend, primes, reduction
+from src.somewhat_homomorphic_encryption import randint, noise, error_free_q0
+from src.homomorphic_encryption import RecryptEngine
+
+# Batched DGHV in the style of Cheon, Coron, Kim, Lee, Lepoint, Tibouchi and Yun: the private key is a list of
+# primes p_1, ..., p_l, x0 = q0 * p_1 * ... * p_l has no noise, and a ciphertext c encrypts the "slot"
+# bits m_j = (c mod p_j) mod 2 for every j. Adding and multiplying ciphertexts modulo x0 adds and multiplies the
+# slots independently, so a Ciphertext with modulus x0 evaluates circuits on all slots at once.
+
+
+def private_key(num_slots: int,
+                num_bits: int) -> np.ndarray:
+    """
+    :param num_slots: number of slots l
+    :param num_bits: bit size of every p_j
+    :return: 1D object array of "num_slots" distinct primes of "num_bits" bits
+    """
+    return np.array(primes.primes(num_bits, num_slots, independent=True), dtype=object)
+
+
+def crt(residues: np.ndarray,
+        moduli: list) -> np.ndarray:
+    """
+    :param residues: array of shape (..., len(moduli)) of residues modulo each of "moduli"
+    :param moduli: pairwise coprime integers
+    :return: array of shape residues.shape[:-1] of the integers from [0, product of moduli) with those residues
+    """
+    product = math.prod(int(m) for m in moduli)
+    basis = []
+    for m in moduli:
+        cofactor = product // int(m)
+        basis.append(cofactor * pow(cofactor, -1, int(m)))
+    return np.dot(np.asarray(residues, dtype=object), backend.asarray(np.array(basis, dtype=object))) % product
+
+
+def public_key(size: int,
+               int_size: int,
+               noise_size: int,
+               private_key: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    :param size: number of encryptions of zero
+    :param int_size: bit size of x0
+    :param noise_size: bit size of noise
+    :param private_key: p_1, ..., p_l
+    :return: 1D array of x0 followed by "size" encryptions of zero in every slot, x_i mod p_j = 2 * r_ij, and 1D array
+    of l encryptions of the unit vectors, x'_k mod p_j = 2 * r'_kj + (1 if j == k else 0)
+    """
+    num_slots = len(private_key)
+    product = math.prod(int(p) for p in private_key)
+    factor_bits = max(int(p).bit_length() for p in private_key)
+    if int_size - product.bit_length() < factor_bits:
+        raise ValueError("a %d-bit x0 cannot be a multiple of %d private keys of %d bits and a %d-bit prime"
+                         % (int_size, num_slots, factor_bits, factor_bits))
+    # q0 has no prime factor smaller than the private keys, like error_free_x0, and must be coprime to them for the
+    # residues modulo q0 to be independent of the slots.
+    q0 = product
+    while math.gcd(q0, product) != 1:
+        q0 = int(error_free_q0(int_size, product, factor_bits))
+    moduli = [q0] + list(private_key)
+
+    def integers(length: int, slots: np.ndarray) -> np.ndarray:
+        residues = np.empty((length, num_slots + 1), dtype=object)
+        residues[:, 0] = randint(0, q0, length=length)
+        residues[:, 1:] = 2 * noise(noise_size, length * num_slots).reshape(length, num_slots) + slots
+        return crt(residues, moduli)
+
+    key = np.empty(size + 1, dtype=object)
+    key[0] = backend.integer(q0 * product)
+    key[1:] = integers(size, np.zeros((size, num_slots), dtype=object))
+    return key, integers(num_slots, np.eye(num_slots, dtype=np.int64).astype(object))
+
+
+def key(num_slots: int,
+        private_key_length: int,
+        public_key_length: int,
+        public_key_bits: int,
+        primary_noise_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    k = private_key(num_slots, private_key_length)
+    return (k, *public_key(public_key_length, public_key_bits, primary_noise_size, k))
+
+
+def encrypt(slots: np.ndarray,
+            public_key: np.ndarray,
+            units: np.ndarray,
+            secondary_noise_size: int = 1) -> np.ndarray:
+    """
+    :param slots: array of bits of shape (..., number of slots)
+    :param public_key: x0 and the encryptions of zero of public_key
+    :param units: encryptions of the unit vectors of public_key
+    :param secondary_noise_size: bit size of the random multiples of the encryptions of zero
+    :return: array of shape slots.shape[:-1] of ciphertexts, sum_j m_j * x'_j + sum_i b_i * x_i mod x0
+    """
+    slots = np.asarray(slots)
+    assert slots.shape[-1] == len(units)
+    shape = slots.shape[:-1]
+    num = int(np.prod(shape))
+    encryptions_of_zero = public_key[1:]
+    if secondary_noise_size == 1:
+        zeros = backend.subset_sum(randomness.random_bits((num, len(encryptions_of_zero))), encryptions_of_zero)
+    else:
+        multiples = noise(secondary_noise_size, num * len(encryptions_of_zero)).reshape(num, -1)
+        zeros = np.dot(multiples, backend.asarray(encryptions_of_zero))
+    messages = backend.subset_sum(slots.reshape(num, -1), units)
+    return reduction.reducer(public_key[0]).reduce(messages + zeros).reshape(shape)
+
+
+def decrypt(ciphertexts: np.ndarray,
+            private_key: np.ndarray) -> np.ndarray:
+    """
+    :param ciphertexts: array of ciphertexts
+    :param private_key: p_1, ..., p_l
+    :return: int array of shape ciphertexts.shape + (number of slots,) of the slot bits
+    """
+    ciphertexts = backend.asarray(ciphertexts)
+    bits = [reduction.reducer(p).centered(ciphertexts) % 2 for p in private_key]
+    return np.stack(bits, axis=-1).astype(int)
+
+
+def sparse_private_keys(num_slots: int,
+                        num_bits: int,
+                        hamming_weight: int) -> np.ndarray:
+    """
+    Generate a sparse subset for every slot like homomorphic_encryption.private_key, with one index per box, and no
+    index shared by two slots, so that each slot has its own hints to correct.
+    :param num_slots: number of slots
+    :param num_bits: number of hints
+    :param hamming_weight: size of every subset
+    :return: int array of shape (num_slots, hamming_weight) of indices
+    """
+    assert num_bits % hamming_weight == 0
+    box_size = num_bits // hamming_weight
+    assert box_size >= num_slots
+    keys = np.empty((num_slots, hamming_weight), dtype=np.int64)
+    for k in range(hamming_weight):
+        order = np.argsort(randint(0, 2 ** 31, length=box_size, dtype=np.int64))
+        keys[:, k] = k * box_size + order[:num_slots]
+    return keys
+
+
+def secondary_public_key(int_num: int,
+                         int_size: int,
+                         sparse_private_keys: np.ndarray,
+                         private_key: np.ndarray) -> np.ndarray:
+    """
+    Generate the hints y_i = u_i / 2^int_size shared by all slots, such that the y_i indexed by the sparse subset of
+    slot j sum to 1 / p_j modulo 2, see homomorphic_encryption.secondary_public_key.
+    :return: 1D object array of integers u_i from [0, 2^{int_size + 1})
+    """
+    u = randint(0, 2 ** (int_size + 1), length=int_num)
+    for subset, p in zip(sparse_private_keys, private_key):
+        u[subset[-1]] = (((2 ** (int_size + 1) + p) // (2 * p) - np.sum(u[subset[:-1]]))
+                         % (2 ** (int_size + 1)))
+    return u
+
+
+def rotation(num_slots: int,
+             shift: int) -> np.ndarray:
+    """
+    :return: permutation moving slot j to slot (j + shift) mod num_slots
+    """
+    return (np.arange(num_slots) + shift) % num_slots
+
+
+def recrypt_engine(sparse_private_keys: np.ndarray,
+                   public_key: np.ndarray,
+                   units: np.ndarray,
+                   secondary_public_key: np.ndarray,
+                   secondary_int_size: int,
+                   permutation: Optional[np.ndarray] = None) -> RecryptEngine:
+    """
+    Build a RecryptEngine for batched ciphertexts: the i-th encrypted private key bit holds in slot j whether i is in
+    the sparse subset of slot j, so the decryption circuit decrypts every slot at once. Placing the bit of slot j in
+    slot permutation[j] instead makes recrypting move slot j to slot permutation[j].
+    :param sparse_private_keys: output of sparse_private_keys
+    :param public_key: x0 and the encryptions of zero of public_key
+    :param units: encryptions of the unit vectors of public_key
+    :param secondary_public_key: output of secondary_public_key
+    :param secondary_int_size: number of fractional bits of the secondary public key
+    :param permutation: permutation of the slots, e.g. of rotation. If None, the slots stay in place.
+    :return: RecryptEngine
+    """
+    num_slots, hamming_weight = sparse_private_keys.shape
+    permutation = np.arange(num_slots) if permutation is None else np.asarray(permutation)
+    assert sorted(permutation) == list(range(num_slots))
+    slots = np.zeros((len(secondary_public_key), num_slots), dtype=np.int64)
+    for j in range(num_slots):
+        slots[sparse_private_keys[j], permutation[j]] = 1
+    return RecryptEngine(public_key, secondary_public_key, secondary_int_size, encrypt(slots, public_key, units),
+                         hamming_weight)
@@ -0,0 +1,94 @@
+from typing import Optional
+import numpy as np
+
+
+def _unsigned(integers: np.ndarray,
+              width: int,
+              signed: bool) -> np.ndarray:
+    """
+    Map integers onto [0, 2^width), using two's complement for negative integers if "signed".
+    :param integers: 1D object array of integers.
+    :param width: number of binary digits.
+    :param signed: whether integers are from [-2^{width - 1}, 2^{width - 1}) instead of [0, 2^width).
+    :return: 1D object array of non-negative integers smaller than 2^width.
+    """
+    if signed:
+        assert np.all(-(2 ** (width - 1)) <= integers) and np.all(integers < 2 ** (width - 1))
+        return integers % (2 ** width)
+    assert np.all(0 <= integers) and np.all(integers < 2 ** width)
+    return integers
+
+
+def int2binary_matrix(integers,
+                      width: int,
+                      signed: bool = False) -> np.ndarray:
+    """
+    Create a 2D array whose rows contain the binary digits of integers, most significant digit first. Integers that
+    fit in 64 bits are shifted and masked natively, wider integers are unpacked from their bytes.
+    :param integers: 1D sequence of integers from [0, 2^width), or [-2^{width - 1}, 2^{width - 1}) if "signed".
+    :param width: number of binary digits per row.
+    :param signed: whether to encode negative integers in two's complement.
+    :return: 2D array of shape (len(integers), width) of binary digits.
+    """
+    integers = _unsigned(np.asarray(integers, dtype=object).reshape(-1), width, signed)
+
+    if width <= 64:
+        shifts = np.arange(width - 1, -1, -1, dtype=np.uint64)
+        return ((integers.astype(np.uint64)[:, None] >> shifts) & np.uint64(1)).astype(int)
+
+    num_bytes = (width + 7) // 8
+    buffer = b''.join(int(integer).to_bytes(num_bytes, 'big') for integer in integers)
+    bits = np.unpackbits(np.frombuffer(buffer, dtype=np.uint8)).reshape(len(integers), 8 * num_bytes)
+    return bits[:, 8 * num_bytes - width:].astype(int)
+
+
+def binary_matrix2int(bits,
+                      signed: bool = False) -> np.ndarray:
+    """
+    Create integers from a 2D array whose rows contain their binary digits, most significant digit first.
+    :param bits: 2D array of binary digits.
+    :param signed: whether rows are in two's complement.
+    :return: 1D object array of the integers the rows of "bits" represent.
+    """
+    bits = np.asarray(bits).astype(np.uint8)
+    width = bits.shape[1]
+
+    if width <= 64:
+        weights = np.uint64(1) << np.arange(width - 1, -1, -1, dtype=np.uint64)
+        integers = (bits.astype(np.uint64) @ weights).astype(object)
+    else:
+        padded = np.pad(bits, ((0, 0), ((-width) % 8, 0)))
+        packed = np.packbits(padded, axis=1)
+        integers = np.array([int.from_bytes(row.tobytes(), 'big') for row in packed], dtype=object)
+
+    if signed and width > 0:
+        integers = integers - bits[:, 0].astype(object) * (2 ** width)
+    return integers
+
+
+def int2binary_array(integer: int,
+                     width: Optional[int] = None,
+                     signed: bool = False) -> np.ndarray:
+    """
+    Create a 1D array containing the binary digits of an integer, most significant digit first.
+    :param integer: integer of which the binary digits are to store in a 1D array. Must be non-negative unless "signed".
+    :param width: number of binary digits. If None, the fewest digits representing a non-negative integer are used.
+    Pass a fixed width so that the length of the output does not depend on the magnitude of "integer".
+    :param signed: whether to encode a negative integer in two's complement. Requires "width".
+    :return: 1D array of binary digits.
+    """
+    if width is None:
+        assert not signed and 0 <= integer
+        width = max(int(integer).bit_length(), 1)
+    return int2binary_matrix([integer], width, signed)[0]
+
+
+def binary_array2int(bits,
+                     signed: bool = False) -> int:
+    """
+    Create an integer from an array containing its binary digits, most significant digit first.
+    :param bits: 1D array of binary digits.
+    :param signed: whether "bits" is in two's complement.
+    :return: integer "bits" represents.
+    """
+    return binary_matrix2int(np.asarray(bits).reshape(1, -1), signed)[0]
@@ -0,0 +1,298 @@
+from typing import Union, Optional
+import numpy as np
+from src import backend, reduction, somewhat_homomorphic_encryption
+from src.noise_budget import NoiseBudget
+from src.bit_codec import binary_array2int, binary_matrix2int
+from src.subset_sum import SubsetSumTable
+
+# Extra bits a ciphertext may grow by past the product of two reduced ciphertexts before it is reduced by default.
+REDUCTION_SLACK_BITS = 64
+
+
+def _fresh_noise_bits(budget: Optional[NoiseBudget],
+                      public_key: np.ndarray,
+                      secondary_noise_size: int) -> Optional[int]:
+    return None if budget is None else budget.fresh(len(public_key) - 1, secondary_noise_size)
+
+
+def max_noise_bits(ciphertexts: list) -> Optional[int]:
+    """
+    :param ciphertexts: list of Ciphertexts
+    :return: largest noise bound of "ciphertexts", or None if the noise of one of them is not tracked
+    """
+    noise_bits = [ciphertext.noise_bits for ciphertext in ciphertexts]
+    return None if None in noise_bits else max(noise_bits)
+
+
+def _bit_bound(values) -> int:
+    """
+    :param values: array of integers
+    :return: bit size of the largest absolute value in "values"
+    """
+    values = np.asarray(values)
+    if values.size == 0:
+        return 0
+    return int(np.max(np.abs(values))).bit_length()
+
+
+class Ciphertext:
+    """
+    Array of encrypted bits, e.g. the output of encrypt or encrypt_batch, with the first integer of the public key x0
+    it is reduced modulo. Adding two ciphertexts XORs their bits and multiplying them ANDs their bits, element-wise.
+
+    Reducing modulo x0 only keeps the integers small, it does not change what they decrypt to. So results are not
+    reduced after every operation, but only once their bit size may exceed "max_bits". The bit size is tracked as an
+    upper bound: one more bit than the larger operand for additions, the sum of both for multiplications.
+
+    With a NoiseBudget, the bit size of the noise is tracked the same way, so that remaining_budget tells how many more
+    bits of noise the ciphertext tolerates, and the budget can warn or raise before an operation exceeds it.
+    """
+
+    # Make numpy arrays defer to the reflected operators, so that plaintext arrays can be left operands.
+    __array_ufunc__ = None
+
+    def __init__(self,
+                 values: np.ndarray,
+                 modulus: Optional[int] = None,
+                 max_bits: Optional[int] = None,
+                 bit_bound: Optional[int] = None,
+                 noise_bits: Optional[int] = None,
+                 budget: Optional[NoiseBudget] = None):
+        """
+        :param values: array of ciphertexts of bits
+        :param modulus: public_key[0] to reduce by, or None to never reduce, e.g. for private key encryption
+        :param max_bits: bit size past which results are reduced modulo "modulus". If None, twice the bit size of
+        "modulus" plus REDUCTION_SLACK_BITS.
+        :param bit_bound: upper bound of the bit size of "values". If None, it is computed.
+        :param noise_bits: upper bound of the bit size of the noise of "values", e.g. NoiseBudget.fresh, or None not to
+        track the noise
+        :param budget: NoiseBudget of the private key, required to track the noise
+        """
+        self.values = np.asarray(values)
+        self.modulus = modulus
+        if max_bits is None and modulus is not None:
+            max_bits = 2 * int(modulus).bit_length() + REDUCTION_SLACK_BITS
+        self.max_bits = max_bits
+        self.bit_bound = _bit_bound(self.values) if bit_bound is None else bit_bound
+        assert noise_bits is None or budget is not None
+        self.noise_bits = noise_bits
+        self.budget = budget
+
+    @classmethod
+    def encrypt(cls,
+                plaintext: int,
+                public_key: np.ndarray,
+                secondary_noise_size: int,
+                width: Optional[int] = None,
+                signed: bool = False,
+                table: Optional[SubsetSumTable] = None,
+                max_bits: Optional[int] = None,
+                budget: Optional[NoiseBudget] = None) -> 'Ciphertext':
+        """
+        Encrypt like somewhat_homomorphic_encryption.encrypt.
+        :param budget: NoiseBudget of the key to track the noise with, or None not to track it
+        :return: 1D Ciphertext of the bits of "plaintext", most significant bit first
+        """
+        values = somewhat_homomorphic_encryption.encrypt(plaintext, public_key, secondary_noise_size, width, signed,
+                                                         table)
+        return cls(values, public_key[0], max_bits, int(public_key[0]).bit_length(),
+                   _fresh_noise_bits(budget, public_key, secondary_noise_size), budget)
+
+    @classmethod
+    def encrypt_batch(cls,
+                      plaintexts,
+                      public_key: np.ndarray,
+                      secondary_noise_size: int,
+                      width: int,
+                      signed: bool = False,
+                      table: Optional[SubsetSumTable] = None,
+                      max_bits: Optional[int] = None,
+                      budget: Optional[NoiseBudget] = None) -> 'Ciphertext':
+        """
+        Encrypt like somewhat_homomorphic_encryption.encrypt_batch.
+        :param budget: NoiseBudget of the key to track the noise with, or None not to track it
+        :return: 2D Ciphertext of shape (len(plaintexts), width)
+        """
+        values = somewhat_homomorphic_encryption.encrypt_batch(plaintexts, public_key, secondary_noise_size, width,
+                                                               signed, table)
+        return cls(values, public_key[0], max_bits, int(public_key[0]).bit_length(),
+                   _fresh_noise_bits(budget, public_key, secondary_noise_size), budget)
+
+    @classmethod
+    def stack(cls, bits: list) -> 'Ciphertext':
+        """
+        :param bits: list of Ciphertexts of the same shape, or plaintext bits, which are encrypted without noise
+        :return: Ciphertext with the bits stacked along a new last axis, e.g. 1D of width len(bits) for scalar bits
+        """
+        ciphertexts = [bit for bit in bits if isinstance(bit, Ciphertext)]
+        assert ciphertexts
+        first = ciphertexts[0]
+        values = [bit.values if isinstance(bit, Ciphertext) else np.full(first.shape, bit, dtype=first.values.dtype)
+                  for bit in bits]
+        return cls(np.stack(values, axis=-1), first.modulus, first.max_bits,
+                   max(ciphertext.bit_bound for ciphertext in ciphertexts), max_noise_bits(ciphertexts), first.budget)
+
+    def decrypt_bits(self, private_key: int) -> np.ndarray:
+        """
+        Decrypt with the remainder modulo the private key of the smallest absolute value, since reducing modulo x0 may
+        make the noise negative. Without a modulus, e.g. for private key encryption, the noise is never reduced and
+        stays non-negative, so the non-negative remainder is taken, which decrypts noise up to the private key.
+        :param private_key: private key
+        :return: int array of the decrypted bits
+        """
+        if self.noise_bits is not None:
+            self.budget.check(self.noise_bits, 'decryption')
+        reducer = reduction.reducer(private_key)
+        values = backend.asarray(self.values)
+        if self.modulus is None:
+            return (reducer.reduce(values, self.bit_bound) % 2).astype(int)
+        return (reducer.centered(values, self.bit_bound) % 2).astype(int)
+
+    def decrypt(self,
+                private_key: int,
+                signed: bool = False) -> Union[int, np.ndarray]:
+        """
+        :param private_key: private key
+        :param signed: whether the plaintexts were encrypted in two's complement
+        :return: plaintext of a 1D Ciphertext, 1D array of plaintexts of a 2D Ciphertext
+        """
+        bits = self.decrypt_bits(private_key)
+        if bits.ndim == 1:
+            return binary_array2int(bits, signed)
+        return binary_matrix2int(bits, signed)
+
+    @property
+    def shape(self) -> tuple:
+        return self.values.shape
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index) -> 'Ciphertext':
+        return self._new(self.values[index], self.bit_bound, self.noise_bits)
+
+    def __repr__(self) -> str:
+        if self.noise_bits is None:
+            return 'Ciphertext(shape=%s, bit_bound=%d)' % (self.values.shape, self.bit_bound)
+        return 'Ciphertext(shape=%s, bit_bound=%d, noise_bits=%d)' % (self.values.shape, self.bit_bound,
+                                                                      self.noise_bits)
+
+    def remaining_budget(self) -> Optional[int]:
+        """
+        :return: number of bits the noise may still grow by before decryption may fail, negative if it already may,
+        or None if the noise is not tracked
+        """
+        if self.noise_bits is None:
+            return None
+        return self.budget.remaining(self.noise_bits)
+
+    def _new(self,
+             values: np.ndarray,
+             bit_bound: int,
+             noise_bits: Optional[int]) -> 'Ciphertext':
+        if not isinstance(values, (np.ndarray, np.generic)):
+            # Operations on 0D object arrays return big integers, which must not become native however small they are.
+            values = np.asarray(values, dtype=object)
+        return Ciphertext(values, self.modulus, self.max_bits, bit_bound, noise_bits, self.budget)
+
+    def reduce(self) -> 'Ciphertext':
+        """
+        :return: Ciphertext of the same bits reduced modulo the public key, or self if there is no modulus
+        """
+        if self.modulus is None:
+            return self
+        modulus_bits = int(self.modulus).bit_length()
+        noise_bits = self.noise_bits
+        if noise_bits is not None:
+            noise_bits = self.budget.reduced(noise_bits, self.bit_bound, modulus_bits)
+            self.budget.check(noise_bits, 'reduction modulo x0')
+        return self._new(reduction.reducer(self.modulus).reduce(self.values, self.bit_bound), modulus_bits, noise_bits)
+
+    def _operands(self,
+                  other,
+                  bit_bound,
+                  operation: str) -> tuple:
+        """
+        Prepare the operands of an operation so that native integers do not overflow: reduce native operands if the
+        result could exceed native intermediates, or store them as big integers if there is no modulus. The noise of
+        the result is bounded by the same function of the noise of both operands, plaintext operands being their own
+        noise, and checked against the budget.
+        :param other: Ciphertext, integer or array of integers
+        :param bit_bound: function of the bit bounds of both operands giving the bit bound of the result
+        :param operation: name of the operation for the message of the budget
+        :return: values of self, values of other, and the bit bound and the noise bound of the result
+        """
+        a, a_bits = self, self.bit_bound
+        if isinstance(other, Ciphertext):
+            b, b_bits = other, other.bit_bound
+        else:
+            b, b_bits = None, _bit_bound(other)
+
+        native = self.values.dtype != object or (b is not None and b.values.dtype != object)
+        if native and bit_bound(a_bits, b_bits) > backend.NATIVE_INTERMEDIATE_BITS:
+            if self.modulus is not None:
+                a = a.reduce()
+                b = None if b is None else b.reduce()
+                a_bits = a.bit_bound
+                b_bits = b_bits if b is None else b.bit_bound
+            if self.modulus is None or bit_bound(a_bits, b_bits) > backend.NATIVE_INTERMEDIATE_BITS:
+                a = a._new(backend.asarray(a.values.astype(object)), a_bits, a.noise_bits)
+                b = None if b is None else b._new(backend.asarray(b.values.astype(object)), b_bits, b.noise_bits)
+
+        b_noise_bits = b_bits if b is None else b.noise_bits
+        noise_bits = None
+        if a.noise_bits is not None and b_noise_bits is not None:
+            noise_bits = bit_bound(a.noise_bits, b_noise_bits)
+            self.budget.check(noise_bits, operation)
+        b_values = other if b is None else b.values
+        return a.values, b_values, bit_bound(a_bits, b_bits), noise_bits
+
+    def _result(self,
+                values: np.ndarray,
+                bit_bound: int,
+                noise_bits: Optional[int]) -> 'Ciphertext':
+        """
+        :return: Ciphertext of "values", reduced if its bit bound exceeds max_bits
+        """
+        result = self._new(values, bit_bound, noise_bits)
+        if self.max_bits is not None and bit_bound > self.max_bits:
+            return result.reduce()
+        return result
+
+    def __add__(self, other) -> 'Ciphertext':
+        """
+        :param other: Ciphertext, or plaintext bits to add as constants
+        :return: Ciphertext of the XOR of the bits
+        """
+        a, b, bit_bound, noise_bits = self._operands(other, lambda a_bits, b_bits: max(a_bits, b_bits) + 1,
+                                                     'addition')
+        return self._result(a + b, bit_bound, noise_bits)
+
+    def __mul__(self, other) -> 'Ciphertext':
+        """
+        :param other: Ciphertext, or plaintext bits to multiply by as constants
+        :return: Ciphertext of the AND of the bits
+        """
+        a, b, bit_bound, noise_bits = self._operands(other, lambda a_bits, b_bits: a_bits + b_bits, 'multiplication')
+        return self._result(a * b, bit_bound, noise_bits)
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+    __xor__ = __add__
+    __rxor__ = __add__
+    __and__ = __mul__
+    __rand__ = __mul__
+
+    def __invert__(self) -> 'Ciphertext':
+        """
+        :return: Ciphertext of the NOT of the bits
+        """
+        return self + 1
+
+    def __or__(self, other) -> 'Ciphertext':
+        """
+        :return: Ciphertext of the OR of the bits, a XOR b XOR (a AND b)
+        """
+        return self + other + self * other
+
+    __ror__ = __or__
@@ -0,0 +1,273 @@
+from typing import Optional
+import functools
+import numpy as np
+from src import backend
+
+LIMB_BITS = 64
+# Moduli of more than 32 bits are reduced in 16-bit digits, so that the product of two digits and the sum of many such
+# products fit a uint64.
+DIGIT_BITS = 16
+# Number of digits whose products with the fold table are summed by one float64 matrix product. The sum of FOLD_CHUNK
+# products of two digits stays below 2^53, so the matrix product is exact.
+FOLD_CHUNK = 1024
+_LIMB_DTYPE = np.dtype('<u8')
+_DIGIT_DTYPE = np.dtype('<u2')
+_HALF_BITS = np.uint64(32)
+_HALF_MASK = np.uint64(2 ** 32 - 1)
+
+
+class CiphertextArray:
+    """
+    Many non-negative integers, e.g. ciphertexts, stored contiguously as a 2D uint64 limb matrix. Row i holds the i-th
+    integer, column j its j-th 64-bit limb, least significant limb first. Arithmetic is vectorized over rows and loops
+    only over limbs.
+    """
+
+    def __init__(self, limbs: np.ndarray):
+        """
+        :param limbs: 2D array of shape (number of integers, number of limbs) of 64-bit limbs
+        """
+        limbs = np.ascontiguousarray(limbs, dtype=_LIMB_DTYPE)
+        assert limbs.ndim == 2 and limbs.shape[1] > 0
+        self.limbs = limbs
+
+    @classmethod
+    def from_ints(cls,
+                  integers,
+                  num_limbs: Optional[int] = None) -> 'CiphertextArray':
+        """
+        :param integers: 1D sequence of non-negative integers, e.g. the output of encrypt
+        :param num_limbs: number of limbs per integer. If None, the fewest limbs holding the largest integer.
+        :return: CiphertextArray of "integers"
+        """
+        integers = [int(integer) for integer in np.asarray(integers, dtype=object).reshape(-1)]
+        assert all(0 <= integer for integer in integers)
+        if num_limbs is None:
+            num_limbs = max([(integer.bit_length() + LIMB_BITS - 1) // LIMB_BITS for integer in integers] + [1])
+        num_bytes = num_limbs * LIMB_BITS // 8
+        buffer = b''.join(integer.to_bytes(num_bytes, 'little') for integer in integers)
+        return cls(np.frombuffer(buffer, dtype=_LIMB_DTYPE).reshape(len(integers), num_limbs))
+
+    def to_ints(self) -> np.ndarray:
+        """
+        :return: 1D object array of the integers, as integers of src.backend, e.g. to pass to decrypt
+        """
+        return backend.asarray([int.from_bytes(row.tobytes(), 'little') for row in self.limbs])
+
+    @property
+    def num_limbs(self) -> int:
+        return self.limbs.shape[1]
+
+    def __len__(self) -> int:
+        return self.limbs.shape[0]
+
+    def __getitem__(self, index) -> 'CiphertextArray':
+        return CiphertextArray(self.limbs[index].reshape(-1, self.num_limbs))
+
+    def __repr__(self) -> str:
+        return 'CiphertextArray(%d integers, %d limbs)' % (len(self), self.num_limbs)
+
+    def _aligned(self, other: 'CiphertextArray') -> tuple[np.ndarray, np.ndarray]:
+        """
+        :param other: CiphertextArray of the same length
+        :return: limbs of self and other, zero-padded to the same number of limbs
+        """
+        assert len(self) == len(other)
+        num_limbs = max(self.num_limbs, other.num_limbs)
+        return _pad(self.limbs, num_limbs), _pad(other.limbs, num_limbs)
+
+    def __add__(self, other: 'CiphertextArray') -> 'CiphertextArray':
+        a, b = self._aligned(other)
+        result = np.empty_like(a)
+        carry = np.zeros(len(a), dtype=_LIMB_DTYPE)
+
+        for j in range(a.shape[1]):
+            partial = a[:, j] + b[:, j]
+            overflow = partial < a[:, j]
+            result[:, j] = partial + carry
+            carry = (overflow | (result[:, j] < partial)).astype(_LIMB_DTYPE)
+
+        return CiphertextArray(_append_carry(result, carry))
+
+    def __sub__(self, other: 'CiphertextArray') -> 'CiphertextArray':
+        a, b = self._aligned(other)
+        result = np.empty_like(a)
+        borrow = np.zeros(len(a), dtype=_LIMB_DTYPE)
+
+        for j in range(a.shape[1]):
+            partial = a[:, j] - b[:, j]
+            underflow = a[:, j] < b[:, j]
+            result[:, j] = partial - borrow
+            borrow = (underflow | (partial < borrow)).astype(_LIMB_DTYPE)
+
+        if np.any(borrow):
+            raise ValueError("subtraction would make an integer of a CiphertextArray negative")
+        return CiphertextArray(result)
+
+    def __mul__(self, scalar: int) -> 'CiphertextArray':
+        """
+        :param scalar: non-negative integer smaller than 2^32
+        :return: every integer multiplied by "scalar"
+        """
+        if not 0 <= scalar < 2 ** 32:
+            raise ValueError("CiphertextArray can only be multiplied by integers from [0, 2^32)")
+        s = np.uint64(scalar)
+        low_products = (self.limbs & _HALF_MASK) * s
+        high_products = (self.limbs >> _HALF_BITS) * s
+
+        # limb * s = low + high * 2^64, split across the 32-bit halves of the limb.
+        low = low_products + ((high_products & _HALF_MASK) << _HALF_BITS)
+        high = (high_products >> _HALF_BITS) + (low < low_products)
+
+        result = np.empty_like(self.limbs)
+        carry = np.zeros(len(self), dtype=_LIMB_DTYPE)
+        for j in range(self.num_limbs):
+            result[:, j] = low[:, j] + carry
+            carry = high[:, j] + (result[:, j] < carry)
+
+        return CiphertextArray(_append_carry(result, carry))
+
+    __rmul__ = __mul__
+
+    def compare(self, other: 'CiphertextArray') -> np.ndarray:
+        """
+        :param other: CiphertextArray of the same length
+        :return: 1D int array holding -1, 0 or 1 where self is smaller than, equal to or larger than other
+        """
+        a, b = self._aligned(other)
+        different = (a != b)[:, ::-1]
+        top = a.shape[1] - 1 - np.argmax(different, axis=1)
+        rows = np.arange(len(a))
+        sign = np.where(a[rows, top] > b[rows, top], 1, -1)
+        return np.where(np.any(different, axis=1), sign, 0)
+
+    def __eq__(self, other: 'CiphertextArray') -> np.ndarray:
+        return self.compare(other) == 0
+
+    def __lt__(self, other: 'CiphertextArray') -> np.ndarray:
+        return self.compare(other) < 0
+
+    def __le__(self, other: 'CiphertextArray') -> np.ndarray:
+        return self.compare(other) <= 0
+
+    def __gt__(self, other: 'CiphertextArray') -> np.ndarray:
+        return self.compare(other) > 0
+
+    def __ge__(self, other: 'CiphertextArray') -> np.ndarray:
+        return self.compare(other) >= 0
+
+    def mod2(self) -> np.ndarray:
+        """
+        :return: 1D int array of every integer modulo 2
+        """
+        return (self.limbs[:, 0] & np.uint64(1)).astype(int)
+
+    def mod(self, modulus: int) -> np.ndarray:
+        """
+        :param modulus: positive integer, e.g. a private key
+        :return: 1D array of every integer modulo "modulus": int64 for moduli below 2^32, which are reduced natively
+        limb by limb, otherwise object of integers of src.backend, reduced by _fold_mod
+        """
+        if modulus >= 2 ** 32:
+            return self._fold_mod(int(modulus)).to_ints()
+
+        m = np.uint64(modulus)
+        remainder = np.zeros(len(self), dtype=_LIMB_DTYPE)
+        for j in range(self.num_limbs - 1, -1, -1):
+            remainder = ((remainder << _HALF_BITS) | (self.limbs[:, j] >> _HALF_BITS)) % m
+            remainder = ((remainder << _HALF_BITS) | (self.limbs[:, j] & _HALF_MASK)) % m
+        return remainder.astype(np.int64)
+
+    def _fold_mod(self, modulus: int) -> 'CiphertextArray':
+        """
+        Reduce modulo a multi-limb modulus m without big integers. The 16-bit digits x_i of every integer x are
+        multiplied by the precomputed digits of 2^{16 i} mod m and summed column by column with matrix products,
+        which gives y = sum_i x_i * (2^{16 i} mod m) = x mod m, y < num_digits * 2^16 * m. Subtracting m * 2^b from
+        the rows with y >= m * 2^b for b from the bit size of num_digits * 2^16 down to 0 leaves y < m.
+        :param modulus: integer of at least 2^32
+        :return: CiphertextArray of every integer modulo "modulus"
+        """
+        digits = self.limbs.view(_DIGIT_DTYPE)
+        table = _fold_table(modulus, digits.shape[1])
+        columns = np.zeros((len(self), table.shape[1]), dtype=_LIMB_DTYPE)
+        for start in range(0, digits.shape[1], FOLD_CHUNK):
+            chunk = slice(start, start + FOLD_CHUNK)
+            columns += (digits[:, chunk].astype(np.float64) @ table[chunk].astype(np.float64)).astype(_LIMB_DTYPE)
+
+        # Every column is below 2^64, so it spans 4 digits starting at its own.
+        folded = None
+        num_digits = -(-(table.shape[1] + 3) // 4) * 4
+        for k in range(4):
+            shifted = np.zeros((len(self), num_digits), dtype=_DIGIT_DTYPE)
+            shifted[:, k:k + table.shape[1]] = (columns >> np.uint64(DIGIT_BITS * k)) & np.uint64(2 ** DIGIT_BITS - 1)
+            part = CiphertextArray(shifted.view(_LIMB_DTYPE))
+            folded = part if folded is None else folded + part
+
+        for b in range((digits.shape[1] * 2 ** DIGIT_BITS).bit_length(), -1, -1):
+            multiple = CiphertextArray.from_ints([modulus << b])
+            multiples = CiphertextArray(np.broadcast_to(multiple.limbs, (len(self), multiple.num_limbs)))
+            subtract = folded >= multiples
+            folded = folded - CiphertextArray(np.where(subtract[:, None], multiples.limbs, 0))
+        return folded
+
+
+@functools.lru_cache(maxsize=8)
+def _fold_table(modulus: int,
+                num_digits: int) -> np.ndarray:
+    """
+    :param modulus: integer of at least 2^32
+    :param num_digits: number of 16-bit digits of the integers to reduce
+    :return: uint16 array of shape (num_digits, number of digits of modulus), row i the digits of 2^{16 i} mod modulus
+    """
+    width = -(-modulus.bit_length() // DIGIT_BITS)
+    buffer = bytearray()
+    power = 1
+    for _ in range(num_digits):
+        buffer += power.to_bytes(width * DIGIT_BITS // 8, 'little')
+        power = (power << DIGIT_BITS) % modulus
+    return np.frombuffer(bytes(buffer), dtype=_DIGIT_DTYPE).reshape(num_digits, width)
+
+
+def _pad(limbs: np.ndarray,
+         num_limbs: int) -> np.ndarray:
+    """
+    :param limbs: 2D limb matrix
+    :param num_limbs: number of limbs to zero-pad "limbs" to
+    :return: padded limb matrix
+    """
+    return np.pad(limbs, ((0, 0), (0, num_limbs - limbs.shape[1])))
+
+
+def _append_carry(limbs: np.ndarray,
+                  carry: np.ndarray) -> np.ndarray:
+    """
+    :param limbs: 2D limb matrix
+    :param carry: carry out of the most significant limb of each row
+    :return: "limbs" with one more limb holding "carry" if any carry is non-zero
+    """
+    if np.any(carry):
+        return np.concatenate([limbs, carry[:, None]], axis=1)
+    return limbs
+
+
+def from_ciphertext(ciphertext: np.ndarray,
+                    num_limbs: Optional[int] = None) -> CiphertextArray:
+    """
+    Convert ciphertexts returned by encrypt or encrypt_batch to a CiphertextArray.
+    :param ciphertext: array of non-negative ciphertexts. A 2D batch is flattened row by row.
+    :param num_limbs: number of limbs per ciphertext. If None, the fewest limbs holding the largest ciphertext.
+    :return: CiphertextArray of the ciphertexts
+    """
+    return CiphertextArray.from_ints(np.asarray(ciphertext, dtype=object).reshape(-1), num_limbs)
+
+
+def to_ciphertext(array: CiphertextArray,
+                  shape: Optional[tuple] = None) -> np.ndarray:
+    """
+    Convert a CiphertextArray back to ciphertexts accepted by decrypt or decrypt_batch.
+    :param array: CiphertextArray
+    :param shape: shape of the ciphertext array, e.g. (number of plaintexts, width) for decrypt_batch
+    :return: object array of ciphertexts
+    """
+    ciphertext = array.to_ints()
+    return ciphertext if shape is None else ciphertext.reshape(shape)
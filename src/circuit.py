@@ -0,0 +1,345 @@
+from typing import Union, List, Optional, Dict
+import heapq
+import numpy as np
+from src.ciphertext import Ciphertext
+
+INPUT = 'input'
+CONSTANT = 'constant'
+XOR = 'xor'
+AND = 'and'
+
+
+class Wire:
+    """
+    A bit of a Circuit. Combining wires with ^, &, | and ~ adds gates to their circuit, plaintext bits 0 and 1 can be
+    used as operands.
+    """
+
+    def __init__(self,
+                 circuit: 'Circuit',
+                 node: int):
+        self.circuit = circuit
+        self.node = node
+
+    def _wire(self, other: Union['Wire', int]) -> 'Wire':
+        if isinstance(other, Wire):
+            assert other.circuit is self.circuit
+            return other
+        return self.circuit.constant(other)
+
+    def __xor__(self, other: Union['Wire', int]) -> 'Wire':
+        return self.circuit.gate(XOR, self, self._wire(other))
+
+    def __and__(self, other: Union['Wire', int]) -> 'Wire':
+        return self.circuit.gate(AND, self, self._wire(other))
+
+    def __or__(self, other: Union['Wire', int]) -> 'Wire':
+        other = self._wire(other)
+        return self ^ other ^ (self & other)
+
+    def __invert__(self) -> 'Wire':
+        return self ^ 1
+
+    __rxor__ = __xor__
+    __rand__ = __and__
+    __ror__ = __or__
+
+    def __repr__(self) -> str:
+        return 'Wire(%d)' % self.node
+
+
+class Circuit:
+    """
+    Directed acyclic graph of XOR and AND gates over bits, e.g. bits encrypted by encrypt. XOR is evaluated by adding
+    ciphertexts and AND by multiplying them, so the noise of the outputs grows with the AND depth, the largest number
+    of AND gates on a path from an input to an output.
+
+    Gates are hash-consed, so building the same gate twice returns the same wire, and gates with constant or equal
+    operands are folded as they are built. optimize additionally rebalances chains of XOR and AND gates to minimize
+    the AND depth.
+    """
+
+    def __init__(self):
+        # Node i is (INPUT, name, index), (CONSTANT, bit) or (XOR or AND, operand node, operand node). Operands are
+        # always built first, so the nodes are in topological order.
+        self.nodes = []
+        self.depths = []
+        self.outputs = {}
+        self.input_widths = {}
+        self._table = {}
+
+    def _node(self, node: tuple, depth: int) -> Wire:
+        """
+        :param node: tuple describing the node
+        :param depth: AND depth of the node
+        :return: wire of the node, which is only added if the circuit has no equal node yet
+        """
+        if node not in self._table:
+            self._table[node] = len(self.nodes)
+            self.nodes.append(node)
+            self.depths.append(depth)
+        return Wire(self, self._table[node])
+
+    def input(self,
+              name: str,
+              index: Optional[int] = None) -> Wire:
+        """
+        :param name: name of the input in the inputs of evaluate
+        :param index: index of the bit in the last axis of a multi-bit input, or None for a single bit input
+        :return: wire of the input bit
+        """
+        return self._node((INPUT, name, index), 0)
+
+    def inputs(self,
+               name: str,
+               width: int) -> List[Wire]:
+        """
+        :param name: name of the input in the inputs of evaluate, e.g. the output of encrypt with the same width
+        :param width: number of bits of the input
+        :return: wires of the bits of the input, most significant bit first
+        """
+        self.input_widths[name] = width
+        return [self.input(name, i) for i in range(width)]
+
+    def constant(self, bit: int) -> Wire:
+        """
+        :param bit: 0 or 1
+        :return: wire of the plaintext bit
+        """
+        assert bit in (0, 1)
+        return self._node((CONSTANT, int(bit)), 0)
+
+    def _constant_value(self, wire: Wire) -> Optional[int]:
+        node = self.nodes[wire.node]
+        return node[1] if node[0] == CONSTANT else None
+
+    def gate(self,
+             op: str,
+             a: Wire,
+             b: Wire) -> Wire:
+        """
+        Add a gate, folding it if an operand is constant or both operands are the same.
+        :param op: XOR or AND
+        :param a: first operand
+        :param b: second operand
+        :return: wire of the output of the gate
+        """
+        constant_a, constant_b = self._constant_value(a), self._constant_value(b)
+        if constant_a is not None and constant_b is not None:
+            return self.constant(constant_a ^ constant_b if op == XOR else constant_a & constant_b)
+        if constant_a is not None:
+            a, b, constant_a, constant_b = b, a, None, constant_a
+
+        if op == XOR:
+            if constant_b == 0:
+                return a
+            if a.node == b.node:
+                return self.constant(0)
+        else:
+            if constant_b is not None:
+                return a if constant_b == 1 else self.constant(0)
+            if a.node == b.node:
+                return a
+
+        # Both gates are commutative, so the operands are ordered to find equal gates.
+        operands = tuple(sorted((a.node, b.node)))
+        depth = max(self.depths[a.node], self.depths[b.node]) + (op == AND)
+        return self._node((op,) + operands, depth)
+
+    def output(self,
+               name: str,
+               wires: Union[Wire, List[Wire]]) -> None:
+        """
+        :param name: name of the output in the outputs of evaluate
+        :param wires: a wire, or a list of wires, most significant bit first
+        """
+        self.outputs[name] = wires
+
+    def _output_nodes(self) -> List[int]:
+        nodes = []
+        for wires in self.outputs.values():
+            nodes += [wire.node for wire in (wires if isinstance(wires, list) else [wires])]
+        return nodes
+
+    def depth(self) -> int:
+        """
+        :return: AND depth of the circuit, i.e. the largest AND depth of its outputs
+        """
+        return max([self.depths[node] for node in self._output_nodes()], default=0)
+
+    def _reachable(self) -> np.ndarray:
+        """
+        :return: boolean array of whether each node is needed to compute an output
+        """
+        reachable = np.zeros(len(self.nodes), dtype=bool)
+        reachable[self._output_nodes()] = True
+        for i in range(len(self.nodes) - 1, -1, -1):
+            if reachable[i] and self.nodes[i][0] in (XOR, AND):
+                reachable[list(self.nodes[i][1:])] = True
+        return reachable
+
+    def gate_counts(self) -> Dict[str, int]:
+        """
+        :return: number of XOR and AND gates needed to compute the outputs
+        """
+        reachable = self._reachable()
+        counts = {XOR: 0, AND: 0}
+        for node, needed in zip(self.nodes, reachable):
+            if needed and node[0] in counts:
+                counts[node[0]] += 1
+        return counts
+
+    def _fanouts(self) -> np.ndarray:
+        """
+        :return: number of uses of each node by needed gates and outputs
+        """
+        reachable = self._reachable()
+        fanouts = np.zeros(len(self.nodes), dtype=int)
+        for node, needed in zip(self.nodes, reachable):
+            if needed and node[0] in (XOR, AND):
+                fanouts[list(node[1:])] += 1
+        np.add.at(fanouts, self._output_nodes(), 1)
+        return fanouts
+
+    def optimize(self, known: Optional[Dict[str, int]] = None) -> 'Circuit':
+        """
+        Build an equivalent circuit of the gates needed by the outputs. Inputs with known plaintexts are replaced by
+        constants and folded away. Chains of the same gate whose intermediate results are not used elsewhere are
+        flattened and rebuilt as balanced trees, always combining the two operands of the smallest AND depth first.
+        :param known: plaintexts of some inputs, bits for single bit inputs, integers for multi-bit inputs
+        :return: optimized Circuit
+        """
+        known = {} if known is None else known
+        fanouts = self._fanouts()
+        reachable = self._reachable()
+        optimized = Circuit()
+        optimized.input_widths = dict(self.input_widths)
+
+        # Gates only used by a gate of the same kind are built as part of the chain they are inside of.
+        inner = set()
+        for node, needed in zip(self.nodes, reachable):
+            if needed and node[0] in (XOR, AND):
+                inner.update(j for j in node[1:] if self.nodes[j][0] == node[0] and fanouts[j] == 1)
+
+        wires = {}
+        for i, (node, needed) in enumerate(zip(self.nodes, reachable)):
+            if not needed or i in inner:
+                continue
+            if node[0] == INPUT:
+                name, index = node[1], node[2]
+                if name not in known:
+                    wires[i] = optimized.input(name, index)
+                elif index is None:
+                    wires[i] = optimized.constant(known[name])
+                else:
+                    wires[i] = optimized.constant((known[name] >> (self.input_widths[name] - 1 - index)) & 1)
+            elif node[0] == CONSTANT:
+                wires[i] = optimized.constant(node[1])
+            else:
+                wires[i] = optimized.chain(node[0], self._leaves(i, inner, wires))
+
+        for name, output in self.outputs.items():
+            if isinstance(output, list):
+                optimized.output(name, [wires[wire.node] for wire in output])
+            else:
+                optimized.output(name, wires[output.node])
+        return optimized
+
+    def _leaves(self,
+                root: int,
+                inner: set,
+                wires: dict) -> List[Wire]:
+        """
+        :param root: gate at the root of a chain
+        :param inner: gates inside of chains
+        :param wires: wires of the optimized circuit of the gates outside of chains
+        :return: wires of the operands of the chain
+        """
+        stack, leaves = [root], []
+        while stack:
+            i = stack.pop()
+            if i == root or i in inner:
+                stack += list(self.nodes[i][1:])
+            else:
+                leaves.append(wires[i])
+        return leaves
+
+    def chain(self,
+               op: str,
+               operands: List[Wire]) -> Wire:
+        """
+        Combine many operands with the same gate as a balanced tree of minimal AND depth.
+        :param op: XOR or AND
+        :param operands: wires of this circuit
+        :return: wire of the result
+        """
+        counts = {}
+        for wire in operands:
+            counts[wire.node] = counts.get(wire.node, 0) + 1
+        # x ^ x = 0 and x & x = x
+        nodes = [node for node, count in counts.items() if op == AND or count % 2 == 1]
+
+        constant = 0 if op == XOR else 1
+        variables = []
+        for node in nodes:
+            value = self._constant_value(Wire(self, node))
+            if value is None:
+                variables.append(node)
+            elif op == XOR:
+                constant ^= value
+            else:
+                constant &= value
+        if op == AND and constant == 0:
+            return self.constant(0)
+
+        heap = [(self.depths[node], node) for node in variables]
+        heapq.heapify(heap)
+        while len(heap) > 1:
+            _, a = heapq.heappop(heap)
+            _, b = heapq.heappop(heap)
+            wire = self.gate(op, Wire(self, a), Wire(self, b))
+            heapq.heappush(heap, (self.depths[wire.node], wire.node))
+
+        if not heap:
+            return self.constant(constant)
+        wire = Wire(self, heap[0][1])
+        return wire ^ 1 if op == XOR and constant == 1 else wire
+
+    def evaluate(self, inputs: dict) -> dict:
+        """
+        Evaluate the circuit gate by gate in topological order, dropping every intermediate result after its last use.
+        :param inputs: values of the inputs by name: Ciphertexts, or plaintext bits to evaluate the circuit in the
+        clear. Multi-bit inputs are indexed along their last axis, so a 2D Ciphertext of encrypt_batch evaluates the
+        circuit for every plaintext at once.
+        :return: values of the outputs by name, multi-bit outputs stacked along a new last axis
+        """
+        fanouts = self._fanouts()
+        values = {}
+
+        for i, node in enumerate(self.nodes):
+            if fanouts[i] == 0:
+                continue
+            if node[0] == INPUT:
+                value = inputs[node[1]]
+                values[i] = value if node[2] is None else value[..., node[2]]
+            elif node[0] == CONSTANT:
+                values[i] = node[1]
+            else:
+                a, b = values[node[1]], values[node[2]]
+                values[i] = a ^ b if node[0] == XOR else a & b
+                for j in node[1:]:
+                    fanouts[j] -= 1
+                    if fanouts[j] == 0:
+                        del values[j]
+
+        outputs = {}
+        for name, output in self.outputs.items():
+            if not isinstance(output, list):
+                outputs[name] = values[output.node]
+                continue
+            bits = [values[wire.node] for wire in output]
+            if any(isinstance(bit, Ciphertext) for bit in bits):
+                outputs[name] = Ciphertext.stack(bits)
+            else:
+                outputs[name] = np.stack(np.broadcast_arrays(*bits), axis=-1)
+        return outputs
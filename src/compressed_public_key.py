@@ -0,0 +1,167 @@
+from typing import Optional, Iterator, Tuple
+import numpy as np
+from src import randomness, backend, reduction
+from src.bit_codec import int2binary_array, int2binary_matrix
+from src.somewhat_homomorphic_encryption import randint, private_key, noise
+
+
+class CompressedPublicKey:
+    """
+    Public key in the style of Coron, Naccache and Tibouchi. Each integer x_i = chi_i - delta_i for i >= 1, where
+    chi_i is a pseudo-random integer of int_size bits derived from a seed and delta_i = (chi_i mod p) + xi_i * p - r_i
+    is the stored correction that makes x_i = p * (chi_i // p - xi_i) + r_i. Only the seed, x0 and the corrections of
+    about private key size plus SECURITY_MARGIN bits are stored instead of the int_size-bit integers.
+    """
+
+    def __init__(self,
+                 seed: bytes,
+                 int_size: int,
+                 x0: int,
+                 corrections: np.ndarray):
+        """
+        :param seed: seed the integers chi_i are derived from
+        :param int_size: bit size of chi_i
+        :param x0: first integer of the public key
+        :param corrections: 1D array of delta_i for i = 1, ..., size - 1
+        """
+        self.seed = seed
+        self.int_size = int_size
+        self.x0 = x0
+        self.corrections = corrections
+
+    def __len__(self) -> int:
+        return len(self.corrections) + 1
+
+    def chi(self, indices: range) -> np.ndarray:
+        """
+        :param indices: indices i >= 1 of integers of the public key
+        :return: 1D array of the pseudo-random integers chi_i
+        """
+        source = randomness.SeededRandomSource(self.seed)
+        return backend.asarray([source.spawn(i).randbits(self.int_size, 1)[0] for i in indices])
+
+    def integers(self, indices: range) -> np.ndarray:
+        """
+        :param indices: indices i >= 1 of integers of the public key
+        :return: 1D array of the integers x_i
+        """
+        return self.chi(indices) - self.corrections[indices.start - 1:indices.stop - 1]
+
+    def chunks(self, chunk_size: int = 256) -> Iterator[np.ndarray]:
+        """
+        :param chunk_size: number of integers per chunk
+        :return: iterator over consecutive chunks of public_key[1:], so that only one chunk is in memory at a time
+        """
+        for start in range(1, len(self), chunk_size):
+            yield self.integers(range(start, min(start + chunk_size, len(self))))
+
+    def expand(self) -> np.ndarray:
+        """
+        :return: the whole public key, as accepted by somewhat_homomorphic_encryption.encrypt
+        """
+        key = np.empty(len(self), dtype=object)
+        key[0] = backend.integer(self.x0)
+        key[1:] = self.integers(range(1, len(self)))
+        return key
+
+    def num_bytes(self) -> int:
+        """
+        :return: number of bytes of the seed, x0 and the corrections
+        """
+        corrections = sum((int(delta).bit_length() + 8) // 8 for delta in self.corrections)
+        return len(self.seed) + (int(self.x0).bit_length() + 7) // 8 + corrections
+
+
+def compressed_public_key(size: int,
+                          int_size: int,
+                          noise_size: int,
+                          private_key: int,
+                          seed: Optional[bytes] = None) -> CompressedPublicKey:
+    """
+    Generate a compressed public key with the same integers x_i = p * q_i + r_i, r_i from [0, 2^noise_size), as
+    somewhat_homomorphic_encryption.public_key, except that x0 is drawn from [2^{int_size - 1}, 2^{int_size}) and the
+    other integers are not bounded by it.
+    :param size: number of integers in the public key
+    :param int_size: bit size of the integers in the public key
+    :param noise_size: bit size of noise
+    :param private_key: private key
+    :param seed: seed of the integers chi_i. If None, 32 bytes from the current random source.
+    :return: CompressedPublicKey
+    """
+    p = private_key
+    if (2 ** (int_size - 1)) // p < 1 or 2 ** noise_size > p:
+        raise ValueError("%d-bit public key integers with %d-bit noise cannot be compressed for a %d-bit private key"
+                         % (int_size, noise_size, int(p).bit_length()))
+    seed = randomness.get_source().randbytes(32) if seed is None else seed
+
+    # x0 is odd and its noise even, like the largest integer of an uncompressed public key.
+    while True:
+        x0 = p * randint(-(-(2 ** (int_size - 1)) // p), (2 ** int_size) // p) + randint(0, 2 ** noise_size)
+        if x0 % 2 == 1 and (x0 % p) % 2 == 0:
+            break
+
+    key = CompressedPublicKey(seed, int_size, x0, np.empty(0, dtype=object))
+    chi = key.chi(range(1, size))
+    xi = randint(0, 2 ** (randomness.SECURITY_MARGIN + int(p).bit_length()) // p, length=size - 1)
+    key.corrections = chi % p + xi * p - noise(noise_size, size - 1)
+    return key
+
+
+def key(private_key_length: int,
+        public_key_length: int,
+        public_key_bits: int,
+        primary_noise_size: int,
+        seed: Optional[bytes] = None) -> Tuple[int, CompressedPublicKey]:
+    k = private_key(private_key_length)
+    return k, compressed_public_key(public_key_length, public_key_bits, primary_noise_size, k, seed)
+
+
+def selected_sum(public_key: CompressedPublicKey,
+                 num: int,
+                 chunk_size: int = 256) -> np.ndarray:
+    """
+    Sum random subsets of public_key[1:] while regenerating it chunk by chunk.
+    :param public_key: CompressedPublicKey
+    :param num: number of subset sums
+    :param chunk_size: number of integers of the public key in memory at a time
+    :return: 1D array of shape (num,) of sums of random subsets
+    """
+    sums = backend.asarray(np.zeros(num, dtype=object))
+    for integers in public_key.chunks(chunk_size):
+        sums = sums + backend.subset_sum(randomness.random_bits((num, len(integers))), integers)
+    return sums
+
+
+def encrypt(plaintext: int,
+            public_key: CompressedPublicKey,
+            secondary_noise_size: int,
+            width: Optional[int] = None,
+            signed: bool = False,
+            chunk_size: int = 256) -> np.ndarray:
+    """
+    Encrypt like somewhat_homomorphic_encryption.encrypt without expanding the compressed public key.
+    :param chunk_size: number of integers of the public key in memory at a time
+    :return: 1D numpy array of encryption of each bit of plaintext, decrypted by somewhat_homomorphic_encryption.decrypt
+    """
+    bits = int2binary_array(plaintext, width, signed)
+    return reduction.reducer(public_key.x0).reduce(bits
+                                                   + 2 * noise(secondary_noise_size, len(bits))
+                                                   + 2 * selected_sum(public_key, len(bits), chunk_size))
+
+
+def encrypt_batch(plaintexts,
+                  public_key: CompressedPublicKey,
+                  secondary_noise_size: int,
+                  width: int,
+                  signed: bool = False,
+                  chunk_size: int = 256) -> np.ndarray:
+    """
+    Encrypt like somewhat_homomorphic_encryption.encrypt_batch without expanding the compressed public key.
+    :param chunk_size: number of integers of the public key in memory at a time
+    :return: 2D numpy array of shape (len(plaintexts), width)
+    """
+    bits = int2binary_matrix(plaintexts, width, signed)
+    shape = bits.shape
+    return reduction.reducer(public_key.x0).reduce(bits
+                                                   + 2 * noise(secondary_noise_size, bits.size).reshape(shape)
+                                                   + 2 * selected_sum(public_key, bits.size, chunk_size).reshape(shape))
@@ -0,0 +1,196 @@
+from typing import Optional
+import collections
+import threading
+import time
+import numpy as np
+from src import reduction, somewhat_homomorphic_encryption
+from src.bit_codec import int2binary_array, int2binary_matrix
+from src.subset_sum import SubsetSumTable
+
+
+class EncryptionPool:
+    """
+    Bounded buffer of fresh encryptions of zero under a public key, filled by a background thread while the pool is
+    idle. Encrypting a bit m then only takes an encryption of zero c from the buffer and computes (m + c) % x0. When
+    the buffer is drained, the missing encryptions of zero are generated synchronously.
+    Every encryption of zero is used at most once.
+    """
+
+    def __init__(self,
+                 public_key: np.ndarray,
+                 secondary_noise_size: int,
+                 capacity: int = 4096,
+                 batch_size: int = 256,
+                 table: Optional[SubsetSumTable] = None,
+                 start: bool = True):
+        """
+        :param public_key: 1D array public key
+        :param secondary_noise_size: bit size of noise
+        :param capacity: maximum number of encryptions of zero held in the buffer
+        :param batch_size: number of encryptions of zero the background thread generates at a time
+        :param table: subset_sum_table of the public key, if precomputed
+        :param start: whether to start filling the buffer right away
+        """
+        assert 0 < batch_size <= capacity
+        self.public_key = public_key
+        self.secondary_noise_size = secondary_noise_size
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.table = table
+
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self._generation_seconds = 0.0
+
+        self._buffer = collections.deque()
+        self._condition = threading.Condition()
+        self._stopped = True
+        self._thread = None
+        if start:
+            self.start()
+
+    def start(self) -> None:
+        """
+        Start filling the buffer in a background thread.
+        """
+        with self._condition:
+            if not self._stopped:
+                return
+            self._stopped = False
+        self._thread = threading.Thread(target=self._fill, name='EncryptionPool', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background thread. Encryption keeps working by generating encryptions of zero synchronously.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'EncryptionPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _generate(self, num: int) -> np.ndarray:
+        """
+        :param num: number of encryptions of zero
+        :return: 1D array of "num" fresh encryptions of zero
+        """
+        return somewhat_homomorphic_encryption.encryptions_of_zero(num,
+                                                                   self.public_key,
+                                                                   self.secondary_noise_size,
+                                                                   self.table)
+
+    def _fill(self) -> None:
+        """
+        Body of the background thread: generate batches of encryptions of zero while the buffer has room for them.
+        """
+        while True:
+            with self._condition:
+                while not self._stopped and len(self._buffer) + self.batch_size > self.capacity:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+
+            start = time.perf_counter()
+            batch = self._generate(self.batch_size)
+            elapsed = time.perf_counter() - start
+
+            with self._condition:
+                self._buffer.extend(batch)
+                self.generated += len(batch)
+                self._generation_seconds += elapsed
+                self._condition.notify_all()
+
+    def size(self) -> int:
+        """
+        :return: number of encryptions of zero currently in the buffer
+        """
+        with self._condition:
+            return len(self._buffer)
+
+    def refill_rate(self) -> float:
+        """
+        :return: encryptions of zero the background thread generates per second of generation time
+        """
+        with self._condition:
+            return self.generated / self._generation_seconds if self._generation_seconds > 0 else 0.0
+
+    def stats(self) -> dict:
+        """
+        :return: buffer size, capacity, hits and misses, i.e. encryptions of zero taken from the buffer and generated
+        synchronously, number generated in the background and the refill rate
+        """
+        with self._condition:
+            size = len(self._buffer)
+            hits, misses, generated = self.hits, self.misses, self.generated
+        return {'size': size,
+                'capacity': self.capacity,
+                'hits': hits,
+                'misses': misses,
+                'generated': generated,
+                'refill_rate': self.refill_rate()}
+
+    def wait_until_full(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the background thread cannot add another batch to the buffer.
+        :param timeout: maximum number of seconds to wait, or None to wait indefinitely
+        :return: whether the buffer is full
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self._buffer) + self.batch_size > self.capacity, timeout)
+
+    def take(self, num: int) -> np.ndarray:
+        """
+        Remove "num" encryptions of zero from the buffer, generating those it is short of synchronously.
+        :param num: number of encryptions of zero
+        :return: 1D array of "num" encryptions of zero
+        """
+        with self._condition:
+            hits = min(num, len(self._buffer))
+            pooled = [self._buffer.popleft() for _ in range(hits)]
+            self.hits += hits
+            self.misses += num - hits
+            self._condition.notify_all()
+
+        zeros = np.empty(num, dtype=somewhat_homomorphic_encryption.ciphertext_dtype(self.public_key,
+                                                                                    self.secondary_noise_size))
+        zeros[:hits] = pooled
+        if hits < num:
+            zeros[hits:] = self._generate(num - hits)
+        return zeros
+
+    def encrypt(self,
+                plaintext: int,
+                width: Optional[int] = None,
+                signed: bool = False) -> np.ndarray:
+        """
+        Encrypt like somewhat_homomorphic_encryption.encrypt with encryptions of zero from the pool.
+        :param plaintext: an integer to encrypt
+        :param width: number of bits the plaintext is encrypted as. If None, the fewest bits representing the plaintext.
+        :param signed: whether to encrypt a negative plaintext in two's complement. Requires "width".
+        :return: 1D numpy array of encryption of each bit of plaintext
+        """
+        bits = int2binary_array(plaintext, width, signed)
+        return reduction.reducer(self.public_key[0]).reduce(bits + self.take(len(bits)))
+
+    def encrypt_batch(self,
+                      plaintexts,
+                      width: int,
+                      signed: bool = False) -> np.ndarray:
+        """
+        Encrypt like somewhat_homomorphic_encryption.encrypt_batch with encryptions of zero from the pool.
+        :param plaintexts: 1D sequence of non-negative integers smaller than 2^width
+        :param width: number of bits every plaintext is encrypted as
+        :param signed: whether to encrypt negative plaintexts in two's complement
+        :return: 2D numpy array of shape (len(plaintexts), width)
+        """
+        bits = int2binary_matrix(plaintexts, width, signed)
+        return reduction.reducer(self.public_key[0]).reduce(bits + self.take(bits.size).reshape(bits.shape))
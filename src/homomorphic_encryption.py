@@ -1,6 +1,14 @@
 import numpy as np
-from typing import Union, Tuple, Any
+from typing import Union, Tuple, Any, Optional, Dict
 from numpy import signedinteger, long
+import functools
+import time
+from src.bit_codec import binary_array2int
+from src import backend, reduction, somewhat_homomorphic_encryption
+from src.somewhat_homomorphic_encryption import randint
+from src.ciphertext import Ciphertext
+from src.circuit import Circuit
+from src.integer_arithmetic import add_many
 
 
 def private_key_candidate(num_bits: int) -> int:
@@ -8,15 +16,24 @@ def private_key_candidate(num_bits: int) -> int:
 
 
 def somehwat_homomorphic_private_key(num_bits: int) -> int:
-    key = private_key_candidate(num_bits)
-    while key % 2 == 0:
-        key = private_key_candidate(num_bits)
-    return key
+    # np.random cannot draw the integers of more than 63 bits bootstrapping needs.
+    return somewhat_homomorphic_encryption.private_key(num_bits)
 
 
 def private_key(num_bits: int,
                 hamming_weight: int) -> np.ndarray:
-    return np.random.choice(num_bits, size=hamming_weight, replace=False)
+    """
+    Generate the sparse subset with one index in each of "hamming_weight" boxes of num_bits / hamming_weight
+    consecutive indices, so that the selected z_i of a box is the XOR of the products of its bits, which costs no
+    multiplication when recrypting.
+    :param num_bits: number of integers of the secondary public key
+    :param hamming_weight: size of the subset
+    :return: 1D array of the sorted indices of the subset
+    """
+    if hamming_weight < 1 or num_bits % hamming_weight != 0:
+        raise ValueError("%d integers cannot be split into %d boxes of the same size" % (num_bits, hamming_weight))
+    box_size = num_bits // hamming_weight
+    return np.array([k * box_size + int(randint(0, box_size)) for k in range(hamming_weight)])
 
 
 def public_key_candidate(size: int,
@@ -42,24 +59,85 @@ def move_max(key: np.ndarray,
 def primary_public_key(int_num: int,
                        int_size: int,
                        noise_size: int,
-                       somewhat_homomorphic_private_key: int) -> np.ndarray:
-    key, max_index = public_key_candidate(int_num, int_size, noise_size, somewhat_homomorphic_private_key)
-    while key[max_index] % 2 == 0 or key[max_index] % somewhat_homomorphic_private_key == 1:
-        key, max_index = public_key_candidate(int_num, int_size, noise_size, somewhat_homomorphic_private_key)
-
-    move_max(key, max_index)
-
-    return key
+                       somewhat_homomorphic_private_key: int,
+                       return_attempts: bool = False,
+                       workers: Optional[int] = None) -> Union[np.ndarray, Tuple[np.ndarray, int]]:
+    """
+    Generate the public key with x0 = p * q0 without noise, see somewhat_homomorphic_encryption.error_free_x0, since
+    recrypting reduces products of about 2^int_size times x0 modulo x0, which would multiply its noise. The other
+    integers are p * q_i + r_i with q_i from [0, q0) and non-negative noise r_i from [0, 2^noise_size), like
+    somewhat_homomorphic_encryption.noise.
+    :param int_num: number of integers in the public key, x0 included
+    :param int_size: bit size of x0
+    :param noise_size: bit size of noise
+    :param somewhat_homomorphic_private_key: private key p
+    :param return_attempts: whether to also return the number of keys sampled, always 1 as no key is rejected
+    :param workers: number of processes to sample the key in, see somewhat_homomorphic_encryption.public_key
+    :return: 1D object array public key, x0 first, and the number of keys sampled if return_attempts
+    """
+    key = somewhat_homomorphic_encryption.public_key(int_num, int_size, noise_size, somewhat_homomorphic_private_key,
+                                                     workers=workers, error_free=True)
+    key = backend.asarray(key.astype(object))
+    return (key, 1) if return_attempts else key
 
 
 def secondary_public_key(int_num: int,
                          int_size: int,
                          private_key: np.ndarray,
                          somewhat_homomorphic_private_key: int) -> np.ndarray:
-    u = np.random.randint(0, 2 ** (int_size + 1), size=int_num)
-    u[private_key[-1]] = ((np.sum(u[private_key[:-1]]) % (2 ** (int_size + 1)))
-                          - np.round((2 ** int_size) / somewhat_homomorphic_private_key))
-    return u / (2 ** int_size)
+    """
+    Generate the fixed-point numbers y_i = u_i / 2^int_size from [0, 2) such that the y_i indexed by the private key
+    sum to 1 / p modulo 2, up to 2^{-int_size - 1}. The y_i are stored exactly as the integers u_i, since float64
+    keeps only 53 bits of them.
+    :param int_num: number of integers
+    :param int_size: number of fractional bits kappa of y_i
+    :param private_key: indices of the sparse subset
+    :param somewhat_homomorphic_private_key: p
+    :return: 1D object array of integers u_i from [0, 2^{int_size + 1})
+    """
+    p = somewhat_homomorphic_private_key
+    u = randint(0, 2 ** (int_size + 1), length=int_num)
+    u[private_key[-1]] = (((2 ** (int_size + 1) + p) // (2 * p) - np.sum(u[private_key[:-1]]))
+                          % (2 ** (int_size + 1)))
+    return u
+
+
+def expand_ciphertext(ciphertext: np.ndarray,
+                      secondary_public_key: np.ndarray,
+                      int_size: int,
+                      precision: Optional[int] = None) -> np.ndarray:
+    """
+    Compute z_i = c * y_i mod 2 for every ciphertext c and every y_i at once, truncated to "precision" fractional
+    bits, in exact integer arithmetic.
+    :param ciphertext: array of ciphertexts
+    :param secondary_public_key: integers u_i of secondary_public_key
+    :param int_size: number of fractional bits kappa of y_i
+    :param precision: number of fractional bits of z_i, at most int_size. If None, int_size.
+    :return: array of shape ciphertext.shape + (len(secondary_public_key),) of the integers 2^precision * z_i, native
+    if they fit
+    """
+    precision = int_size if precision is None else precision
+    assert 0 <= precision <= int_size
+    products = backend.asarray(ciphertext)[..., np.newaxis] * backend.asarray(secondary_public_key)
+    z = (products % (2 ** (int_size + 1))) >> (int_size - precision)
+    return z.astype(np.int64) if precision + 1 <= backend.NATIVE_BITS else z
+
+
+def decrypt_expanded(ciphertext: np.ndarray,
+                     expanded_ciphertext: np.ndarray,
+                     private_key: np.ndarray,
+                     precision: int) -> np.ndarray:
+    """
+    Decrypt with the squashed decryption [c]_2 XOR [round(sum_{i in S} z_i)]_2.
+    :param ciphertext: array of ciphertexts
+    :param expanded_ciphertext: output of expand_ciphertext
+    :param private_key: indices S of the sparse subset
+    :param precision: number of fractional bits of the expanded ciphertext
+    :return: int array of the decrypted bits
+    """
+    total = np.sum(expanded_ciphertext[..., private_key], axis=-1)
+    rounded = (total + 2 ** precision // 2) >> precision if precision > 0 else total
+    return ((backend.asarray(ciphertext) % 2 + rounded) % 2).astype(int)
 
 
 def public_key(primary_int_num: int,
@@ -68,12 +146,14 @@ def public_key(primary_int_num: int,
                secondary_int_num: int,
                secondary_int_size: int,
                private_key: np.ndarray,
-               somewhat_homomorphic_private_key_length: int) -> Tuple[np.ndarray, np.ndarray]:
+               somewhat_homomorphic_private_key_length: int,
+               workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
     k = somehwat_homomorphic_private_key(somewhat_homomorphic_private_key_length)
     return (primary_public_key(primary_int_num,
                                primary_int_size,
                                noise_size,
-                               k),
+                               k,
+                               workers=workers),
             secondary_public_key(secondary_int_num,
                                  secondary_int_size,
                                  private_key,
@@ -86,7 +166,8 @@ def key(private_key_int_num: int,
         primary_public_key_int_num: int,
         primary_public_key_int_size: int,
         noise_size: int,
-        secondary_int_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        secondary_int_size: int,
+        workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     priv_k = private_key(private_key_int_num, hamming_weight)
     return priv_k, *public_key(primary_public_key_int_num,
                                primary_public_key_int_size,
@@ -94,7 +175,8 @@ def key(private_key_int_num: int,
                                private_key_int_num,
                                secondary_int_size,
                                priv_k,
-                               somewhat_homomorphic_private_key_length)
+                               somewhat_homomorphic_private_key_length,
+                               workers)
 
 
 def noise(noise_size: int,
@@ -107,33 +189,170 @@ def selected_sum(numbers: np.ndarray,
     return np.random.choice([0, 1], size=(num, len(numbers))) @ numbers
 
 
-def int2binary_array(plaintext: int) -> np.ndarray:
-    return np.array(list(map(int, bin(plaintext)[2:])))
-
-
 def somewhat_homomorphic_encrypt(plaintext: int,
                                  public_key: np.ndarray,
-                                 secondary_noise_size: int) -> np.ndarray:
-    bits = int2binary_array(plaintext)
-
-    return ((bits
-             + 2 * noise(secondary_noise_size, bits.shape)
-             + 2 * selected_sum(public_key[1:], len(bits)))
-            % public_key[0])
+                                 secondary_noise_size: int,
+                                 width: Optional[int] = None,
+                                 signed: bool = False) -> np.ndarray:
+    return somewhat_homomorphic_encryption.encrypt(plaintext, public_key, secondary_noise_size, width, signed)
 
 
 def encrypt(plaintext: int,
             primary_public_key: np.ndarray,
             secondary_noise_size: int,
-            secondary_public_key: np.ndarray) -> np.ndarray:
-    ciphertext = somewhat_homomorphic_encrypt(plaintext, primary_public_key, secondary_noise_size)
-
-
-def binary_array2int(bits) -> int:
-    return int(''.join(map(str, bits)), 2)
+            width: Optional[int] = None,
+            signed: bool = False) -> Ciphertext:
+    """
+    Encrypt with the primary public key. The ciphertext is expanded with the secondary public key when it is
+    recrypted, see RecryptEngine.
+    :return: 1D Ciphertext of the bits of "plaintext"
+    """
+    return Ciphertext(somewhat_homomorphic_encrypt(plaintext, primary_public_key, secondary_noise_size, width, signed),
+                      primary_public_key[0])
+
+
+@functools.lru_cache(maxsize=None)
+def decryption_circuit(hamming_weight: int,
+                       precision: int) -> Circuit:
+    """
+    Squashed decryption circuit [c]_2 XOR [round(sum_k box_k)]_2, where box_k is the selected z_i of the k-th box of
+    the private key.
+    :param hamming_weight: number of boxes
+    :param precision: number of fractional bits of z_i
+    :return: optimized Circuit with the inputs "box0", "box1", ... of precision + 1 bits, most significant bit first,
+    and "parity", and the output "bit"
+    """
+    circuit = Circuit()
+    boxes = [circuit.inputs('box%d' % k, precision + 1) for k in range(hamming_weight)]
+    # Adding one half rounds the sum; its bit of weight 1 is the most significant bit modulo 2.
+    total = add_many(circuit, boxes, constant=2 ** (precision - 1))
+    circuit.output('bit', total[0] ^ circuit.input('parity'))
+    return circuit.optimize()
+
+
+class RecryptEngine:
+    """
+    Refresh ciphertexts by evaluating the squashed decryption circuit on them with the private key encrypted under
+    the primary public key, which resets their noise to that of the circuit, so that circuits of any depth can be
+    evaluated by recrypting before the noise exceeds the private key.
+
+    Recrypting has three phases, timed separately:
+    - expand: z_i = c * y_i mod 2 with "precision" = log2(hamming_weight) + 3 fractional bits, in the clear
+    - subset: the bits of sum_i s_i * z_i of every box, sums of encrypted s_i selected by the plaintext bits of z_i
+    - circuit: decryption_circuit of the boxes, of AND depth logarithmic in hamming_weight and precision
+    """
+
+    def __init__(self,
+                 primary_public_key: np.ndarray,
+                 secondary_public_key: np.ndarray,
+                 secondary_int_size: int,
+                 encrypted_private_key: np.ndarray,
+                 hamming_weight: int):
+        """
+        :param primary_public_key: primary public key, whose x0 is a multiple of p
+        :param secondary_public_key: integers u_i of secondary_public_key
+        :param secondary_int_size: number of fractional bits of the secondary public key, at least the bit size of
+        ciphertexts plus precision
+        :param encrypted_private_key: encryptions under the primary public key of the bits s_i, which are 1 exactly
+        at the indices of the private key
+        :param hamming_weight: number of indices of the private key
+        """
+        self.primary_public_key = primary_public_key
+        self.secondary_public_key = secondary_public_key
+        self.secondary_int_size = secondary_int_size
+        self.encrypted_private_key = backend.asarray(encrypted_private_key)
+        self.hamming_weight = hamming_weight
+        self.box_size = len(secondary_public_key) // hamming_weight
+        self.precision = (hamming_weight - 1).bit_length() + 3
+        # Recrypted ciphertexts are reduced modulo x0, and the error of the y_i times them must stay below
+        # 2^{-precision}.
+        min_int_size = int(primary_public_key[0]).bit_length() + self.precision
+        if secondary_int_size < min_int_size:
+            raise ValueError("%d fractional bits of the secondary public key are too few for %d-bit ciphertexts and "
+                             "%d bits of precision" % (secondary_int_size, int(primary_public_key[0]).bit_length(),
+                                                       self.precision))
+        self.circuit = decryption_circuit(hamming_weight, self.precision)
+        self._stats = {'recrypts': 0, 'bits': 0, 'expand': 0.0, 'subset': 0.0, 'circuit': 0.0}
+
+    def boxes(self, values: np.ndarray) -> Dict[str, Ciphertext]:
+        """
+        :param values: array of ciphertexts
+        :return: inputs of decryption_circuit but "parity", Ciphertexts of shape values.shape + (precision + 1,)
+        """
+        start = time.perf_counter()
+        z = expand_ciphertext(values, self.secondary_public_key, self.secondary_int_size, self.precision)
+        # Bits of z_i along a new last axis, most significant first, then swapped in front of the indices i.
+        bits = np.swapaxes((z[..., np.newaxis] >> np.arange(self.precision, -1, -1)) & 1, -1, -2)
+        expanded = time.perf_counter()
+
+        modulus = self.primary_public_key[0]
+        bit_bound = int(modulus).bit_length() + self.box_size.bit_length()
+        boxes = {}
+        for k in range(self.hamming_weight):
+            box = slice(k * self.box_size, (k + 1) * self.box_size)
+            boxes['box%d' % k] = Ciphertext(backend.subset_sum(bits[..., box], self.encrypted_private_key[box]),
+                                            modulus, bit_bound=bit_bound)
+        self._stats['expand'] += expanded - start
+        self._stats['subset'] += time.perf_counter() - expanded
+        return boxes
+
+    def recrypt(self, ciphertext: Union[Ciphertext, np.ndarray]) -> Ciphertext:
+        """
+        :param ciphertext: Ciphertext or array of ciphertexts whose noise is below a quarter of p
+        :return: Ciphertext of the same shape and bits, reduced modulo x0, with the noise of decryption_circuit
+        """
+        values = ciphertext.values if isinstance(ciphertext, Ciphertext) else np.asarray(ciphertext)
+        values = reduction.reducer(self.primary_public_key[0]).reduce(backend.asarray(values))
+        inputs = self.boxes(values)
+        inputs['parity'] = (values % 2).astype(np.int64)
+
+        start = time.perf_counter()
+        result = self.circuit.evaluate(inputs)['bit'].reduce()
+        self._stats['circuit'] += time.perf_counter() - start
+        self._stats['recrypts'] += 1
+        self._stats['bits'] += values.size
+        return result
+
+    def stats(self) -> dict:
+        """
+        :return: number of recrypt calls and bits recrypted, the seconds spent in every phase, and the seconds per
+        recrypted bit
+        """
+        seconds = self._stats['expand'] + self._stats['subset'] + self._stats['circuit']
+        return dict(self._stats, seconds=seconds,
+                    seconds_per_bit=seconds / self._stats['bits'] if self._stats['bits'] > 0 else 0.0)
+
+
+def recrypt_engine(private_key: np.ndarray,
+                   primary_public_key: np.ndarray,
+                   secondary_public_key: np.ndarray,
+                   secondary_int_size: int,
+                   secondary_noise_size: int) -> RecryptEngine:
+    """
+    :param private_key: sparse subset of private_key
+    :param primary_public_key: primary public key
+    :param secondary_public_key: integers u_i of secondary_public_key
+    :param secondary_int_size: number of fractional bits of the secondary public key
+    :param secondary_noise_size: bit size of the noise of the encryptions of the private key
+    :return: RecryptEngine with the private key encrypted bit by bit under the primary public key
+    """
+    indicator = np.zeros(len(secondary_public_key), dtype=np.int64)
+    indicator[private_key] = 1
+    encrypted_private_key = somewhat_homomorphic_encryption.encrypt(binary_array2int(indicator), primary_public_key,
+                                                                   secondary_noise_size, len(indicator))
+    return RecryptEngine(primary_public_key, secondary_public_key, secondary_int_size, encrypted_private_key,
+                         len(private_key))
 
 
 def decrypt(private_key: int,
-            ciphertext: np.ndarray) -> int:
-    bits = ciphertext % private_key % 2
-    return binary_array2int(bits)
+            ciphertext: Union[Ciphertext, np.ndarray],
+            signed: bool = False) -> int:
+    """
+    :param private_key: somewhat homomorphic private key p
+    :param ciphertext: Ciphertext of encrypt, or 1D array of ciphertexts
+    :param signed: whether the plaintext was encrypted in two's complement
+    :return: plaintext
+    """
+    values = ciphertext.values if isinstance(ciphertext, Ciphertext) else ciphertext
+    bits = reduction.reducer(private_key).centered(backend.asarray(values)) % 2
+    return binary_array2int(bits, signed)
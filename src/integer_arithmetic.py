@@ -0,0 +1,353 @@
+from typing import List, Dict, Optional, Tuple
+import functools
+from src.circuit import Circuit, Wire, XOR, AND
+from src.ciphertext import Ciphertext
+
+# Integers are lists of wires, most significant bit first like the output of encrypt. Helpers prefixed with _lsb work
+# on lists with the least significant bit first.
+
+
+def _depth(wire: Wire) -> int:
+    return wire.circuit.depths[wire.node]
+
+
+def _combine(high: Tuple[Wire, Wire],
+             low: Tuple[Wire, Wire]) -> Tuple[Wire, Wire]:
+    """
+    Combine the (generate, propagate) bits of two adjacent groups of bits. A group cannot both generate and propagate
+    a carry, so the OR of the carry generated by the high group and the carry it propagates from the low group is an
+    XOR, which costs no AND depth.
+    :param high: (generate, propagate) of the more significant group
+    :param low: (generate, propagate) of the less significant group
+    :return: (generate, propagate) of both groups
+    """
+    return high[0] ^ (high[1] & low[0]), high[1] & low[1]
+
+
+def _lsb_generate_propagate(circuit: Circuit,
+                            a: List[Wire],
+                            b: List[Wire],
+                            carry_in: Wire) -> Tuple[List[Wire], List[Wire]]:
+    """
+    :return: generate and propagate bits of a + b, with the carry in folded into the least significant bit
+    """
+    generate = [x & y for x, y in zip(a, b)]
+    propagate = [x ^ y for x, y in zip(a, b)]
+    generate[0] = generate[0] ^ (propagate[0] & carry_in)
+    return generate, propagate
+
+
+def _lsb_carries(generate: List[Wire],
+                 propagate: List[Wire]) -> List[Wire]:
+    """
+    Kogge-Stone parallel prefix: after round k, bit i combines the 2^k bits up to i, so all carries are known after
+    log2(width) rounds of one AND each.
+    :return: carry out of bits 0..i for every i
+    """
+    groups = list(zip(generate, propagate))
+    distance = 1
+    while distance < len(groups):
+        groups = groups[:distance] + [_combine(groups[i], groups[i - distance])
+                                      for i in range(distance, len(groups))]
+        distance *= 2
+    return [group[0] for group in groups]
+
+
+def _lsb_carry_out(generate: List[Wire],
+                   propagate: List[Wire]) -> Wire:
+    """
+    :return: carry out of all bits, combining the groups as a balanced tree
+    """
+    groups = list(zip(generate, propagate))
+    while len(groups) > 1:
+        groups = [_combine(groups[i + 1], groups[i]) if i + 1 < len(groups) else groups[i]
+                  for i in range(0, len(groups), 2)]
+    return groups[0][0]
+
+
+def _add(circuit: Circuit,
+         a: List[Wire],
+         b: List[Wire],
+         carry_in: int = 0) -> List[Wire]:
+    assert len(a) == len(b)
+    a, b = a[::-1], b[::-1]
+    carry_in = circuit.constant(carry_in)
+    generate, propagate = _lsb_generate_propagate(circuit, a, b, carry_in)
+    carries = [carry_in] + _lsb_carries(generate, propagate)[:-1]
+    return [p ^ c for p, c in zip(propagate, carries)][::-1]
+
+
+def add(circuit: Circuit,
+        a: List[Wire],
+        b: List[Wire],
+        signed: bool = False) -> List[Wire]:
+    """
+    Add with a Kogge-Stone adder of AND depth log2(width) + 1.
+    :param circuit: circuit of the wires
+    :param a: integer of "width" bits
+    :param b: integer of "width" bits
+    :param signed: unused, two's complement addition is the same as unsigned addition
+    :return: (a + b) mod 2^width
+    """
+    return _add(circuit, a, b)
+
+
+def subtract(circuit: Circuit,
+             a: List[Wire],
+             b: List[Wire],
+             signed: bool = False) -> List[Wire]:
+    """
+    Subtract as a + NOT b + 1 with a Kogge-Stone adder.
+    :param circuit: circuit of the wires
+    :param a: integer of "width" bits
+    :param b: integer of "width" bits
+    :param signed: unused, two's complement subtraction is the same as unsigned subtraction
+    :return: (a - b) mod 2^width
+    """
+    return _add(circuit, a, [~y for y in b], carry_in=1)
+
+
+def less_than(circuit: Circuit,
+              a: List[Wire],
+              b: List[Wire],
+              signed: bool = False) -> Wire:
+    """
+    a < b exactly if a + NOT b + 1 has no carry out, which is computed by a tree of AND depth log2(width) + 1.
+    :param circuit: circuit of the wires
+    :param a: integer of "width" bits
+    :param b: integer of "width" bits
+    :param signed: whether the integers are in two's complement
+    :return: bit of a < b
+    """
+    assert len(a) == len(b)
+    if signed:
+        # Flipping the sign bits maps two's complement integers to unsigned integers in the same order.
+        a, b = [~a[0]] + a[1:], [~b[0]] + b[1:]
+    a, b = a[::-1], [~y for y in b[::-1]]
+    generate, propagate = _lsb_generate_propagate(circuit, a, b, circuit.constant(1))
+    return ~_lsb_carry_out(generate, propagate)
+
+
+def greater_than(circuit: Circuit,
+                 a: List[Wire],
+                 b: List[Wire],
+                 signed: bool = False) -> Wire:
+    """
+    :return: bit of a > b, see less_than
+    """
+    return less_than(circuit, b, a, signed)
+
+
+def equal(circuit: Circuit,
+          a: List[Wire],
+          b: List[Wire],
+          signed: bool = False) -> Wire:
+    """
+    :param circuit: circuit of the wires
+    :param a: integer of "width" bits
+    :param b: integer of "width" bits
+    :param signed: unused
+    :return: bit of a == b, a balanced AND of equal bits of AND depth log2(width)
+    """
+    assert len(a) == len(b)
+    return circuit.chain(AND, [~(x ^ y) for x, y in zip(a, b)])
+
+
+def select(condition: Wire,
+           a: List[Wire],
+           b: List[Wire]) -> List[Wire]:
+    """
+    :return: a if condition else b, with one AND per bit
+    """
+    return [y ^ (condition & (x ^ y)) for x, y in zip(a, b)]
+
+
+def minimum(circuit: Circuit,
+            a: List[Wire],
+            b: List[Wire],
+            signed: bool = False) -> List[Wire]:
+    """
+    :return: the smaller of a and b, see less_than
+    """
+    return select(less_than(circuit, a, b, signed), a, b)
+
+
+def maximum(circuit: Circuit,
+            a: List[Wire],
+            b: List[Wire],
+            signed: bool = False) -> List[Wire]:
+    """
+    :return: the larger of a and b, see less_than
+    """
+    return select(less_than(circuit, a, b, signed), b, a)
+
+
+def _full_adder(x: Wire,
+                y: Wire,
+                z: Wire) -> Tuple[Wire, Wire]:
+    """
+    :return: sum and carry bits of x + y + z
+    """
+    partial = x ^ y
+    return partial ^ z, (x & y) ^ (z & partial)
+
+
+def _half_adder(x: Wire,
+                y: Wire) -> Tuple[Wire, Wire]:
+    """
+    :return: sum and carry bits of x + y
+    """
+    return x ^ y, x & y
+
+
+def _dadda_heights(max_height: int) -> List[int]:
+    """
+    :return: heights the columns of partial products are reduced to stage by stage, 2, 3, 4, 6, 9, 13, ... each at
+    most 3 / 2 times the next, largest first and all smaller than "max_height"
+    """
+    heights = [2]
+    while heights[-1] * 3 // 2 < max_height:
+        heights.append(heights[-1] * 3 // 2)
+    return heights[::-1]
+
+
+def _reduce_columns(circuit: Circuit,
+                    columns: List[List[Wire]]) -> List[Wire]:
+    """
+    Add the bits of every weight with a Wallace tree in Dadda's form: every stage reduces the bits of every weight to
+    the next of _dadda_heights with full and half adders of the shallowest bits, counting the carries coming from the
+    lower weight in the same stage, so that every stage costs one AND depth. The two remaining rows are added by a
+    Kogge-Stone adder.
+    :param circuit: circuit of the wires
+    :param columns: bits of every weight, least significant weight first
+    :return: sum of all bits times their weights modulo 2^len(columns), most significant bit first
+    """
+    width = len(columns)
+    columns = [list(column) for column in columns]
+    for height in _dadda_heights(max(len(column) for column in columns)):
+        carries = []
+        for k in range(width):
+            column = sorted(columns[k], key=_depth)
+            reduced, next_carries = [], []
+            excess = len(column) + len(carries) - height
+            while excess > 0:
+                if excess >= 2 and len(column) >= 3:
+                    total, carry = _full_adder(*column[:3])
+                    column, excess = column[3:], excess - 2
+                else:
+                    total, carry = _half_adder(*column[:2])
+                    column, excess = column[2:], excess - 1
+                reduced.append(total)
+                next_carries.append(carry)
+            columns[k] = reduced + column + carries
+            carries = next_carries
+
+    zero = circuit.constant(0)
+    rows = [[column[i] if i < len(column) else zero for column in columns][::-1] for i in range(2)]
+    return _add(circuit, rows[0], rows[1])
+
+
+def multiply(circuit: Circuit,
+             a: List[Wire],
+             b: List[Wire],
+             signed: bool = False,
+             width: Optional[int] = None) -> List[Wire]:
+    """
+    Multiply by adding the partial products with _reduce_columns.
+    :param circuit: circuit of the wires
+    :param a: integer
+    :param b: integer
+    :param signed: whether the integers are in two's complement
+    :param width: number of bits of the product. If None, len(a) + len(b), which holds every product.
+    :return: a * b mod 2^width
+    """
+    width = len(a) + len(b) if width is None else width
+    if signed:
+        a = [a[0]] * (width - len(a)) + a
+        b = [b[0]] * (width - len(b)) + b
+    a, b = a[::-1], b[::-1]
+
+    columns = [[] for _ in range(width)]
+    for i, x in enumerate(a):
+        for j, y in enumerate(b[:width - i]):
+            columns[i + j].append(x & y)
+    return _reduce_columns(circuit, columns)
+
+
+def add_many(circuit: Circuit,
+             integers: List[List[Wire]],
+             constant: int = 0) -> List[Wire]:
+    """
+    Add many integers at once with _reduce_columns, whose AND depth only grows logarithmically with their number.
+    :param circuit: circuit of the wires
+    :param integers: integers of "width" bits
+    :param constant: plaintext integer to add
+    :return: (sum of the integers + constant) mod 2^width
+    """
+    width = len(integers[0])
+    assert all(len(integer) == width for integer in integers)
+    columns = [[integer[width - 1 - k] for integer in integers] for k in range(width)]
+    for k in range(width):
+        if (constant >> k) & 1:
+            columns[k].append(circuit.constant(1))
+    return _reduce_columns(circuit, columns)
+
+
+OPERATIONS = {'add': add,
+              'subtract': subtract,
+              'multiply': multiply,
+              'less_than': less_than,
+              'greater_than': greater_than,
+              'equal': equal,
+              'minimum': minimum,
+              'maximum': maximum}
+
+
+@functools.lru_cache(maxsize=None)
+def compiled_circuit(operation: str,
+                     width: int,
+                     signed: bool = False) -> Circuit:
+    """
+    :param operation: name in OPERATIONS
+    :param width: number of bits of both operands
+    :param signed: whether the operands are in two's complement
+    :return: optimized Circuit with multi-bit inputs "a" and "b" and the output "result"
+    """
+    circuit = Circuit()
+    a, b = circuit.inputs('a', width), circuit.inputs('b', width)
+    circuit.output('result', OPERATIONS[operation](circuit, a, b, signed))
+    return circuit.optimize()
+
+
+def evaluate(operation: str,
+             a: Ciphertext,
+             b: Ciphertext,
+             signed: bool = False) -> Ciphertext:
+    """
+    :param operation: name in OPERATIONS
+    :param a: Ciphertext of an integer, or 2D Ciphertext of a batch of integers
+    :param b: Ciphertext of the same shape as "a"
+    :param signed: whether the integers are in two's complement
+    :return: Ciphertext of the result, a single bit per integer for comparisons
+    """
+    assert a.shape[-1] == b.shape[-1]
+    return compiled_circuit(operation, a.shape[-1], signed).evaluate({'a': a, 'b': b})['result']
+
+
+def report(width: int,
+           operations: Optional[List[str]] = None,
+           signed: bool = False) -> Dict[str, Dict[str, int]]:
+    """
+    Report the cost of operations on integers of a given width, e.g. to choose the parameters of a key.
+    :param width: number of bits of both operands
+    :param operations: names in OPERATIONS. If None, all operations.
+    :param signed: whether the operands are in two's complement
+    :return: AND depth, and numbers of AND and XOR gates of each operation
+    """
+    operations = list(OPERATIONS) if operations is None else operations
+    costs = {}
+    for operation in operations:
+        circuit = compiled_circuit(operation, width, signed)
+        counts = circuit.gate_counts()
+        costs[operation] = {'and_depth': circuit.depth(), 'and_gates': counts[AND], 'xor_gates': counts[XOR]}
+    return costs
@@ -0,0 +1,211 @@
+from typing import Optional, Tuple, Union
+import math
+import numpy as np
+from src import backend, reduction, somewhat_homomorphic_encryption
+from src.bit_codec import binary_array2int, binary_matrix2int
+from src.somewhat_homomorphic_encryption import randint, noise
+
+
+class SwitchingKey:
+    """
+    Key to switch ciphertexts modulo a private key p to much smaller ciphertexts modulo a new private key p'.
+
+    A ciphertext c = q * p + r, with r small and m = r mod 2, decrypts to m = [c]_2 XOR [q]_2. The fixed-point hints
+    y_i = hints[i] / 2^precision, of which a secret sparse subset s sums to 1 / p modulo 2, give q modulo 2 from the
+    expanded ciphertext z_i ~ 2^z_bits * [c * y_i]_2, since sum_i s_i * z_i ~ 2^z_bits * c / p modulo 2^{z_bits + 1}.
+    The encryptions sigma_i = p' * a_i + e_i + s_i * round(p' / 2^{z_bits + 1}) modulo x0' = p' * q0' turn that sum
+    into c' = sum_i sigma_i * z_i, for which [c']_{p'} is about [q]_2 * p' / 2 plus noise smaller than p' / 4.
+
+    A switched ciphertext is stored as the single integer 2 * c' + [c]_2 of about bit_length(x0') + 1 bits. Sums of
+    switched ciphertexts decrypt to the XOR of their bits, as long as the noise stays below p' / 4.
+    """
+
+    def __init__(self,
+                 hints: np.ndarray,
+                 precision: int,
+                 z_bits: int,
+                 sigma: np.ndarray,
+                 modulus: int):
+        """
+        :param hints: 1D array of integers 2^precision * y_i from [0, 2^{precision + 1})
+        :param precision: number of fractional bits of the hints
+        :param z_bits: number of fractional bits of the expanded ciphertext
+        :param sigma: 1D array of the encryptions sigma_i of the secret subset
+        :param modulus: x0' to reduce switched ciphertexts modulo, a multiple of the new private key
+        """
+        self.hints = hints
+        self.precision = precision
+        self.z_bits = z_bits
+        self.sigma = sigma
+        self.modulus = modulus
+
+    def bytes_per_bit(self) -> int:
+        """
+        :return: number of bytes of a switched ciphertext of one bit
+        """
+        return (int(self.modulus).bit_length() + 1 + 7) // 8
+
+
+def _subset(size: int,
+            weight: int) -> np.ndarray:
+    """
+    :return: sorted array of "weight" distinct random indices from [0, size)
+    """
+    indices = set()
+    while len(indices) < weight:
+        indices.add(int(randint(0, size)))
+    return np.array(sorted(indices))
+
+
+def _hint_count(hint_weight: int,
+                security_parameter: int) -> int:
+    """
+    :return: smallest number of hints of which there are at least 2^security_parameter subsets of "hint_weight" hints
+    """
+    hint_count = hint_weight
+    while math.comb(hint_count, hint_weight) < 2 ** security_parameter:
+        hint_count += 1
+    return hint_count
+
+
+def switching_key(private_key: int,
+                  ciphertext_bits: int,
+                  security_parameter: int,
+                  new_private_key_length: Optional[int] = None,
+                  new_int_size: Optional[int] = None,
+                  noise_size: Optional[int] = None,
+                  hint_count: Optional[int] = None,
+                  hint_weight: Optional[int] = None) -> Tuple[int, SwitchingKey]:
+    """
+    Generate a new private key and the key to switch ciphertexts to it. The parameters left None are derived from the
+    security parameter lambda: noise of lambda bits, so that it cannot be guessed, a subset of lambda / 4 hints among
+    enough hints for at least 2^lambda subsets, the smallest new private key that decrypts the switched ciphertexts,
+    and x0' of the square of its bit size, so that its factors resist GCD and lattice attacks. Explicit parameters
+    weaker than that raise a ValueError, as do parameters for which switched ciphertexts would not be smaller.
+    :param private_key: private key of the ciphertexts to switch
+    :param ciphertext_bits: bit size of the ciphertexts to switch, e.g. that of public_key[0]
+    :param security_parameter: security level lambda in bits
+    :param new_private_key_length: bit size of the new private key p'
+    :param new_int_size: bit size of x0', so that switched ciphertexts have new_int_size + 1 bits
+    :param noise_size: bit size of the noise of sigma_i
+    :param hint_count: number of hints
+    :param hint_weight: size of the secret subset of the hints
+    :return: the new private key and the SwitchingKey
+    """
+    if noise_size is None:
+        noise_size = security_parameter
+    if hint_weight is None:
+        hint_weight = max(security_parameter // 4, 2)
+    if hint_count is None:
+        hint_count = _hint_count(hint_weight, security_parameter)
+    z_bits = hint_weight.bit_length() + 2
+    # sum_i e_i * z_i must stay below p' / 16.
+    min_private_key_length = hint_count.bit_length() + z_bits + 1 + noise_size + 5
+    if new_private_key_length is None:
+        new_private_key_length = min_private_key_length
+    if new_int_size is None:
+        new_int_size = new_private_key_length ** 2
+
+    if noise_size < security_parameter:
+        raise ValueError("noise of %d bits can be guessed in fewer than 2^%d tries"
+                         % (noise_size, security_parameter))
+    if math.comb(hint_count, hint_weight) < 2 ** security_parameter:
+        raise ValueError("fewer than 2^%d subsets of %d hints among %d"
+                         % (security_parameter, hint_weight, hint_count))
+    if new_private_key_length < min_private_key_length:
+        raise ValueError("a %d-bit private key is too small for %d-bit noise and %d hints"
+                         % (new_private_key_length, noise_size, hint_count))
+    if new_int_size < new_private_key_length ** 2:
+        raise ValueError("x0' of %d bits is too small to hide a %d-bit private key from GCD and lattice attacks"
+                         % (new_int_size, new_private_key_length))
+    # Switching pays off only if it shrinks the ciphertexts. Capping x0' instead would break the bound above.
+    if new_int_size + 1 >= ciphertext_bits:
+        raise ValueError("switched ciphertexts of %d bits would not be smaller than %d-bit ciphertexts"
+                         % (new_int_size + 1, ciphertext_bits))
+
+    # The error of the hints times a ciphertext must stay far below 2^{-z_bits}.
+    precision = ciphertext_bits + z_bits + 4
+    hints = randint(0, 2 ** (precision + 1), length=hint_count)
+    subset = _subset(hint_count, hint_weight)
+    target = (2 ** (precision + 1) + private_key) // (2 * private_key)
+    hints[subset[-1]] = (target - np.sum(hints[subset[:-1]])) % 2 ** (precision + 1)
+
+    new_key = somewhat_homomorphic_encryption.private_key(new_private_key_length)
+    modulus = new_key * randint(-(-(2 ** (new_int_size - 1)) // new_key), 2 ** new_int_size // new_key)
+    secret = np.zeros(hint_count, dtype=object)
+    secret[subset] = (new_key + 2 ** z_bits) // 2 ** (z_bits + 1)
+    sigma = (new_key * randint(0, modulus // new_key, length=hint_count)
+             + noise(noise_size, hint_count) + secret) % modulus
+    return new_key, SwitchingKey(hints, precision, z_bits, sigma, modulus)
+
+
+def expand(ciphertexts: np.ndarray,
+           key: SwitchingKey) -> np.ndarray:
+    """
+    :param ciphertexts: array of ciphertexts of bits
+    :param key: SwitchingKey
+    :return: int64 array of shape ciphertexts.shape + (hint_count,) of z_i = round(2^z_bits * [c * y_i]_2) mod
+    2^{z_bits + 1} of every ciphertext c
+    """
+    shift = key.precision - key.z_bits
+    products = backend.asarray(ciphertexts)[..., np.newaxis] * backend.asarray(key.hints)
+    fractions = products % 2 ** (key.precision + 1)
+    return (((fractions + 2 ** (shift - 1)) >> shift) % 2 ** (key.z_bits + 1)).astype(np.int64)
+
+
+def switch(ciphertexts: np.ndarray,
+           key: SwitchingKey) -> np.ndarray:
+    """
+    Switch ciphertexts, e.g. of encrypt, encrypt_batch or a circuit, to the new private key of "key".
+    :param ciphertexts: array of ciphertexts of bits whose noise is below a quarter of the private key
+    :param key: SwitchingKey
+    :return: object array of the same shape of switched ciphertexts
+    """
+    ciphertexts = backend.asarray(ciphertexts)
+    z = expand(ciphertexts, key).astype(object)
+    switched = reduction.reducer(key.modulus).reduce(np.dot(z, backend.asarray(key.sigma)))
+    return 2 * switched + ciphertexts % 2
+
+
+def decrypt_bits(switched: np.ndarray,
+                 new_private_key: int) -> np.ndarray:
+    """
+    :param switched: array of switched ciphertexts
+    :param new_private_key: new private key of the SwitchingKey
+    :return: int array of the decrypted bits, [c]_2 XOR [q]_2
+    """
+    switched = backend.asarray(switched)
+    remainders = reduction.reducer(new_private_key).reduce(switched // 2)
+    q_bits = (4 * remainders + new_private_key) // (2 * new_private_key) % 2
+    return ((q_bits + switched % 2) % 2).astype(int)
+
+
+def decrypt(switched: np.ndarray,
+            new_private_key: int,
+            signed: bool = False) -> int:
+    """
+    :return: plaintext of switched ciphertexts of encrypt
+    """
+    return binary_array2int(decrypt_bits(switched, new_private_key), signed)
+
+
+def decrypt_batch(switched: np.ndarray,
+                  new_private_key: int,
+                  signed: bool = False) -> np.ndarray:
+    """
+    :return: 1D numpy array of plaintexts of switched ciphertexts of encrypt_batch
+    """
+    return binary_matrix2int(decrypt_bits(switched, new_private_key), signed)
+
+
+def report(ciphertexts: Union[np.ndarray, int],
+           key: SwitchingKey) -> dict:
+    """
+    :param ciphertexts: ciphertexts to switch, or their bit size
+    :param key: SwitchingKey
+    :return: bytes per encrypted bit before and after switching, and the ratio of both
+    """
+    if isinstance(ciphertexts, np.ndarray):
+        ciphertexts = max([int(c).bit_length() for c in ciphertexts.reshape(-1)] + [1])
+    before, after = (ciphertexts + 7) // 8, key.bytes_per_bit()
+    return {'bytes_per_bit_before': before, 'bytes_per_bit_after': after, 'ratio': before / after}
@@ -0,0 +1,100 @@
+from typing import Optional
+import math
+import warnings
+
+ON_EXCEEDED = (None, 'warn', 'raise')
+
+
+class NoiseBudget:
+    """
+    Bound of the noise that ciphertexts c = q * p + n under a private key p of "private_key_length" bits may carry and
+    still decrypt, n mod 2 being the plaintext bit. The noise is tracked as the bit size of an upper bound of |n|:
+    adding ciphertexts adds at most one bit, multiplying them adds the bits of both, and reducing modulo
+    x0 = q0 * p + r0 subtracts k * r0 for the quotient k, which adds the bits of k to those of r0, and may make n
+    negative. Decryption takes the remainder of c modulo p of the smallest absolute value, see
+    reduction.BarrettReducer.centered, so it is reliable while |n| < p / 2, so for noise of at most
+    private_key_length - 2 bits.
+    """
+
+    def __init__(self,
+                 private_key_length: int,
+                 primary_noise_size: int = 0,
+                 error_free: bool = False,
+                 on_exceeded: Optional[str] = None):
+        """
+        :param private_key_length: bit size of the private key
+        :param primary_noise_size: bit size of the noise of the public key integers, 0 for private key encryption
+        :param error_free: whether x0 has no noise, see somewhat_homomorphic_encryption.error_free_x0
+        :param on_exceeded: what to do before an operation makes the noise exceed the budget: None to only track it,
+        'warn' to issue a RuntimeWarning, 'raise' to raise a ValueError
+        """
+        if on_exceeded not in ON_EXCEEDED:
+            raise ValueError("unknown on_exceeded %r, expected one of %s" % (on_exceeded, ON_EXCEEDED))
+        self.private_key_length = private_key_length
+        self.primary_noise_size = primary_noise_size
+        self.modulus_noise_size = 0 if error_free else primary_noise_size
+        self.on_exceeded = on_exceeded
+
+    @property
+    def max_noise_bits(self) -> int:
+        return self.private_key_length - 2
+
+    def remaining(self,
+                  noise_bits: int) -> int:
+        """
+        :param noise_bits: bit size of the noise bound of a ciphertext
+        :return: number of bits the noise may still grow by, negative if decryption may already fail
+        """
+        return self.max_noise_bits - noise_bits
+
+    def fresh(self,
+              public_key_length: int,
+              secondary_noise_size: int) -> int:
+        """
+        :param public_key_length: number of encryptions of zero of the public key, len(public_key) - 1
+        :param secondary_noise_size: bit size of the noise added by encryption
+        :return: bit size of the noise bound of somewhat_homomorphic_encryption.encrypt, m + 2 * r plus twice the
+        noise of a subset of the public key, minus the noise of reducing the sum modulo x0
+        """
+        return max(secondary_noise_size, self.primary_noise_size + int(public_key_length).bit_length()) + 3
+
+    def reduced(self,
+                noise_bits: int,
+                bit_bound: int,
+                modulus_bits: int) -> int:
+        """
+        :param noise_bits: bit size of the noise bound before reducing
+        :param bit_bound: bit size of the ciphertexts before reducing
+        :param modulus_bits: bit size of x0
+        :return: bit size of the noise bound after reducing modulo x0
+        """
+        if self.modulus_noise_size == 0:
+            return noise_bits
+        quotient_bits = max(bit_bound - modulus_bits + 1, 0)
+        return max(noise_bits, self.modulus_noise_size + quotient_bits) + 1
+
+    def check(self,
+              noise_bits: int,
+              operation: str) -> None:
+        """
+        Warn or raise according to on_exceeded if "noise_bits" exceeds the budget.
+        :param noise_bits: bit size of the noise bound the operation would give
+        :param operation: name of the operation for the message
+        """
+        if self.on_exceeded is None or noise_bits <= self.max_noise_bits:
+            return
+        message = ("%s would give noise of up to %d bits, but a %d-bit private key only decrypts noise of up to %d bits"
+                   % (operation, noise_bits, self.private_key_length, self.max_noise_bits))
+        if self.on_exceeded == 'raise':
+            raise ValueError(message)
+        warnings.warn(message, RuntimeWarning, stacklevel=4)
+
+
+def private_key_noise_bits(key: int) -> int:
+    """
+    :param key: private key of private_key_somewhat_homomorphic_encryption
+    :return: bit size of the noise bound 2 * r + m of its encrypt, below sqrt(key - 1) by the choice of its noise.
+    The bound of a product has twice as many bits, above the budget, although the product of two fresh ciphertexts
+    still decrypts: bounds of whole bits are up to a bit larger than the noise.
+    """
+    return math.isqrt(int(key) - 1).bit_length()
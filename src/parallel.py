@@ -0,0 +1,259 @@
+from typing import Optional, Union, Dict
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+import numpy as np
+from src import randomness, somewhat_homomorphic_encryption
+from src.ciphertext import Ciphertext, max_noise_bits
+from src.ciphertext_array import CiphertextArray, from_ciphertext
+from src.circuit import Circuit
+from src.subset_sum import SubsetSumTable
+
+# Number of plaintexts per random stream of encrypt_batch if no chunk size is given. It must not depend on the number
+# of workers, since every chunk is encrypted with the stream spawned for its index.
+ENCRYPTION_CHUNK_SIZE = 16
+
+# Public key, secondary noise size and subset sum table of the ParallelExecutor a worker process belongs to.
+_worker_state = None
+
+
+def pack(values: np.ndarray) -> tuple:
+    """
+    Convert ciphertexts to a compact form to send to or from worker processes: native arrays as they are, big integers
+    as the uint64 limbs of a CiphertextArray instead of pickled Python objects.
+    :param values: array of non-negative integers
+    :return: packed ciphertexts
+    """
+    if values.dtype != object:
+        return 'native', values
+    return 'limbs', from_ciphertext(values).limbs, values.shape
+
+
+def unpack(packed: tuple) -> np.ndarray:
+    """
+    :param packed: output of pack
+    :return: the array of ciphertexts, big integers as integers of src.backend
+    """
+    if packed[0] == 'native':
+        return packed[1]
+    return CiphertextArray(packed[1]).to_ints().reshape(packed[2])
+
+
+def _pack_ciphertext(ciphertext: Ciphertext) -> tuple:
+    return (pack(ciphertext.values), ciphertext.modulus, ciphertext.max_bits, ciphertext.bit_bound,
+            ciphertext.noise_bits, ciphertext.budget)
+
+
+def _unpack_ciphertext(packed: tuple) -> Ciphertext:
+    values, modulus, max_bits, bit_bound, noise_bits, budget = packed
+    return Ciphertext(unpack(values), modulus, max_bits, bit_bound, noise_bits, budget)
+
+
+def _initialize(state: dict) -> None:
+    global _worker_state
+    _worker_state = state
+
+
+def _timed(function, *args) -> tuple:
+    """
+    :return: result of function(*args), the process id, and the seconds it took
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, os.getpid(), time.perf_counter() - start
+
+
+def _encrypt_chunk(state: Optional[dict],
+                   seed: bytes,
+                   index: int,
+                   plaintexts: list,
+                   width: int,
+                   signed: bool) -> tuple:
+    """
+    Encrypt a chunk of plaintexts with the random stream spawned for its index.
+    """
+    state = _worker_state if state is None else state
+    ciphertexts = somewhat_homomorphic_encryption.encrypt_batch(plaintexts, state['public_key'],
+                                                                state['secondary_noise_size'], width, signed,
+                                                                state['table'],
+                                                                randomness.SeededRandomSource(seed).spawn(index))
+    return pack(ciphertexts)
+
+
+def _decrypt_chunk(packed: tuple,
+                   private_key: int,
+                   signed: bool) -> np.ndarray:
+    return somewhat_homomorphic_encryption.decrypt_batch(unpack(packed), private_key, signed)
+
+
+def _evaluate_chunk(circuit: Circuit,
+                    packed_inputs: dict) -> dict:
+    inputs = {name: _unpack_ciphertext(packed) if isinstance(packed, tuple) else packed
+              for name, packed in packed_inputs.items()}
+    outputs = circuit.evaluate(inputs)
+    return {name: _pack_ciphertext(output) if isinstance(output, Ciphertext) else output
+            for name, output in outputs.items()}
+
+
+class ParallelExecutor:
+    """
+    Shard batch encryption, decryption and circuit evaluation across a pool of worker processes. Ciphertexts are sent
+    packed as uint64 limbs, and the public key only once per worker.
+
+    Every chunk of plaintexts is encrypted with its own random stream spawned from one seed drawn from the current
+    random source. Chunks of encryption have ENCRYPTION_CHUNK_SIZE plaintexts, or chunk_size if given, whatever the
+    number of workers, so for the same seed and chunk_size the ciphertexts are identical for any number of workers,
+    including workers=1, which runs in this process without a pool.
+    """
+
+    def __init__(self,
+                 workers: Optional[int] = None,
+                 public_key: Optional[np.ndarray] = None,
+                 secondary_noise_size: Optional[int] = None,
+                 table: Optional[SubsetSumTable] = None,
+                 chunk_size: Optional[int] = None):
+        """
+        :param workers: number of worker processes. If None, the number of CPUs.
+        :param public_key: 1D array public key to encrypt with
+        :param secondary_noise_size: bit size of noise of encryption
+        :param table: subset_sum_table of the public key, if precomputed
+        :param chunk_size: number of plaintexts or ciphertexts per task. If None, ENCRYPTION_CHUNK_SIZE plaintexts to
+        encrypt, and 4 chunks per worker of ciphertexts to decrypt or evaluate.
+        """
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        assert self.workers > 0
+        self.chunk_size = chunk_size
+        self._state = {'public_key': public_key, 'secondary_noise_size': secondary_noise_size, 'table': table}
+        self._executor = None
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_initialize, initargs=(self._state,))
+        self._stats = {}
+
+    def __enter__(self) -> 'ParallelExecutor':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _chunks(self,
+                length: int,
+                default_size: Optional[int] = None) -> list:
+        """
+        :param length: number of items
+        :param default_size: number of items per chunk if the executor has no chunk_size. If None, 4 chunks per worker.
+        :return: slices splitting range(length) into chunks
+        """
+        chunk_size = self.chunk_size or default_size or max(1, -(-length // (4 * self.workers)))
+        return [slice(start, start + chunk_size) for start in range(0, length, chunk_size)]
+
+    def _map(self,
+             function,
+             tasks: list,
+             num_items: list) -> list:
+        """
+        Run function(*task) for every task, in the pool if there is one, and record the time every process took.
+        :param function: function of a task
+        :param tasks: tuples of arguments
+        :param num_items: number of plaintexts or ciphertext rows of every task
+        :return: results in the order of "tasks"
+        """
+        if self._executor is None:
+            results = [_timed(function, *task) for task in tasks]
+        else:
+            futures = [self._executor.submit(_timed, function, *task) for task in tasks]
+            results = [future.result() for future in futures]
+
+        for (_, pid, seconds), items in zip(results, num_items):
+            stats = self._stats.setdefault(pid, {'tasks': 0, 'items': 0, 'seconds': 0.0})
+            stats['tasks'] += 1
+            stats['items'] += items
+            stats['seconds'] += seconds
+        return [result for result, _, _ in results]
+
+    def stats(self) -> Dict[int, dict]:
+        """
+        :return: by process id, the number of tasks and items, i.e. plaintexts or ciphertext rows, every process
+        handled, the seconds it spent and its throughput in items per second
+        """
+        return {pid: dict(stats, items_per_second=stats['items'] / stats['seconds'] if stats['seconds'] > 0 else 0.0)
+                for pid, stats in self._stats.items()}
+
+    def encrypt_batch(self,
+                      plaintexts,
+                      width: int,
+                      signed: bool = False) -> np.ndarray:
+        """
+        Encrypt like somewhat_homomorphic_encryption.encrypt_batch with the public key of the executor.
+        :param plaintexts: 1D sequence of integers
+        :param width: number of bits every plaintext is encrypted as
+        :param signed: whether to encrypt negative plaintexts in two's complement
+        :return: 2D numpy array of shape (len(plaintexts), width)
+        """
+        assert self._state['public_key'] is not None
+        plaintexts = list(plaintexts)
+        seed = randomness.get_source().randbytes(32)
+        state = self._state if self._executor is None else None
+        chunks = [plaintexts[chunk] for chunk in self._chunks(len(plaintexts), ENCRYPTION_CHUNK_SIZE)]
+        tasks = [(state, seed, i, chunk, width, signed) for i, chunk in enumerate(chunks)]
+        packed = self._map(_encrypt_chunk, tasks, [len(chunk) for chunk in chunks])
+        return np.concatenate([unpack(ciphertexts) for ciphertexts in packed])
+
+    def decrypt_batch(self,
+                      ciphertexts: np.ndarray,
+                      private_key: int,
+                      signed: bool = False) -> np.ndarray:
+        """
+        Decrypt like somewhat_homomorphic_encryption.decrypt_batch.
+        :param ciphertexts: 2D numpy array of shape (number of plaintexts, width)
+        :param private_key: private key
+        :param signed: whether the plaintexts were encrypted in two's complement
+        :return: 1D numpy array of plaintexts
+        """
+        chunks = [ciphertexts[chunk] for chunk in self._chunks(len(ciphertexts))]
+        tasks = [(pack(chunk), private_key, signed) for chunk in chunks]
+        return np.concatenate(self._map(_decrypt_chunk, tasks, [len(chunk) for chunk in chunks]))
+
+    def evaluate(self,
+                 circuit: Circuit,
+                 inputs: Dict[str, Union[Ciphertext, int]]) -> dict:
+        """
+        Evaluate a circuit like Circuit.evaluate, sharding batched inputs along their first axis.
+        :param circuit: Circuit
+        :param inputs: values of the inputs by name, Ciphertexts of the same number of rows, or plaintext bits
+        :return: values of the outputs by name
+        """
+        length = len(next(value for value in inputs.values() if isinstance(value, Ciphertext)))
+        slices = self._chunks(length)
+        tasks = [(circuit, {name: _pack_ciphertext(value[chunk]) if isinstance(value, Ciphertext) else value
+                            for name, value in inputs.items()})
+                 for chunk in slices]
+
+        num_items = [len(range(length)[chunk]) for chunk in slices]
+        chunks = [{name: _unpack_ciphertext(output) if isinstance(output, tuple) else output
+                   for name, output in outputs.items()}
+                  for outputs in self._map(_evaluate_chunk, tasks, num_items)]
+        return {name: _concatenate([outputs[name] for outputs in chunks]) for name in chunks[0]}
+
+
+def _concatenate(chunks: list) -> Union[Ciphertext, np.ndarray]:
+    """
+    :param chunks: outputs of a circuit for consecutive chunks of rows
+    :return: output for all rows
+    """
+    ciphertexts = [chunk for chunk in chunks if isinstance(chunk, Ciphertext)]
+    if not ciphertexts:
+        # A constant output is the same plaintext bit for every row.
+        return chunks[0]
+    first = ciphertexts[0]
+    values = [chunk.values if isinstance(chunk, Ciphertext) else np.atleast_1d(chunk) for chunk in chunks]
+    return Ciphertext(np.concatenate(values), first.modulus, first.max_bits,
+                      max(ciphertext.bit_bound for ciphertext in ciphertexts), max_noise_bits(ciphertexts),
+                      first.budget)
@@ -0,0 +1,173 @@
+from typing import Dict, List
+import numpy as np
+from src import randomness, backend
+
+# Primes below SIEVE_LIMIT are used for trial division, and are drawn from directly for keys of at most as many bits.
+SIEVE_LIMIT = 2 ** 16
+# Number of odd candidates sieved at once. Around num_bits * ln(2) / 2 of them contain one prime on average.
+WINDOW = 4096
+# Rounds of Miller-Rabin with random bases, each passed by a composite with probability at most 1/4.
+MILLER_RABIN_ROUNDS = 40
+
+# Primes found but not returned yet, by bit size, so that a window with more primes than needed is not wasted. Every
+# prime is returned at most once.
+_cache: Dict[int, List[int]] = {}
+
+
+def sieve(limit: int) -> np.ndarray:
+    """
+    :param limit: exclusive upper bound
+    :return: int64 array of all primes smaller than "limit", by the sieve of Eratosthenes
+    """
+    is_prime = np.ones(max(limit, 2), dtype=bool)
+    is_prime[:2] = False
+    for i in range(2, int(limit ** 0.5) + 1):
+        if is_prime[i]:
+            is_prime[i * i::i] = False
+    return np.flatnonzero(is_prime)
+
+
+SMALL_PRIMES = sieve(SIEVE_LIMIT)
+
+
+def residues(n: int,
+             moduli: np.ndarray = SMALL_PRIMES) -> np.ndarray:
+    """
+    Compute n modulo many small moduli at once, by Horner's rule on the 16-bit digits of n with int64 arrays, instead
+    of one big integer division per modulus.
+    :param n: non-negative integer
+    :param moduli: int64 array of moduli smaller than 2^31
+    :return: int64 array of n mod every modulus
+    """
+    remainders = np.zeros(len(moduli), dtype=np.int64)
+    digits = int(n).to_bytes((int(n).bit_length() + 15) // 16 * 2, 'big')
+    for i in range(0, len(digits), 2):
+        remainders = (remainders * 2 ** 16 + (digits[i] << 8 | digits[i + 1])) % moduli
+    return remainders
+
+
+def miller_rabin(n: int,
+                 rounds: int = MILLER_RABIN_ROUNDS) -> bool:
+    """
+    :param n: odd integer larger than 3
+    :param rounds: number of random bases
+    :return: False if n is composite, True if n is prime with probability at least 1 - 4^-rounds
+    """
+    n = backend.integer(n)
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for base in randomness.randrange(2, n - 1, length=rounds):
+        x = pow(backend.integer(base), d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def is_probable_prime(n: int,
+                      rounds: int = MILLER_RABIN_ROUNDS) -> bool:
+    """
+    :param n: integer
+    :param rounds: number of rounds of Miller-Rabin
+    :return: whether n is prime, by trial division by SMALL_PRIMES, then Miller-Rabin
+    """
+    if n < SIEVE_LIMIT:
+        return bool(np.isin(n, SMALL_PRIMES))
+    if np.any(residues(n) == 0):
+        return False
+    return miller_rabin(n, rounds)
+
+
+def _sieve_window(start: int,
+                  length: int) -> np.ndarray:
+    """
+    :param start: odd integer larger than SIEVE_LIMIT
+    :param length: number of candidates
+    :return: indices k of the candidates start + 2 * k with no factor in SMALL_PRIMES
+    """
+    odd_primes = SMALL_PRIMES[1:]
+    # start + 2 * k = 0 mod q for k = -start / 2 mod q.
+    first = (-residues(start, odd_primes) * ((odd_primes + 1) // 2)) % odd_primes
+    composite = np.zeros(length, dtype=bool)
+    for k, q in zip(first.tolist(), odd_primes.tolist()):
+        composite[k::q] = True
+    return np.flatnonzero(~composite)
+
+
+def _small_primes(num_bits: int,
+                  count: int) -> List[int]:
+    candidates = SMALL_PRIMES[(SMALL_PRIMES >= 2 ** (num_bits - 1)) & (SMALL_PRIMES < 2 ** num_bits)].tolist()
+    if count > len(candidates):
+        raise ValueError("there are only %d primes of %d bits" % (len(candidates), num_bits))
+    order = np.argsort(randomness.randrange(0, 2 ** 31, length=len(candidates), dtype=np.int64))
+    return [candidates[i] for i in order[:count]]
+
+
+def primes(num_bits: int,
+           count: int,
+           rounds: int = MILLER_RABIN_ROUNDS,
+           independent: bool = False) -> List[int]:
+    """
+    Generate distinct random primes of exactly "num_bits" bits. Windows of WINDOW odd candidates from a random start
+    are sieved by SMALL_PRIMES at once, and only the remaining candidates are tested with Miller-Rabin. The primes of
+    a window not needed yet are cached for the next call.
+    :param num_bits: bit size of the primes, at least 2
+    :param count: number of primes
+    :param rounds: number of rounds of Miller-Rabin
+    :param independent: whether to take only the first prime of every window and not cache the others, since the
+    primes of one window are within 2 * WINDOW of each other
+    :return: list of "count" primes
+    """
+    assert num_bits >= 2
+    if 2 ** num_bits <= SIEVE_LIMIT:
+        return _small_primes(num_bits, count)
+
+    cache = [] if independent else _cache.setdefault(num_bits, [])
+    length = min(WINDOW, 2 ** (num_bits - 3))
+    while len(cache) < count:
+        start = randomness.randrange(2 ** (num_bits - 1) + 1, 2 ** num_bits - 2 * length, 2)
+        for k in _sieve_window(start, length):
+            candidate = start + 2 * int(k)
+            if candidate not in cache and miller_rabin(candidate, rounds):
+                cache.append(candidate)
+                if independent:
+                    break
+    result = cache[:count]
+    del cache[:count]
+    return result
+
+
+def prime(num_bits: int,
+          rounds: int = MILLER_RABIN_ROUNDS) -> int:
+    """
+    :return: a random prime of exactly "num_bits" bits, see primes
+    """
+    return primes(num_bits, 1, rounds)[0]
+
+
+def prime_in_range(start: int,
+                   stop: int,
+                   rounds: int = MILLER_RABIN_ROUNDS) -> int:
+    """
+    :param start: start of the range (inclusive)
+    :param stop: end of the range (exclusive), which must contain a prime
+    :param rounds: number of rounds of Miller-Rabin
+    :return: a random prime from [start, stop), uniformly among the primes of the range
+    """
+    while True:
+        candidate = randomness.randrange(start, stop)
+        if is_probable_prime(candidate, rounds):
+            return candidate
+
+
+def clear_cache() -> None:
+    """
+    Forget the cached primes, e.g. after reseeding the random source for reproducible keys.
+    """
+    _cache.clear()
@@ -1,7 +1,8 @@
-from typing import Union
+from typing import Union, Optional
 import numpy as np
-import random
 import math
+from src import randomness, backend, reduction
+from src.bit_codec import int2binary_array, binary_array2int, int2binary_matrix, binary_matrix2int
 
 
 def randint(start: int,
@@ -10,7 +11,7 @@ def randint(start: int,
             length: int = 0,
             dtype=object) -> Union[int, np.ndarray]:
     """
-    Generate an array of random integers from [start, stop).
+    Generate an array of random integers from [start, stop) with the random source of src.randomness.
     :param start: start of the sample space (inclusive)
     :param stop: end of the sample space (exclusive)
     :param step: sample space includes every "step" number starting form "stop"
@@ -18,52 +19,34 @@ def randint(start: int,
     :param dtype: dtype of the output array
     :return: 1D numpy array of random integers from [start, stop).
     """
-    if length == 0:
-        return random.randrange(start, stop, step)
-    else:
-        return np.array([random.randrange(start, stop, step) for _ in range(length)], dtype=dtype)
-
-
-def int2binary_array(integer: int) -> np.ndarray:
-    """
-    Create a 1D array containing the binary digits of a non-negative integer.
-    :param integer: non-negative integer of which the binary digits are to store in a 1D array.
-    :return: 1D array of binary digits.
-    """
-    assert 0 <= integer
-    return np.array(list(map(int, bin(integer)[2:])))
-
-
-def binary_array2int(bits) -> int:
-    """
-    Create an integer from an array containing its binary digits.
-    :param bits: 1D array of binary digits.
-    :return: integer "bits" represents.
-    """
-    return int(''.join(map(str, bits)), 2)
+    return randomness.randrange(start, stop, step, length, dtype)
 
 
 def key_multiple(num_bits: int,
-                 length: int) -> Union[int, np.ndarray]:
+                 length: int,
+                 dtype=object) -> Union[int, np.ndarray]:
     """
     Sample q from [0, 2 ** num_bits), where q is intended for the encryption c = qp + 2r + m.
     :param num_bits: number of bits of q.
     :param length: length of output
+    :param dtype: dtype of the output array
     :return: an integer if length = 0, a 1D numpy array of shape (length,) if length > 0.
     """
-    return randint(0, 2 ** num_bits, length=length)
+    return randint(0, 2 ** num_bits, length=length, dtype=dtype)
 
 
 def noise(key: int,
-          length: int) -> Union[int, np.ndarray]:
+          length: int,
+          dtype=object) -> Union[int, np.ndarray]:
     """
     Sample positive noise r, where r is intended for the encryption c = qp + 2r + m. The magnitude of r ensures
     homomorphism of addition or multiplication of ciphertexts for at least once.
     :param key: encryption key, i.e. p in c = qp + 2r + m
     :param length: length of output
+    :param dtype: dtype of the output array
     :return: an integer if length = 0, a 1D numpy array of shape (length,) if length > 0.
     """
-    return randint(0, math.floor((-1 + math.sqrt(key - 1)) / 2), length=length)
+    return randint(0, math.floor((-1 + math.sqrt(key - 1)) / 2), length=length, dtype=dtype)
 
 
 def key(num_bits: int) -> int:
@@ -75,31 +58,87 @@ def key(num_bits: int) -> int:
     return randint(2 ** (num_bits - 1) + 1, 2 ** num_bits, step=2)
 
 
+def ciphertext_dtype(key: int,
+                     q_num_bits: int):
+    """
+    Choose how to store ciphertexts c = qp + 2r + m. They are native int64 if c, and so the sum or product of two
+    ciphertexts, provably fits, and integers of src.backend otherwise.
+    :param key: an encryption key
+    :param q_num_bits: number of bits of q
+    :return: dtype of ciphertexts
+    """
+    return backend.dtype(q_num_bits + int(key).bit_length() + 1)
+
+
 def encrypt(plaintext: int,
             key: int,
-            q_num_bits: int) -> np.ndarray:
+            q_num_bits: int,
+            width: Optional[int] = None,
+            signed: bool = False) -> np.ndarray:
     """
     Encrypt a plaintext as c = qp + 2r + m, where m is a bit in the plaintext, p is a key, q is a factor of p,
     r is a noise, and c, an integer, is an encryption of m.
     :param plaintext: an integer to encrypt
     :param key: an encryption key
     :param q_num_bits: number of bits of q
+    :param width: number of bits the plaintext is encrypted as. If None, the fewest bits representing the plaintext.
+    :param signed: whether to encrypt a negative plaintext in two's complement. Requires "width".
     :return: 1D numpy array of encryption of each bit of plaintext
     """
-    plaintext_binary = int2binary_array(plaintext)
+    plaintext_binary = int2binary_array(plaintext, width, signed)
+    dtype = ciphertext_dtype(key, q_num_bits)
 
-    return (key_multiple(q_num_bits, len(plaintext_binary)) * key
-            + 2 * noise(key, len(plaintext_binary))
+    return (backend.asarray(key_multiple(q_num_bits, len(plaintext_binary), dtype)) * key
+            + 2 * noise(key, len(plaintext_binary), dtype)
             + plaintext_binary)
 
 
 def decrypt(ciphertext: np.ndarray,
-            key: int) -> int:
+            key: int,
+            signed: bool = False) -> int:
     """
     Decrypt.
     :param ciphertext: 1D numpy array of encryption of each bit of plaintext
     :param key: encryption key
+    :param signed: whether the plaintext was encrypted in two's complement
     :return: plaintext as an integer
     """
-    plaintext_binary = ciphertext % key % 2
-    return binary_array2int(plaintext_binary)
+    plaintext_binary = reduction.reducer(key).reduce(backend.asarray(ciphertext)) % 2
+    return binary_array2int(plaintext_binary, signed)
+
+
+def encrypt_batch(plaintexts,
+                  key: int,
+                  q_num_bits: int,
+                  width: int,
+                  signed: bool = False) -> np.ndarray:
+    """
+    Encrypt many plaintexts at once, each as "width" bits c = qp + 2r + m. All q and r are sampled in one pass.
+    :param plaintexts: 1D sequence of non-negative integers smaller than 2^width
+    :param key: an encryption key
+    :param q_num_bits: number of bits of q
+    :param width: number of bits every plaintext is encrypted as
+    :param signed: whether to encrypt negative plaintexts in two's complement
+    :return: 2D numpy array of shape (len(plaintexts), width), row i encrypts plaintexts[i] most significant bit first
+    """
+    plaintexts_binary = int2binary_matrix(plaintexts, width, signed)
+    shape = plaintexts_binary.shape
+    dtype = ciphertext_dtype(key, q_num_bits)
+
+    return (backend.asarray(key_multiple(q_num_bits, plaintexts_binary.size, dtype)).reshape(shape) * key
+            + 2 * noise(key, plaintexts_binary.size, dtype).reshape(shape)
+            + plaintexts_binary)
+
+
+def decrypt_batch(ciphertexts: np.ndarray,
+                  key: int,
+                  signed: bool = False) -> np.ndarray:
+    """
+    Decrypt a 2D array of ciphertexts produced by encrypt_batch.
+    :param ciphertexts: 2D numpy array of shape (number of plaintexts, width)
+    :param key: encryption key
+    :param signed: whether the plaintexts were encrypted in two's complement
+    :return: 1D numpy array of plaintexts
+    """
+    plaintexts_binary = reduction.reducer(key).reduce(backend.asarray(ciphertexts)) % 2
+    return binary_matrix2int(plaintexts_binary, signed)
@@ -0,0 +1,121 @@
+from typing import Tuple
+import numpy as np
+from src import randomness, backend, reduction
+from src.bit_codec import int2binary_array, int2binary_matrix
+from src.somewhat_homomorphic_encryption import randint, private_key, noise, error_free_x0
+
+
+class QuadraticPublicKey:
+    """
+    Public key in the style of Coron, Mandal, Naccache and Tibouchi: two lists of integers x_i = p * q_i + r_i and
+    x'_j = p * q'_j + r'_j of "size" integers each stand for the size^2 products x_i * x'_j, which play the role of
+    public_key[1:] of somewhat_homomorphic_encryption.public_key.
+
+    The products are not reduced modulo x0 before they are summed, so x0 = p * q0 has no noise: reducing a sum of
+    2 * int_size-bit products modulo a noisy x0 would add its noise about 2^int_size times. x0 is error_free_x0, so
+    q0 has no prime factor smaller than p.
+    """
+
+    def __init__(self,
+                 x0: int,
+                 first: np.ndarray,
+                 second: np.ndarray):
+        """
+        :param x0: integer to reduce ciphertexts modulo, a multiple of the private key
+        :param first: 1D array of x_i
+        :param second: 1D array of x'_j of the same length as "first"
+        """
+        assert len(first) == len(second)
+        self.x0 = x0
+        self.first = first
+        self.second = second
+
+    def __len__(self) -> int:
+        """
+        :return: number of integers stored, x0 and both lists
+        """
+        return 1 + len(self.first) + len(self.second)
+
+    @property
+    def num_products(self) -> int:
+        return len(self.first) * len(self.second)
+
+    def expand(self) -> np.ndarray:
+        """
+        :return: x0 followed by all products x_i * x'_j, as accepted by somewhat_homomorphic_encryption.encrypt
+        """
+        products = np.outer(self.first, self.second).reshape(-1)
+        return np.concatenate([np.array([backend.integer(self.x0)], dtype=object), products])
+
+
+def quadratic_public_key(size: int,
+                         int_size: int,
+                         noise_size: int,
+                         private_key: int) -> QuadraticPublicKey:
+    """
+    :param size: number of integers of each list, so that there are size^2 products
+    :param int_size: bit size of the integers of both lists and of x0
+    :param noise_size: bit size of noise
+    :param private_key: private key
+    :return: QuadraticPublicKey
+    """
+    p = private_key
+    x0 = error_free_x0(int_size, p)
+    first, second = [p * randint(0, (2 ** int_size) // p, length=size) + noise(noise_size, size) for _ in range(2)]
+    return QuadraticPublicKey(x0, first, second)
+
+
+def key(private_key_length: int,
+        public_key_length: int,
+        public_key_bits: int,
+        primary_noise_size: int) -> Tuple[int, QuadraticPublicKey]:
+    """
+    :param public_key_length: number of integers of each list of the public key
+    """
+    k = private_key(private_key_length)
+    return k, quadratic_public_key(public_key_length, public_key_bits, primary_noise_size, k)
+
+
+def selected_sum(public_key: QuadraticPublicKey,
+                 num: int) -> np.ndarray:
+    """
+    Sum random subsets of the products x_i * x'_j as sum_i x_i * (sum_j b_ij * x'_j), which only multiplies "size"
+    times per sum instead of materializing size^2 products.
+    :param public_key: QuadraticPublicKey
+    :param num: number of subset sums
+    :return: 1D array of shape (num,) of sums of random subsets of the products
+    """
+    size = len(public_key.first)
+    inner = backend.subset_sum(randomness.random_bits((num, size, size)), public_key.second)
+    return np.sum(backend.asarray(inner) * backend.asarray(public_key.first), axis=1)
+
+
+def encrypt(plaintext: int,
+            public_key: QuadraticPublicKey,
+            secondary_noise_size: int,
+            width: int = None,
+            signed: bool = False) -> np.ndarray:
+    """
+    Encrypt like somewhat_homomorphic_encryption.encrypt with the products of a quadratic public key.
+    :return: 1D numpy array of encryption of each bit of plaintext, decrypted by somewhat_homomorphic_encryption.decrypt
+    """
+    bits = int2binary_array(plaintext, width, signed)
+    return reduction.reducer(public_key.x0).reduce(bits
+                                                   + 2 * noise(secondary_noise_size, len(bits))
+                                                   + 2 * selected_sum(public_key, len(bits)))
+
+
+def encrypt_batch(plaintexts,
+                  public_key: QuadraticPublicKey,
+                  secondary_noise_size: int,
+                  width: int,
+                  signed: bool = False) -> np.ndarray:
+    """
+    Encrypt like somewhat_homomorphic_encryption.encrypt_batch with the products of a quadratic public key.
+    :return: 2D numpy array of shape (len(plaintexts), width)
+    """
+    bits = int2binary_matrix(plaintexts, width, signed)
+    shape = bits.shape
+    return reduction.reducer(public_key.x0).reduce(bits
+                                                   + 2 * noise(secondary_noise_size, bits.size).reshape(shape)
+                                                   + 2 * selected_sum(public_key, bits.size).reshape(shape))
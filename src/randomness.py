@@ -0,0 +1,193 @@
+from typing import Union, Tuple, List, Optional
+import numpy as np
+import hashlib
+import os
+import threading
+
+# Extra random bits drawn per integer, so that mapping them onto [0, bound) is within 2^-64 of uniform.
+SECURITY_MARGIN = 64
+
+
+class RandomSource:
+    """
+    Source of random integers that draws the bytes for many integers at once and slices them with int.from_bytes.
+    Subclasses only provide randbytes.
+    """
+
+    def randbytes(self, num_bytes: int) -> bytes:
+        """
+        :param num_bytes: number of random bytes.
+        :return: "num_bytes" random bytes.
+        """
+        raise NotImplementedError
+
+    def randbelow(self, bound: int, length: int) -> List[int]:
+        """
+        Sample integers from [0, bound). Each integer is floor(x * bound / 2^k) for k = bit size of bound plus
+        SECURITY_MARGIN random bits x, so no sample is ever rejected.
+        :param bound: end of the sample space (exclusive).
+        :param length: number of integers.
+        :return: list of "length" random integers from [0, bound).
+        """
+        if bound <= 0:
+            raise ValueError("empty range for randbelow")
+        num_bytes = (bound.bit_length() + SECURITY_MARGIN + 7) // 8
+        shift = 8 * num_bytes
+        buffer = memoryview(self.randbytes(num_bytes * length))
+        return [(int.from_bytes(buffer[i:i + num_bytes], 'little') * bound) >> shift
+                for i in range(0, num_bytes * length, num_bytes)]
+
+    def randbits(self, num_bits: int, length: int) -> List[int]:
+        """
+        :param num_bits: number of bits of each integer.
+        :param length: number of integers.
+        :return: list of "length" random integers from [0, 2^num_bits).
+        """
+        num_bytes = (num_bits + 7) // 8
+        shift = 8 * num_bytes - num_bits
+        buffer = memoryview(self.randbytes(num_bytes * length))
+        return [int.from_bytes(buffer[i:i + num_bytes], 'little') >> shift
+                for i in range(0, num_bytes * length, num_bytes)]
+
+    def randbelow_native(self, bound: int, length: int) -> np.ndarray:
+        """
+        Sample integers from [0, bound) for bound < 2^32 with native arithmetic. Each integer is
+        floor(x * bound / 2^128) for 128 random bits x.
+        :param bound: end of the sample space (exclusive).
+        :param length: number of integers.
+        :return: uint64 array of "length" random integers from [0, bound).
+        """
+        assert 0 < bound < 2 ** 32
+        words = np.frombuffer(self.randbytes(16 * length), dtype=np.uint64).reshape(length, 2)
+        low, high = words[:, 0], words[:, 1]
+        b, mask, shift = np.uint64(bound), np.uint64(2 ** 32 - 1), np.uint64(32)
+
+        # floor(low * b / 2^64), then floor((high * 2^64 + low) * b / 2^128), 32 bits at a time.
+        carry = ((low >> shift) * b + (((low & mask) * b) >> shift)) >> shift
+        carry = ((high & mask) * b + carry) >> shift
+        return ((high >> shift) * b + carry) >> shift
+
+    def randrange(self,
+                  start: int,
+                  stop: int,
+                  step: int = 1,
+                  length: int = 0,
+                  dtype=object) -> Union[int, np.ndarray]:
+        """
+        Generate random integers from [start, stop) in the same way as random.randrange, but in bulk.
+        :param start: start of the sample space (inclusive)
+        :param stop: end of the sample space (exclusive)
+        :param step: sample space includes every "step" number starting from "start"
+        :param length: length of the output array. If 0, an int is returned.
+        :param dtype: dtype of the output array. Samples for a native dtype are generated natively if they can be.
+        :return: an integer if length = 0, a 1D numpy array of shape (length,) if length > 0.
+        """
+        size = (stop - start + step - 1) // step
+        if size <= 0:
+            raise ValueError("empty range for randrange (%d, %d, %d)" % (start, stop, step))
+
+        if length == 0:
+            return start + step * self.randbelow(size, 1)[0]
+        if dtype is not object and size < 2 ** 32:
+            return (start + step * self.randbelow_native(size, length).astype(np.int64)).astype(dtype)
+        return np.array([start + step * integer for integer in self.randbelow(size, length)], dtype=dtype)
+
+    def bits(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        :param shape: shape of the output array.
+        :return: array of uniformly random 0s and 1s.
+        """
+        size = int(np.prod(shape))
+        buffer = np.frombuffer(self.randbytes((size + 7) // 8), dtype=np.uint8)
+        return np.unpackbits(buffer)[:size].astype(int).reshape(shape)
+
+
+class SystemRandomSource(RandomSource):
+    """
+    Cryptographically secure random source backed by os.urandom.
+    """
+
+    def randbytes(self, num_bytes: int) -> bytes:
+        return os.urandom(num_bytes)
+
+
+class SeededRandomSource(RandomSource):
+    """
+    Deterministic random source for reproducible runs. The byte stream is SHAKE-256 of the seed and a counter, so the
+    same seed and the same sequence of requests always give the same integers.
+    """
+
+    def __init__(self, seed: Union[int, bytes]):
+        if isinstance(seed, int):
+            seed = seed.to_bytes((seed.bit_length() + 8) // 8, 'little', signed=True)
+        self.seed = seed
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def randbytes(self, num_bytes: int) -> bytes:
+        with self._lock:
+            counter = self._counter
+            self._counter += 1
+        return hashlib.shake_256(counter.to_bytes(8, 'little') + self.seed).digest(num_bytes)
+
+    def spawn(self, *key: int) -> 'SeededRandomSource':
+        """
+        Derive an independent child stream, e.g. one per worker or per chunk of work. The child only depends on the
+        seed and "key", not on how many bytes were drawn from this source, so work split across processes draws the
+        same integers however it is split.
+        :param key: non-negative integers naming the child
+        :return: SeededRandomSource of the child stream
+        """
+        data = len(self.seed).to_bytes(8, 'little') + self.seed + b''.join(k.to_bytes(8, 'little') for k in key)
+        return SeededRandomSource(hashlib.shake_256(b'spawn' + data).digest(32))
+
+
+_source: RandomSource = SystemRandomSource()
+
+
+def get_source() -> RandomSource:
+    """
+    :return: the random source used by all sampling functions.
+    """
+    return _source
+
+
+def set_source(source: RandomSource) -> None:
+    """
+    Replace the random source used by all sampling functions.
+    :param source: new random source
+    """
+    global _source
+    _source = source
+
+
+def seed(seed: Union[int, bytes, None]) -> None:
+    """
+    Make all sampling deterministic with the given seed, or cryptographically secure again if seed is None.
+    :param seed: seed of a SeededRandomSource, or None for a SystemRandomSource.
+    """
+    set_source(SystemRandomSource() if seed is None else SeededRandomSource(seed))
+
+
+def randrange(start: int,
+              stop: int,
+              step: int = 1,
+              length: int = 0,
+              dtype=object,
+              source: Optional[RandomSource] = None) -> Union[int, np.ndarray]:
+    """
+    Generate random integers from [start, stop) with the current random source. See RandomSource.randrange.
+    :param source: random source to draw from instead of the current one, e.g. a spawned stream
+    """
+    return (_source if source is None else source).randrange(start, stop, step, length, dtype)
+
+
+def random_bits(shape: Tuple[int, ...],
+                source: Optional[RandomSource] = None) -> np.ndarray:
+    """
+    Generate an array of random 0s and 1s with the current random source.
+    :param shape: shape of the output array.
+    :param source: random source to draw from instead of the current one, e.g. a spawned stream
+    :return: array of random bits
+    """
+    return (_source if source is None else source).bits(shape)
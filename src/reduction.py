@@ -0,0 +1,164 @@
+from typing import Dict, Iterable, Optional, Union
+import functools
+import time
+import numpy as np
+from src import backend, randomness
+
+# Smallest modulus bit size from which Barrett reduction beats the division of each backend, see benchmark, or None
+# to always divide. It reduces products modulo Python ints about 1.35 times faster from 32768 bits and breaks even at
+# 16384. GMP already divides in subquadratic time, so on gmpy2 it is slower up to 65536 bits and gains too little
+# and too unreliably past that to be worth it.
+MIN_BITS = {'python': 32768, 'gmpy2': None}
+# Bits an input may have past twice the bit size of the modulus to still be reduced by Barrett reduction, e.g. a
+# product of two reduced ciphertexts grown by a few additions.
+SLACK_BITS = 128
+# Inputs need at least 1 / QUOTIENT_FRACTION of the bit size of the modulus more bits than the modulus for Barrett
+# reduction to pay off. The few quotient bits of a sum of encryptions of zero are cheaper to divide out.
+QUOTIENT_FRACTION = 8
+
+
+class BarrettReducer:
+    """
+    Reduce integers modulo a fixed modulus m with multiplications and shifts instead of divisions.
+
+    For 0 <= x < 2^N, k the bit size of m and mu = floor(2^N / m), the estimate q = ((x >> (k - 1)) * mu) >> (N - k + 1)
+    is at most 2 below floor(x / m), so x - q * m is reduced by at most 2 subtractions of m. mu only depends on m and
+    N, so it is computed once per input size and kept.
+
+    Multiplying by mu costs about as much as the division it replaces once x has many more bits than m, as in
+    decryption modulo a private key much smaller than the ciphertexts, while dividing out a short quotient, or dividing
+    small integers, is cheaper than the two multiplications. reduce only uses Barrett reduction where it is faster:
+    on the python backend, for moduli of at least MIN_BITS and inputs of between 1 + 1 / QUOTIENT_FRACTION and 2 times
+    their bit size plus SLACK_BITS, e.g. products of ciphertexts modulo x0, and % otherwise.
+    """
+
+    def __init__(self,
+                 modulus: int):
+        """
+        :param modulus: positive integer, e.g. public_key[0] or a private key
+        """
+        assert modulus > 0
+        self.modulus = modulus
+        self.num_bits = int(modulus).bit_length()
+        self._reciprocals: Dict[int, int] = {}
+
+    def reciprocal(self,
+                   num_bits: int) -> int:
+        """
+        :param num_bits: bit size N of the inputs
+        :return: floor(2^N / modulus) as an integer of the current backend
+        """
+        if num_bits not in self._reciprocals:
+            self._reciprocals[num_bits] = backend.integer(2 ** num_bits // int(self.modulus))
+        return self._reciprocals[num_bits]
+
+    def uses_barrett(self,
+                     num_bits: int) -> bool:
+        """
+        :param num_bits: bit size of the inputs
+        :return: whether reduce uses Barrett reduction for inputs of "num_bits" bits
+        """
+        min_bits = MIN_BITS[backend.get_backend()]
+        return (min_bits is not None and self.num_bits >= min_bits
+                and self.num_bits + self.num_bits // QUOTIENT_FRACTION <= num_bits <= 2 * self.num_bits + SLACK_BITS)
+
+    def barrett(self,
+                values: np.ndarray,
+                num_bits: int) -> np.ndarray:
+        """
+        :param values: object array of non-negative integers smaller than 2^num_bits
+        :param num_bits: bit size of the inputs
+        :return: object array of "values" modulo the modulus, by Barrett reduction
+        """
+        k = self.num_bits
+        # Round the input size up, so that inputs of similar sizes share a reciprocal.
+        num_bits = max(k, -(-num_bits // 64) * 64)
+        modulus = backend.integer(self.modulus)
+        quotients = ((values >> (k - 1)) * self.reciprocal(num_bits)) >> (num_bits - k + 1)
+        remainders = values - quotients * modulus
+        for _ in range(2):
+            remainders = np.where(remainders >= modulus, remainders - modulus, remainders)
+        return remainders
+
+    def reduce(self,
+               values: Union[np.ndarray, int],
+               bit_bound: Optional[int] = None) -> Union[np.ndarray, int]:
+        """
+        :param values: integer or array of integers
+        :param bit_bound: upper bound of the bit size of the absolute values, e.g. Ciphertext.bit_bound. If None, it is
+        computed if needed.
+        :return: "values" % modulus
+        """
+        min_bits = MIN_BITS[backend.get_backend()]
+        if min_bits is None or self.num_bits < min_bits or (isinstance(values, np.ndarray) and values.dtype != object):
+            return values % self.modulus
+        array = np.asarray(values, dtype=object)
+        if array.size == 0:
+            return values % self.modulus
+        if bit_bound is None:
+            bit_bound = int(np.max(np.abs(array))).bit_length()
+        if not self.uses_barrett(bit_bound) or np.any(array < 0):
+            return values % self.modulus
+        # Reduce a 1D array, since operations on 0D object arrays return integers rather than arrays.
+        result = self.barrett(backend.asarray(array.reshape(-1)), bit_bound).reshape(array.shape)
+        return result if isinstance(values, np.ndarray) else result[()]
+
+    def centered(self,
+                 values: Union[np.ndarray, int],
+                 bit_bound: Optional[int] = None) -> Union[np.ndarray, int]:
+        """
+        :param values: integer or array of integers
+        :param bit_bound: upper bound of the bit size of the absolute values, see reduce
+        :return: remainders of "values" modulo the modulus of the smallest absolute value, from
+        [-(modulus // 2), modulus - modulus // 2), e.g. the noise of ciphertexts modulo a private key, which may be
+        negative after reducing modulo a noisy x0
+        """
+        remainders = self.reduce(values, bit_bound)
+        half = self.modulus // 2
+        if not isinstance(remainders, np.ndarray):
+            return remainders - self.modulus if remainders >= self.modulus - half else remainders
+        return np.where(remainders >= self.modulus - half, remainders - self.modulus, remainders)
+
+
+@functools.lru_cache(maxsize=64, typed=True)
+def reducer(modulus: int) -> BarrettReducer:
+    """
+    :param modulus: positive integer
+    :return: the BarrettReducer of "modulus", made once per modulus and type
+    """
+    return BarrettReducer(modulus)
+
+
+def benchmark(int_sizes: Iterable[int] = (1024, 8192, 32768, 131072),
+              num: int = 32,
+              repeat: int = 3) -> Dict[int, dict]:
+    """
+    Time reducing random integers modulo a random modulus of each bit size gamma with % and with Barrett reduction,
+    for products of two reduced integers of 2 * gamma bits and for sums of gamma + 16 bits as in encryption.
+    :param int_sizes: bit sizes gamma of the moduli
+    :param num: number of integers reduced at once
+    :param repeat: number of timings of which the fastest is kept
+    :return: dict by gamma of dicts by input kind, 'product' or 'sum', of the seconds of % and of Barrett reduction
+    per integer, and the speedup of Barrett reduction
+    """
+    def fastest(function) -> float:
+        seconds = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            seconds.append(time.perf_counter() - start)
+        return min(seconds) / num
+
+    report = {}
+    for int_size in int_sizes:
+        modulus = backend.integer(randomness.randrange(2 ** (int_size - 1) + 1, 2 ** int_size, 2))
+        reducer_ = BarrettReducer(modulus)
+        report[int_size] = {}
+        for kind, num_bits in [('product', 2 * int_size), ('sum', int_size + 16)]:
+            values = backend.asarray(randomness.randrange(0, 2 ** num_bits, length=num))
+            assert np.array_equal(reducer_.barrett(values, num_bits), values % modulus)
+            modulo = fastest(lambda: values % modulus)
+            barrett = fastest(lambda: reducer_.barrett(values, num_bits))
+            report[int_size][kind] = {'modulo_seconds': modulo, 'barrett_seconds': barrett,
+                                      'speedup': modulo / barrett}
+    return report
@@ -0,0 +1,233 @@
+from typing import Union
+import json
+import numpy as np
+from src.ciphertext_array import CiphertextArray, LIMB_BITS
+
+# File layout: MAGIC, FORMAT_VERSION as uint16, the length of the header as uint32, the header as UTF-8 JSON padded
+# with spaces so that the data starts at a multiple of ALIGNMENT, then every integer as "num_limbs" little-endian
+# uint64 limbs, least significant limb first, in row-major order of "shape".
+MAGIC = b'DGHV'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+PRIVATE_KEY = 'private_key'
+PUBLIC_KEY = 'public_key'
+CIPHERTEXTS = 'ciphertexts'
+KINDS = (PRIVATE_KEY, PUBLIC_KEY, CIPHERTEXTS)
+
+# Number of integers converted to limbs at a time while writing.
+_WRITE_CHUNK = 4096
+_PREFIX_BYTES = len(MAGIC) + 2 + 4
+
+
+class StoredIntegers:
+    """
+    Integers read from a file written by save. The limbs are memory-mapped, so opening a file only reads its header,
+    and integers are only decoded when they are indexed.
+    """
+
+    def __init__(self,
+                 header: dict,
+                 limbs: np.ndarray):
+        """
+        :param header: header of the file
+        :param limbs: 2D uint64 array of shape (number of integers, num_limbs)
+        """
+        self.header = header
+        self.limbs = limbs
+
+    @property
+    def kind(self) -> str:
+        return self.header['kind']
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(self.header['shape'])
+
+    @property
+    def parameters(self) -> dict:
+        return self.header['parameters']
+
+    def __len__(self) -> int:
+        return self.shape[0] if self.shape else 1
+
+    def array(self) -> CiphertextArray:
+        """
+        :return: CiphertextArray of all integers in row-major order, sharing the memory-mapped limbs
+        """
+        return CiphertextArray(self.limbs)
+
+    def _decode(self, limbs: np.ndarray) -> np.ndarray:
+        """
+        :param limbs: 2D limb matrix of some of the integers
+        :return: 1D array of the integers, int64 if they were saved from an int64 array
+        """
+        if self.header['dtype'] == 'int64':
+            return limbs[:, 0].astype(np.int64)
+        return CiphertextArray(limbs).to_ints()
+
+    def __getitem__(self, index) -> Union[int, np.ndarray]:
+        """
+        :param index: index or slice along the first axis
+        :return: the integers at "index", decoded
+        """
+        rows = int(np.prod(self.shape[1:]))
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            assert step == 1
+            integers = self._decode(self.limbs[start * rows:stop * rows])
+            return integers.reshape((stop - start,) + self.shape[1:])
+        index = range(len(self))[index]
+        integers = self._decode(self.limbs[index * rows:(index + 1) * rows])
+        return integers.reshape(self.shape[1:]) if self.shape[1:] else integers[0]
+
+    def to_array(self) -> Union[int, np.ndarray]:
+        """
+        :return: all integers, decoded: an integer for a private key, otherwise an array of the saved shape
+        """
+        integers = self._decode(self.limbs).reshape(self.shape)
+        return integers[()] if integers.ndim == 0 else integers
+
+
+def save(path: str,
+         kind: str,
+         integers: Union[int, np.ndarray, CiphertextArray],
+         **parameters) -> None:
+    """
+    Write integers to a file without pickling them.
+    :param path: path of the file
+    :param kind: one of KINDS
+    :param integers: non-negative integer, array of non-negative integers or CiphertextArray
+    :param parameters: integers, e.g. the parameters the integers were generated with, stored in the header
+    """
+    if kind not in KINDS:
+        raise ValueError("unknown kind %r, expected one of %s" % (kind, KINDS))
+
+    if isinstance(integers, CiphertextArray):
+        shape, dtype, num_limbs = (len(integers),), 'object', integers.num_limbs
+        chunks = (integers.limbs[i:i + _WRITE_CHUNK] for i in range(0, len(integers), _WRITE_CHUNK))
+    else:
+        values = np.asarray(integers)
+        shape, dtype = values.shape, 'int64' if values.dtype.kind in 'iu' else 'object'
+        values = values.reshape(-1)
+        if np.any(values < 0):
+            raise ValueError("only non-negative integers can be saved")
+        max_bits = max([int(value).bit_length() for value in values] + [1])
+        num_limbs = -(-max_bits // LIMB_BITS)
+        chunks = (CiphertextArray.from_ints(values[i:i + _WRITE_CHUNK], num_limbs).limbs
+                  for i in range(0, len(values), _WRITE_CHUNK))
+
+    header = json.dumps({'kind': kind,
+                         'shape': list(shape),
+                         'dtype': dtype,
+                         'num_limbs': num_limbs,
+                         'parameters': parameters}).encode()
+    padding = -(_PREFIX_BYTES + len(header)) % ALIGNMENT
+    header += b' ' * padding
+
+    with open(path, 'wb') as file:
+        file.write(MAGIC)
+        file.write(FORMAT_VERSION.to_bytes(2, 'little'))
+        file.write(len(header).to_bytes(4, 'little'))
+        file.write(header)
+        for limbs in chunks:
+            file.write(np.ascontiguousarray(limbs, dtype='<u8').tobytes())
+
+
+def load(path: str,
+         mmap: bool = True) -> StoredIntegers:
+    """
+    Open a file written by save.
+    :param path: path of the file
+    :param mmap: whether to memory-map the limbs instead of reading them into memory
+    :return: StoredIntegers of the file
+    """
+    with open(path, 'rb') as file:
+        prefix = file.read(_PREFIX_BYTES)
+        if len(prefix) < _PREFIX_BYTES or prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError("%s is not a file of keys or ciphertexts" % path)
+        version = int.from_bytes(prefix[len(MAGIC):len(MAGIC) + 2], 'little')
+        if version != FORMAT_VERSION:
+            raise ValueError("unsupported format version %d of %s, expected %d" % (version, path, FORMAT_VERSION))
+        header_length = int.from_bytes(prefix[len(MAGIC) + 2:], 'little')
+        header = json.loads(file.read(header_length).decode())
+
+    count = int(np.prod(header['shape']))
+    offset = _PREFIX_BYTES + header_length
+    if mmap and count > 0:
+        limbs = np.memmap(path, dtype='<u8', mode='r', offset=offset, shape=(count, header['num_limbs']))
+    else:
+        limbs = np.fromfile(path, dtype='<u8', offset=offset).reshape(count, header['num_limbs'])
+    return StoredIntegers(header, limbs)
+
+
+def save_private_key(path: str,
+                     private_key: int,
+                     **parameters) -> None:
+    """
+    :param path: path of the file
+    :param private_key: private key of key
+    :param parameters: parameters to store in the header
+    """
+    save(path, PRIVATE_KEY, np.array(int(private_key), dtype=object), **parameters)
+
+
+def save_public_key(path: str,
+                    public_key: np.ndarray,
+                    **parameters) -> None:
+    """
+    :param path: path of the file
+    :param public_key: public key of key
+    :param parameters: parameters to store in the header
+    """
+    save(path, PUBLIC_KEY, public_key, **parameters)
+
+
+def save_ciphertexts(path: str,
+                     ciphertexts: Union[np.ndarray, CiphertextArray],
+                     **parameters) -> None:
+    """
+    :param path: path of the file
+    :param ciphertexts: output of encrypt or encrypt_batch, or a CiphertextArray
+    :param parameters: parameters to store in the header, e.g. the width of encrypt_batch
+    """
+    save(path, CIPHERTEXTS, ciphertexts, **parameters)
+
+
+def _load_kind(path: str,
+               kind: str,
+               mmap: bool) -> StoredIntegers:
+    stored = load(path, mmap)
+    if stored.kind != kind:
+        raise ValueError("%s holds %s, not %s" % (path, stored.kind, kind))
+    return stored
+
+
+def load_private_key(path: str) -> int:
+    """
+    :param path: path of a file written by save_private_key
+    :return: the private key
+    """
+    return _load_kind(path, PRIVATE_KEY, False).to_array()
+
+
+def load_public_key(path: str,
+                    mmap: bool = True) -> Union[np.ndarray, StoredIntegers]:
+    """
+    :param path: path of a file written by save_public_key
+    :param mmap: whether to return the memory-mapped StoredIntegers instead of decoding the whole key
+    :return: the public key
+    """
+    stored = _load_kind(path, PUBLIC_KEY, mmap)
+    return stored if mmap else stored.to_array()
+
+
+def load_ciphertexts(path: str,
+                     mmap: bool = True) -> Union[np.ndarray, StoredIntegers]:
+    """
+    :param path: path of a file written by save_ciphertexts
+    :param mmap: whether to return the memory-mapped StoredIntegers instead of decoding all ciphertexts
+    :return: the ciphertexts
+    """
+    stored = _load_kind(path, CIPHERTEXTS, mmap)
+    return stored if mmap else stored.to_array()
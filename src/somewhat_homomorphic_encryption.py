@@ -1,7 +1,9 @@
 import numpy as np
-from typing import Union, Tuple, Any
-import random
-import math
+from typing import Union, Tuple, Any, Optional, Callable
+from concurrent.futures import ProcessPoolExecutor
+from src import randomness, backend, primes, reduction
+from src.subset_sum import SubsetSumTable
+from src.bit_codec import int2binary_array, binary_array2int, int2binary_matrix, binary_matrix2int
 
 
 def randint(start: int,
@@ -9,10 +11,7 @@ def randint(start: int,
             step: int = 1,
             length: int = 0,
             dtype=object) -> Union[int, np.ndarray]:
-    if length == 0:
-        return random.randrange(start, stop, step)
-    else:
-        return np.array([random.randrange(start, stop, step) for _ in range(length)], dtype=dtype)
+    return randomness.randrange(start, stop, step, length, dtype)
 
 
 def private_key(num_bits: int) -> int:
@@ -36,11 +35,12 @@ def public_key_candidate(size: int,
     :param int_size: bit size of the integers in the public key
     :param noise_size: bit size of noise
     :param private_key: private key
-    :return: 1D array of a public key
+    :return: 1D array of a public key, native int64 if its integers fit, see src.backend.dtype
     """
+    dtype = backend.dtype(max(int_size, noise_size) + 1)
     key = (private_key *
-           randint(0, math.floor((2 ** int_size) / private_key), length=size)
-           + noise(noise_size, size))
+           backend.asarray(randint(0, (2 ** int_size) // private_key, length=size, dtype=dtype))
+           + noise(noise_size, size, dtype))
 
     max_index = np.argmax(key)
 
@@ -59,89 +59,489 @@ def move_max(key: np.ndarray,
     key[0] = max
 
 
+def _sample_whole_public_keys(size: int,
+                              q_bound: int,
+                              noise_start: int,
+                              noise_stop: int,
+                              private_key: int,
+                              is_valid_max: Callable[[int], bool],
+                              dtype=object) -> Tuple[np.ndarray, int]:
+    """
+    Sample whole public keys until the largest integer is valid. See sample_public_key.
+    """
+    attempts = 0
+    while True:
+        attempts += 1
+        key = (private_key * backend.asarray(randint(0, q_bound, length=size, dtype=dtype))
+               + randint(noise_start, noise_stop, length=size, dtype=dtype))
+        max_index = np.argmax(key)
+        if is_valid_max(key[max_index]):
+            move_max(key, max_index)
+            return key, attempts
+
+
+def _max_candidates(prefixes: np.ndarray,
+                    q_bound: int) -> np.ndarray:
+    """
+    :param prefixes: uint64 array of the top 64 bits of the random (bit size of q_bound + 64)-bit y of each q
+    :param q_bound: end of the range of q (exclusive)
+    :return: indices of the integers that can be the largest once their y is completed
+    """
+    suffix_bits = q_bound.bit_length()
+    num_bits = suffix_bits + 64
+
+    # Smallest q of the integer with the largest prefix, the smallest y reaching it, and so the smallest prefix
+    # an integer needs to possibly be the largest.
+    min_q = ((int(prefixes.max()) << suffix_bits) * q_bound) >> num_bits
+    min_y = -(-(min_q << num_bits) // q_bound)
+    return np.flatnonzero(prefixes >= np.uint64(min_y >> suffix_bits))
+
+
+def sample_public_key(size: int,
+                      q_bound: int,
+                      noise_start: int,
+                      noise_stop: int,
+                      private_key: int,
+                      is_valid_max: Callable[[int], bool],
+                      dtype=object,
+                      workers: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """
+    Sample "size" integers x = p * q + r, where q is from [0, q_bound) and r from [noise_start, noise_stop), until the
+    largest of them is valid, and move the largest to index 0.
+
+    The output has the same distribution as sampling whole keys until one is valid, but a rejected key only costs
+    64 random bits per integer. Each q is drawn as floor(y * q_bound / 2^k) for a random k-bit y whose top 64 bits
+    are drawn first. As q never decreases with y and r is too small to reorder integers with different q, only the
+    integers whose top 64 bits are close to the largest can be the largest integer. Only these are completed to
+    decide whether to reject, and the rest are completed once the key is accepted.
+    :param size: number of integers in the public key
+    :param q_bound: end of the range of q (exclusive)
+    :param noise_start: start of the range of r (inclusive)
+    :param noise_stop: end of the range of r (exclusive)
+    :param private_key: private key p
+    :param is_valid_max: whether the largest integer of a key is acceptable as its first integer
+    :param dtype: dtype of the public key
+    :param workers: number of processes completing integers, see _sample_public_key_in_workers. If None, the key is
+    sampled in this process directly from the current random source.
+    :return: 1D array public key, and the number of keys sampled
+    """
+    if workers is not None:
+        return _sample_public_key_in_workers(size, q_bound, noise_start, noise_stop, private_key, is_valid_max, dtype,
+                                             workers)
+    if dtype is not object or q_bound < 2 ** 64 or noise_stop - noise_start > private_key:
+        return _sample_whole_public_keys(size, q_bound, noise_start, noise_stop, private_key, is_valid_max, dtype)
+
+    source = randomness.get_source()
+    suffix_bits = q_bound.bit_length()
+    num_bits = suffix_bits + 64
+
+    def complete(prefixes: np.ndarray) -> np.ndarray:
+        suffixes = source.randbits(suffix_bits, len(prefixes))
+        noises = source.randrange(noise_start, noise_stop, length=len(prefixes))
+        qs = [((int(prefix) << suffix_bits | suffix) * q_bound) >> num_bits
+              for prefix, suffix in zip(prefixes, suffixes)]
+        return private_key * backend.asarray(qs) + noises
+
+    attempts = 0
+    while True:
+        attempts += 1
+        prefixes = np.frombuffer(source.randbytes(8 * size), dtype='<u8')
+        candidates = _max_candidates(prefixes, q_bound)
+
+        candidate_integers = complete(prefixes[candidates])
+        max_candidate = np.argmax(candidate_integers)
+        if is_valid_max(candidate_integers[max_candidate]):
+            break
+
+    key = np.empty(size, dtype=object)
+    key[candidates] = candidate_integers
+    others = np.setdiff1d(np.arange(size), candidates)
+    key[others] = complete(prefixes[others])
+
+    move_max(key, candidates[max_candidate])
+    return key, attempts
+
+
+def _complete_integers(seed: bytes,
+                       attempt: int,
+                       indices: np.ndarray,
+                       prefixes: np.ndarray,
+                       q_bound: int,
+                       noise_start: int,
+                       noise_stop: int,
+                       private_key: int) -> list:
+    """
+    Complete integers of a public key from the top 64 bits of their y, drawing the rest of y and the noise of integer
+    i of attempt a from the stream spawned for (a, i). Runs in worker processes.
+    :param seed: seed of the SeededRandomSource the streams are spawned from
+    :param attempt: index of the sampled key
+    :param indices: indices of the integers in the key
+    :param prefixes: top 64 bits of the y of each integer
+    :return: list of the integers p * q + r
+    """
+    source = randomness.SeededRandomSource(seed)
+    suffix_bits = q_bound.bit_length()
+    num_bits = suffix_bits + 64
+    p = backend.integer(private_key)
+
+    integers = []
+    for index, prefix in zip(indices, prefixes):
+        stream = source.spawn(attempt, int(index))
+        y = int(prefix) << suffix_bits | stream.randbits(suffix_bits, 1)[0]
+        integers.append(p * ((y * q_bound) >> num_bits) + stream.randrange(noise_start, noise_stop))
+    return integers
+
+
+def _complete_in_workers(executor: Optional[ProcessPoolExecutor],
+                         workers: int,
+                         seed: bytes,
+                         tasks: list,
+                         args: tuple) -> list:
+    """
+    Run _complete_integers for every task, split into chunks across the processes of "executor".
+    :param executor: pool of "workers" processes, or None to complete the integers in this process
+    :param workers: number of processes
+    :param seed: seed of the SeededRandomSource the streams are spawned from
+    :param tasks: list of (attempt, indices, prefixes)
+    :param args: q_bound, noise_start, noise_stop and private_key of _complete_integers
+    :return: list of the integers completed for each task
+    """
+    if executor is None:
+        return [_complete_integers(seed, attempt, indices, prefixes, *args) for attempt, indices, prefixes in tasks]
+    futures = []
+    for attempt, indices, prefixes in tasks:
+        chunk_size = max(1, -(-len(indices) // (4 * workers)))
+        futures.append([executor.submit(_complete_integers, seed, attempt, indices[i:i + chunk_size],
+                                        prefixes[i:i + chunk_size], *args)
+                        for i in range(0, len(indices), chunk_size)])
+    return [[integer for future in chunk_futures for integer in future.result()] for chunk_futures in futures]
+
+
+def _sample_public_key_in_workers(size: int,
+                                  q_bound: int,
+                                  noise_start: int,
+                                  noise_stop: int,
+                                  private_key: int,
+                                  is_valid_max: Callable[[int], bool],
+                                  dtype,
+                                  workers: int) -> Tuple[np.ndarray, int]:
+    """
+    Sample a public key like sample_public_key, splitting the work across "workers" processes. All randomness comes
+    from streams spawned from one seed drawn from the current random source: the prefixes of attempt a from stream
+    (a), the rest of integer i of attempt a from stream (a, i). Attempts are checked "workers" at a time and the first
+    valid one is accepted, so the key and the number of attempts only depend on the seed, not on the number of workers.
+    """
+    assert workers > 0
+    seed = randomness.get_source().randbytes(32)
+    source = randomness.SeededRandomSource(seed)
+    args = (q_bound, noise_start, noise_stop, private_key)
+    all_candidates = noise_stop - noise_start > private_key
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+
+    def complete(tasks: list) -> list:
+        return _complete_in_workers(executor, workers, seed, tasks, args)
+
+    try:
+        attempt = 0
+        accepted = None
+        while accepted is None:
+            tasks = []
+            for a in range(attempt, attempt + workers):
+                prefixes = np.frombuffer(source.spawn(a).randbytes(8 * size), dtype='<u8')
+                candidates = np.arange(size) if all_candidates else _max_candidates(prefixes, q_bound)
+                tasks.append((a, candidates, prefixes[candidates]))
+
+            for (a, candidates, _), integers in zip(tasks, complete(tasks)):
+                candidate_integers = backend.asarray(integers)
+                max_candidate = np.argmax(candidate_integers)
+                if is_valid_max(candidate_integers[max_candidate]):
+                    accepted = a, candidates, candidate_integers, max_candidate
+                    break
+            attempt += workers
+
+        attempt, candidates, candidate_integers, max_candidate = accepted
+        prefixes = np.frombuffer(source.spawn(attempt).randbytes(8 * size), dtype='<u8')
+        others = np.setdiff1d(np.arange(size), candidates)
+        key = np.empty(size, dtype=object)
+        key[candidates] = candidate_integers
+        key[others] = backend.asarray(complete([(attempt, others, prefixes[others])])[0])
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    move_max(key, candidates[max_candidate])
+    if dtype is not object:
+        key = np.array([int(integer) for integer in key], dtype=dtype)
+    return key, attempt + 1
+
+
+def error_free_q0(int_size: int,
+                  multiple: int,
+                  factor_bits: int) -> int:
+    """
+    Generate q0 such that x0 = multiple * q0 has exactly int_size bits, as a product of distinct primes of factor_bits
+    bits and one last prime of between factor_bits and 2 * factor_bits bits, so that q0 has no small prime factor.
+    :param int_size: bit size of x0
+    :param multiple: what x0 is a multiple of, e.g. the private key or the product of the private keys of all slots
+    :param factor_bits: bit size of the prime factors of q0
+    :return: q0
+    """
+    multiple = backend.integer(multiple)
+    if int_size - multiple.bit_length() < factor_bits:
+        raise ValueError("%d-bit x0 cannot be a multiple of a %d-bit integer and a %d-bit prime"
+                         % (int_size, multiple.bit_length(), factor_bits))
+    q0 = backend.integer(1)
+    # Independent primes, not neighbours from one sieve window nor primes cached from the key of another call.
+    for factor in primes.primes(factor_bits, (int_size - multiple.bit_length()) // factor_bits - 1, independent=True):
+        q0 *= factor
+    # [2^{int_size - 1} / x, 2^int_size / x) contains a prime by Bertrand's postulate.
+    x = multiple * q0
+    return q0 * primes.prime_in_range(-(-(2 ** (int_size - 1)) // x), (2 ** int_size - 1) // x + 1)
+
+
+def error_free_x0(int_size: int,
+                  private_key: int,
+                  factor_bits: Optional[int] = None) -> int:
+    """
+    Generate x0 = p * q0 without noise, where q0 is error_free_q0. q0 must have no prime factor much smaller than p,
+    otherwise factoring it out of x0 with ECM reveals p, so factor_bits is at least the bit size of p.
+    :param int_size: bit size of x0
+    :param private_key: private key p
+    :param factor_bits: bit size of the prime factors of q0, at least that of p. If None, that of p.
+    :return: x0
+    """
+    p = backend.integer(private_key)
+    if factor_bits is None:
+        factor_bits = p.bit_length()
+    if factor_bits < p.bit_length():
+        raise ValueError("%d-bit factors of q0 are smaller than a %d-bit private key"
+                         % (factor_bits, p.bit_length()))
+    return p * error_free_q0(int_size, p, factor_bits)
+
+
+def _sample_below_in_workers(size: int,
+                             q_bound: int,
+                             noise_size: int,
+                             private_key: int,
+                             workers: int) -> list:
+    """
+    Sample "size" integers p * q + r, where q is from [0, q_bound) and r from [0, 2^noise_size), without rejecting
+    any, across "workers" processes. Like the accepted attempt of _sample_public_key_in_workers, the prefixes come
+    from stream (0) and the rest of integer i from stream (0, i) spawned from one seed drawn from the current random
+    source, so the integers only depend on the seed, not on the number of workers.
+    :return: list of the integers
+    """
+    assert workers > 0
+    seed = randomness.get_source().randbytes(32)
+    prefixes = np.frombuffer(randomness.SeededRandomSource(seed).spawn(0).randbytes(8 * size), dtype='<u8')
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        return _complete_in_workers(executor, workers, seed, [(0, np.arange(size), prefixes)],
+                                    (q_bound, 0, 2 ** noise_size, private_key))[0]
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
 def public_key(size: int,
                int_size: int,
                noise_size: int,
-               private_key: int) -> np.ndarray:
+               private_key: int,
+               return_attempts: bool = False,
+               workers: Optional[int] = None,
+               error_free: bool = False,
+               factor_bits: Optional[int] = None) -> Union[np.ndarray, Tuple[np.ndarray, int]]:
     """
     Generate a public key. The first integer k0 in the key is the largest and is odd, and k0 % private_key is even.
     :param size: number of integers in the public key
     :param int_size: bit size of the integers in the public key
     :param noise_size: bit size of noise
     :param private_key: private key
-    :return: 1D array public key
+    :param return_attempts: whether to also return the number of keys sampled until k0 was valid
+    :param workers: number of processes to sample the key in. For the same seed of src.randomness, every number of
+    workers gives the same key. If None, the key is sampled in this process.
+    :param error_free: whether k0 is the noise-free error_free_x0 instead. The other integers are then drawn below
+    k0 without rejecting any key, and reducing modulo k0 adds no noise however large the reduced integer is.
+    :param factor_bits: bit size of the prime factors of k0 / private_key if error_free, see error_free_x0
+    :return: 1D array public key, and the number of keys sampled if return_attempts
     """
-    key, max_index = public_key_candidate(size, int_size, noise_size, private_key)
-    while key[max_index] % 2 == 0 or (key[max_index] % private_key) % 2 == 1:
-        key, max_index = public_key_candidate(size, int_size, noise_size, private_key)
+    if error_free:
+        x0 = error_free_x0(int_size, private_key, factor_bits)
+        dtype = backend.dtype(max(int_size, noise_size) + 1)
+        key = np.empty(size, dtype=dtype)
+        key[0] = x0
+        if workers is not None:
+            key[1:] = _sample_below_in_workers(size - 1, x0 // private_key, noise_size, private_key, workers)
+        else:
+            key[1:] = (private_key * backend.asarray(randint(0, x0 // private_key, length=size - 1, dtype=dtype))
+                       + noise(noise_size, size - 1, dtype))
+        return (key, 1) if return_attempts else key
 
-    move_max(key, max_index)
+    q_bound = (2 ** int_size) // private_key
+    if q_bound < 2 and 2 ** noise_size <= private_key:
+        raise ValueError("%d-bit public key integers cannot be odd multiples of a %d-bit private key"
+                         % (int_size, int(private_key).bit_length()))
 
-    return key
+    key, attempts = sample_public_key(size,
+                                      q_bound,
+                                      0,
+                                      2 ** noise_size,
+                                      private_key,
+                                      lambda k0: k0 % 2 == 1 and (k0 % private_key) % 2 == 0,
+                                      backend.dtype(max(int_size, noise_size) + 1),
+                                      workers)
+
+    return (key, attempts) if return_attempts else key
 
 
 def noise(noise_size: int,
-          length: int) -> np.ndarray:
+          length: int,
+          dtype=object,
+          source: Optional[randomness.RandomSource] = None) -> np.ndarray:
     """
     Generate random noises from integers in (-2^noise_size, 2^noise_size).
     :param noise_size: bit length of each noise.
     :param shape: length of the 1D output numpy array
+    :param dtype: dtype of the output array
+    :param source: random source to draw from instead of the current one
     :return: ndarray of noises.
     """
     # return randint(1 - (2 ** noise_size), 2 ** noise_size, length=length)
-    return randint(0, 2 ** noise_size, length=length)
+    return randomness.randrange(0, 2 ** noise_size, length=length, dtype=dtype, source=source)
 
 
 def selected_sum(numbers: np.ndarray,
-                 num: int) -> np.ndarray:
+                 num: int,
+                 table: Optional[SubsetSumTable] = None,
+                 source: Optional[randomness.RandomSource] = None) -> np.ndarray:
     """
     Sum a random subset of "numbers".
     :param numbers: ndarray of scalars
     :param num: number of times to sum subsets of "numbers"
+    :param table: SubsetSumTable of "numbers" to look sums up in instead of adding every selected number
+    :param source: random source to draw the subsets from instead of the current one
     :return: ndarray of shape (num,) containing sums of random subsets of "numbers".
     """
-    return np.random.choice([0, 1], size=(num, len(numbers))) @ numbers
+    if table is not None:
+        assert table.length == len(numbers)
+        return table.sample(num, source)
+    return backend.subset_sum(randomness.random_bits((num, len(numbers)), source), numbers)
 
 
-def int2binary_array(integer: int) -> np.ndarray:
+def subset_sum_table(public_key: np.ndarray,
+                     group_size: int = 4) -> SubsetSumTable:
     """
-    Create a 1D array containing the binary digits of a non-negative integer.
-    :param integer: non-negative integer of which the binary digits are to store in a 1D array.
-    :return: 1D array of binary digits.
+    Precompute subset sums of a public key once, to be reused by every encryption under it.
+    :param public_key: 1D array public key
+    :param group_size: number of integers of the public key per table, see SubsetSumTable
+    :return: SubsetSumTable of public_key[1:]
     """
-    assert 0 <= integer
-    return np.array(list(map(int, bin(integer)[2:])))
-
-
-def binary_array2int(bits) -> int:
-    """
-    Create an integer from an array containing its binary digits.
-    :param bits: 1D array of binary digits.
-    :return: integer bits represents.
-    """
-    return int(''.join(map(str, bits)), 2)
+    return SubsetSumTable(public_key[1:], group_size)
 
 
 def key(private_key_length: int,
         public_key_length: int,
         public_key_bits: int,
-        primary_noise_size: int) -> Tuple:
+        primary_noise_size: int,
+        workers: Optional[int] = None,
+        error_free: bool = False) -> Tuple:
     k = private_key(private_key_length)
-    return k, public_key(public_key_length, public_key_bits, primary_noise_size, k)
+    return k, public_key(public_key_length, public_key_bits, primary_noise_size, k, workers=workers,
+                         error_free=error_free)
+
+
+def ciphertext_dtype(public_key: np.ndarray,
+                     secondary_noise_size: int):
+    """
+    Choose how to store ciphertexts. They are native int64 if the public key is, i.e. if ciphertexts reduced modulo
+    its first integer fit, and noises of secondary_noise_size bits fit as well.
+    :param public_key: 1D array public key
+    :param secondary_noise_size: bit size of noise
+    :return: dtype of ciphertexts
+    """
+    if public_key.dtype == object:
+        return object
+    return backend.dtype(int(public_key[0]).bit_length(), secondary_noise_size + 2)
+
+
+def encryptions_of_zero(num: int,
+                        public_key: np.ndarray,
+                        secondary_noise_size: int,
+                        table: Optional[SubsetSumTable] = None) -> np.ndarray:
+    """
+    Encrypt 0 "num" times. This is the part of encryption that does not depend on the plaintext, so a plaintext bit m
+    is encrypted by (m + c) % public_key[0] for a fresh encryption of zero c.
+    :param num: number of encryptions
+    :param public_key: 1D array public key
+    :param secondary_noise_size: bit size of noise
+    :param table: subset_sum_table of the public key, if precomputed
+    :return: 1D numpy array of shape (num,) of encryptions of 0
+    """
+    dtype = ciphertext_dtype(public_key, secondary_noise_size)
+
+    return reduction.reducer(public_key[0]).reduce(2 * noise(secondary_noise_size, num, dtype)
+                                                   + 2 * selected_sum(public_key[1:], num, table))
 
 
 def encrypt(plaintext: int,
             public_key: np.ndarray,
-            secondary_noise_size: int) -> np.ndarray:
-    bits = int2binary_array(plaintext)
+            secondary_noise_size: int,
+            width: Optional[int] = None,
+            signed: bool = False,
+            table: Optional[SubsetSumTable] = None) -> np.ndarray:
+    bits = int2binary_array(plaintext, width, signed)
+    dtype = ciphertext_dtype(public_key, secondary_noise_size)
 
-    return ((bits
-             + 2 * noise(secondary_noise_size, len(bits))
-             + 2 * selected_sum(public_key[1:], len(bits)))
-            % public_key[0])
+    return reduction.reducer(public_key[0]).reduce(bits
+                                                   + 2 * noise(secondary_noise_size, len(bits), dtype)
+                                                   + 2 * selected_sum(public_key[1:], len(bits), table))
 
 
 def decrypt(ciphertext: np.ndarray,
-            private_key: int) -> int:
-    bits = (ciphertext % private_key) % 2
-    return binary_array2int(bits)
+            private_key: int,
+            signed: bool = False) -> int:
+    bits = reduction.reducer(private_key).centered(backend.asarray(ciphertext)) % 2
+    return binary_array2int(bits, signed)
+
+
+def encrypt_batch(plaintexts,
+                  public_key: np.ndarray,
+                  secondary_noise_size: int,
+                  width: int,
+                  signed: bool = False,
+                  table: Optional[SubsetSumTable] = None,
+                  source: Optional[randomness.RandomSource] = None) -> np.ndarray:
+    """
+    Encrypt many plaintexts at once, each as "width" bits. Noises and subset sums of the public key are drawn for
+    all bits in one pass.
+    :param plaintexts: 1D sequence of non-negative integers smaller than 2^width
+    :param public_key: 1D array public key
+    :param secondary_noise_size: bit size of noise
+    :param width: number of bits every plaintext is encrypted as
+    :param signed: whether to encrypt negative plaintexts in two's complement
+    :param table: subset_sum_table of the public key, if precomputed
+    :param source: random source to draw from instead of the current one, e.g. a stream spawned for a chunk of work,
+    which leaves the source of other threads untouched
+    :return: 2D numpy array of shape (len(plaintexts), width), row i encrypts plaintexts[i] most significant bit first
+    """
+    bits = int2binary_matrix(plaintexts, width, signed)
+    shape = bits.shape
+    dtype = ciphertext_dtype(public_key, secondary_noise_size)
+    noises = noise(secondary_noise_size, bits.size, dtype, source).reshape(shape)
+    sums = selected_sum(public_key[1:], bits.size, table, source).reshape(shape)
+
+    return reduction.reducer(public_key[0]).reduce(bits + 2 * noises + 2 * sums)
+
+
+def decrypt_batch(ciphertexts: np.ndarray,
+                  private_key: int,
+                  signed: bool = False) -> np.ndarray:
+    """
+    Decrypt a 2D array of ciphertexts produced by encrypt_batch.
+    :param ciphertexts: 2D numpy array of shape (number of plaintexts, width)
+    :param private_key: private key
+    :param signed: whether the plaintexts were encrypted in two's complement
+    :return: 1D numpy array of plaintexts
+    """
+    bits = reduction.reducer(private_key).centered(backend.asarray(ciphertexts)) % 2
+    return binary_matrix2int(bits, signed)
@@ -0,0 +1,63 @@
+from typing import Optional
+import numpy as np
+from src import backend, randomness
+
+
+class SubsetSumTable:
+    """
+    Sums of all subsets of consecutive groups of "group_size" numbers, i.e. the method of Four Russians. A random
+    subset sum of all numbers is then one table lookup and one addition per group instead of one addition per selected
+    number. The tables hold 2^{group_size} / group_size times as many integers as "numbers".
+    """
+
+    def __init__(self,
+                 numbers: np.ndarray,
+                 group_size: int = 4):
+        """
+        :param numbers: 1D array of integers, e.g. public_key[1:]
+        :param group_size: number of integers per group
+        """
+        assert group_size > 0
+        numbers = backend.asarray(numbers)
+        num_groups = -(-len(numbers) // group_size)
+        padded = np.zeros(num_groups * group_size, dtype=numbers.dtype)
+        if numbers.dtype == object:
+            padded[:] = backend.integer(0)
+        padded[:len(numbers)] = numbers
+
+        # Entry i of a group's table is the sum of the numbers selected by the bits of i, each entry being one
+        # addition to an entry computed before.
+        groups = padded.reshape(num_groups, group_size)
+        tables = groups[:, :1] * 0
+        for j in range(group_size):
+            tables = np.concatenate([tables, tables + groups[:, j:j + 1]], axis=1)
+
+        self.length = len(numbers)
+        self.group_size = group_size
+        self.tables = tables
+        self._weights = 1 << np.arange(group_size)
+
+    @property
+    def num_groups(self) -> int:
+        return self.tables.shape[0]
+
+    def subset_sum(self, selection: np.ndarray) -> np.ndarray:
+        """
+        :param selection: array of 0s and 1s of shape (..., number of integers)
+        :return: array of shape selection.shape[:-1] of the sums of the selected integers
+        """
+        selection = np.asarray(selection)
+        padding = self.num_groups * self.group_size - self.length
+        selection = np.pad(selection, [(0, 0)] * (selection.ndim - 1) + [(0, padding)])
+        indices = selection.reshape(selection.shape[:-1] + (self.num_groups, self.group_size)) @ self._weights
+        return self.tables[np.arange(self.num_groups), indices].sum(axis=-1)
+
+    def sample(self,
+               num: int,
+               source: Optional[randomness.RandomSource] = None) -> np.ndarray:
+        """
+        :param num: number of random subset sums
+        :param source: random source to draw the subsets from instead of the current one
+        :return: 1D array of shape (num,) of sums of uniformly random subsets of the integers
+        """
+        return self.subset_sum(randomness.random_bits((num, self.length), source))
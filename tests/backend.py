@@ -0,0 +1,70 @@
+import unittest
+import random
+from src.backend import *
+from src import backend, private_key_somewhat_homomorphic_encryption, somewhat_homomorphic_encryption
+
+
+class SetBackend(unittest.TestCase):
+    def tearDown(self) -> None:
+        set_backend(self.original)
+
+    def setUp(self) -> None:
+        self.original = get_backend()
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            set_backend('fortran')
+
+    def test_python(self):
+        set_backend('python')
+        array = asarray(np.array([3, 2 ** 100], dtype=object))
+        self.assertTrue(type(array[1]) is int)
+
+    @unittest.skipIf(backend.gmpy2 is None, "gmpy2 is not installed")
+    def test_gmpy2(self):
+        set_backend('gmpy2')
+        array = asarray(np.array([3, 2 ** 100], dtype=object))
+        self.assertTrue(type(array[1]) is type(gmpy2.mpz(0)))
+        self.assertEqual(2 ** 100, array[1])
+
+
+class SubsetSum(unittest.TestCase):
+    def test_matches_matmul(self):
+        numbers = np.array([random.randrange(0, 2 ** 300) for _ in range(17)], dtype=object)
+        selection = np.random.randint(0, 2, size=(40, 17))
+        self.assertTrue(np.all(subset_sum(selection, numbers) == selection.astype(object) @ numbers))
+
+    def test_empty_selection(self):
+        numbers = np.array([4, 9])
+        self.assertTrue(np.all(subset_sum(np.zeros((3, 2)), numbers) == 0))
+
+
+class EncryptDecryptAllBackends(unittest.TestCase):
+    def setUp(self) -> None:
+        self.original = get_backend()
+
+    def tearDown(self) -> None:
+        set_backend(self.original)
+
+    def backends(self):
+        return [name for name in BACKENDS if name != 'gmpy2' or backend.gmpy2 is not None]
+
+    def test_private_key(self):
+        for name in self.backends():
+            set_backend(name)
+            k = private_key_somewhat_homomorphic_encryption.key(100)
+            plaintext = random.randrange(0, 2 ** 64)
+            ciphertext = private_key_somewhat_homomorphic_encryption.encrypt(plaintext, k, 120)
+            self.assertEqual(plaintext, private_key_somewhat_homomorphic_encryption.decrypt(ciphertext, k))
+
+    def test_public_key(self):
+        for name in self.backends():
+            set_backend(name)
+            private_key, public_key = somewhat_homomorphic_encryption.key(20, 4, 40, 1)
+            plaintext = random.randrange(0, 2 ** 16)
+            ciphertext = somewhat_homomorphic_encryption.encrypt(plaintext, public_key, 2)
+            self.assertEqual(plaintext, somewhat_homomorphic_encryption.decrypt(ciphertext, private_key))
+
+
+if __name__ == '__main__':
+    unittest.main()
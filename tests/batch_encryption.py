@@ -0,0 +1,107 @@
+import unittest
+import math
+from src.batch_encryption import *
+from src.ciphertext import Ciphertext
+from src import primes
+from src.primes import is_probable_prime
+
+
+class Key(unittest.TestCase):
+
+    def test_private_key(self):
+        keys = private_key(5, 40)
+        self.assertTrue(len(keys) == 5)
+        for i in range(5):
+            self.assertTrue(is_probable_prime(keys[i]) and keys[i].bit_length() == 40)
+            for j in range(i):
+                self.assertTrue(math.gcd(keys[i], keys[j]) == 1)
+
+    def test_crt(self):
+        moduli = [7, 9, 11, 13]
+        residues = np.array([[3, 4, 5, 6], [0, 0, 0, 1]], dtype=object)
+        integers = crt(residues, moduli)
+        for integer, row in zip(integers, residues):
+            self.assertTrue(0 <= integer < 9009)
+            self.assertEqual(list(row), [integer % m for m in moduli])
+
+    def test_public_key(self):
+        keys, public_key_, units = key(3, 60, 10, 300, 2)
+        self.assertTrue(all(public_key_[0] % p == 0 for p in keys))
+        self.assertTrue(2 ** 299 <= public_key_[0] < 2 ** 300)
+        self.assertTrue(np.all(decrypt(public_key_[1:], keys) == 0))
+        self.assertTrue(np.array_equal(np.eye(3), decrypt(units, keys)))
+        q0 = int(public_key_[0]) // math.prod(int(p) for p in keys)
+        self.assertTrue(math.gcd(q0, math.prod(int(p) for p in keys)) == 1)
+        self.assertTrue(np.all(primes.residues(q0) != 0))
+
+    def test_too_small(self):
+        with self.assertRaises(ValueError):
+            public_key(4, 100, 2, private_key(3, 40))
+
+
+class EncryptDecrypt(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.private_key, self.public_key, self.units = key(4, 80, 10, 500, 2)
+
+    def encrypt(self, slots: np.ndarray) -> Ciphertext:
+        return Ciphertext(encrypt(slots, self.public_key, self.units), self.public_key[0])
+
+    def test_encrypt(self):
+        slots = randint(0, 2, length=40, dtype=np.int64).reshape(10, 4)
+        ciphertexts = encrypt(slots, self.public_key, self.units)
+        self.assertTrue(ciphertexts.shape == (10,))
+        self.assertTrue(np.array_equal(slots, decrypt(ciphertexts, self.private_key)))
+        ciphertexts = encrypt(slots, self.public_key, self.units, secondary_noise_size=4)
+        self.assertTrue(np.array_equal(slots, decrypt(ciphertexts, self.private_key)))
+
+    def test_slot_wise(self):
+        a = randint(0, 2, length=40, dtype=np.int64).reshape(10, 4)
+        b = randint(0, 2, length=40, dtype=np.int64).reshape(10, 4)
+        x, y = self.encrypt(a), self.encrypt(b)
+        self.assertTrue(np.array_equal(a ^ b, decrypt((x + y).values, self.private_key)))
+        self.assertTrue(np.array_equal(a & b, decrypt((x * y).values, self.private_key)))
+        self.assertTrue(np.array_equal(a | b, decrypt((x | y).values, self.private_key)))
+
+
+class Recrypt(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.int_size = 1312
+        self.private_key, self.public_key, self.units = key(4, 256, 10, 1300, 2)
+        self.sparse_private_keys = sparse_private_keys(4, 32, 4)
+        self.secondary_public_key = secondary_public_key(32, self.int_size, self.sparse_private_keys,
+                                                         self.private_key)
+        self.slots = randint(0, 2, length=12, dtype=np.int64).reshape(3, 4)
+        self.ciphertexts = Ciphertext(encrypt(self.slots, self.public_key, self.units), self.public_key[0])
+
+    def engine(self, permutation=None) -> RecryptEngine:
+        return recrypt_engine(self.sparse_private_keys, self.public_key, self.units, self.secondary_public_key,
+                              self.int_size, permutation)
+
+    def test_sparse_private_keys(self):
+        self.assertTrue(self.sparse_private_keys.shape == (4, 4))
+        self.assertEqual(16, len(set(self.sparse_private_keys.reshape(-1))))
+        self.assertTrue(np.array_equal(np.tile(np.arange(4), (4, 1)), self.sparse_private_keys // 8))
+
+    def test_recrypt(self):
+        engine = self.engine()
+        ciphertexts = self.ciphertexts
+        for i in range(10):
+            ciphertexts = engine.recrypt(ciphertexts * ciphertexts)
+        self.assertTrue(np.array_equal(self.slots, decrypt(ciphertexts.values, self.private_key)))
+
+    def test_rotate(self):
+        rotated = self.engine(rotation(4, 1)).recrypt(self.ciphertexts)
+        self.assertTrue(np.array_equal(np.roll(self.slots, 1, axis=-1), decrypt(rotated.values, self.private_key)))
+
+    def test_permute(self):
+        permutation = np.array([2, 0, 3, 1])
+        permuted = self.engine(permutation).recrypt(self.ciphertexts)
+        expected = np.empty_like(self.slots)
+        expected[:, permutation] = self.slots
+        self.assertTrue(np.array_equal(expected, decrypt(permuted.values, self.private_key)))
+
+
+if __name__ == '__main__':
+    unittest.main()
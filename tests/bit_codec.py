@@ -0,0 +1,71 @@
+import unittest
+import random
+from src.bit_codec import *
+
+
+class Int2BinaryArray(unittest.TestCase):
+    def test_simple(self):
+        integer = 47
+        expected_array = np.array([1, 0, 1, 1, 1, 1])
+        actual_array = int2binary_array(integer)
+        self.assertTrue(np.array_equal(expected_array, actual_array))
+
+    def test_zero(self):
+        self.assertTrue(np.array_equal(np.array([0]), int2binary_array(0)))
+
+    def test_fixed_width(self):
+        integer = 5
+        expected_array = np.array([0, 0, 0, 0, 0, 1, 0, 1])
+        actual_array = int2binary_array(integer, 8)
+        self.assertTrue(np.array_equal(expected_array, actual_array))
+
+    def test_signed(self):
+        integer = -6
+        expected_array = np.array([1, 1, 1, 1, 1, 0, 1, 0])
+        actual_array = int2binary_array(integer, 8, signed=True)
+        self.assertTrue(np.array_equal(expected_array, actual_array))
+
+    def test_too_wide(self):
+        with self.assertRaises(AssertionError):
+            int2binary_array(256, 8)
+
+
+class BinaryArray2Int(unittest.TestCase):
+    def test_simple(self):
+        bits = np.array([1, 1, 1, 0, 0, 0, 1, 0, 0, 0])
+        self.assertEqual(0b1110001000, binary_array2int(bits))
+
+    def test_signed(self):
+        bits = np.array([1, 1, 1, 1, 1, 0, 1, 0])
+        self.assertEqual(-6, binary_array2int(bits, signed=True))
+
+
+class BinaryMatrix(unittest.TestCase):
+    def test_round_trip(self):
+        trials = 100
+
+        for width in [1, 7, 63, 64, 65, 200, 1031]:
+            integers = [random.randrange(0, 2 ** width) for _ in range(trials)]
+            bits = int2binary_matrix(integers, width)
+            self.assertTrue(bits.shape == (trials, width))
+            self.assertEqual(integers, list(binary_matrix2int(bits)))
+
+    def test_round_trip_signed(self):
+        trials = 100
+
+        for width in [2, 64, 65, 500]:
+            integers = [random.randrange(-(2 ** (width - 1)), 2 ** (width - 1)) for _ in range(trials)]
+            bits = int2binary_matrix(integers, width, signed=True)
+            self.assertEqual(integers, list(binary_matrix2int(bits, signed=True)))
+
+    def test_matches_bin(self):
+        width = 150
+        integers = [random.randrange(0, 2 ** width) for _ in range(20)]
+        bits = int2binary_matrix(integers, width)
+
+        for integer, row in zip(integers, bits):
+            self.assertEqual(bin(integer)[2:].zfill(width), ''.join(map(str, row)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import unittest
+from src.ciphertext import *
+from src.somewhat_homomorphic_encryption import key, randint, decrypt_batch
+from src import private_key_somewhat_homomorphic_encryption as private_key_encryption
+from src.noise_budget import NoiseBudget, private_key_noise_bits
+
+
+class Gates(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.secondary_noise_size = 2
+        self.private_key, self.public_key = key(40, 8, 120, 1)
+
+    def encrypt(self, bits: list) -> Ciphertext:
+        plaintext = int(''.join(str(bit) for bit in bits), 2)
+        return Ciphertext.encrypt(plaintext, self.public_key, self.secondary_noise_size, width=len(bits))
+
+    def test_truth_tables(self):
+        a = [0, 0, 1, 1]
+        b = [0, 1, 0, 1]
+        ciphertext_a = self.encrypt(a)
+        ciphertext_b = self.encrypt(b)
+
+        self.assertEqual([0, 1, 1, 0], list((ciphertext_a ^ ciphertext_b).decrypt_bits(self.private_key)))
+        self.assertEqual([0, 1, 1, 0], list((ciphertext_a + ciphertext_b).decrypt_bits(self.private_key)))
+        self.assertEqual([0, 0, 0, 1], list((ciphertext_a & ciphertext_b).decrypt_bits(self.private_key)))
+        self.assertEqual([0, 0, 0, 1], list((ciphertext_a * ciphertext_b).decrypt_bits(self.private_key)))
+        self.assertEqual([0, 1, 1, 1], list((ciphertext_a | ciphertext_b).decrypt_bits(self.private_key)))
+        self.assertEqual([1, 1, 0, 0], list((~ciphertext_a).decrypt_bits(self.private_key)))
+
+    def test_plaintext_constants(self):
+        ciphertext = Ciphertext.encrypt(0b1010, self.public_key, self.secondary_noise_size, width=4)
+        self.assertTrue((ciphertext + np.array([1, 1, 0, 0])).decrypt(self.private_key) == 0b0110)
+        self.assertTrue((np.array([1, 1, 0, 0]) * ciphertext).decrypt(self.private_key) == 0b1000)
+        self.assertTrue((1 + ciphertext).decrypt(self.private_key) == 0b0101)
+
+    def test_batch(self):
+        width = 8
+        plaintexts_a = [randint(0, 2 ** width) for _ in range(5)]
+        plaintexts_b = [randint(0, 2 ** width) for _ in range(5)]
+        ciphertext_a = Ciphertext.encrypt_batch(plaintexts_a, self.public_key, self.secondary_noise_size, width)
+        ciphertext_b = Ciphertext.encrypt_batch(plaintexts_b, self.public_key, self.secondary_noise_size, width)
+
+        self.assertTrue(ciphertext_a.shape == (5, width))
+        self.assertEqual([a ^ b for a, b in zip(plaintexts_a, plaintexts_b)],
+                         list((ciphertext_a ^ ciphertext_b).decrypt(self.private_key)))
+        self.assertEqual([a & b for a, b in zip(plaintexts_a, plaintexts_b)],
+                         list((ciphertext_a & ciphertext_b).decrypt(self.private_key)))
+
+
+class LazyReduction(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.secondary_noise_size = 2
+        self.private_key, self.public_key = key(40, 8, 120, 1)
+        self.modulus_bits = int(self.public_key[0]).bit_length()
+
+    def test_additions_not_reduced(self):
+        ciphertexts = [Ciphertext.encrypt(randint(0, 2), self.public_key, self.secondary_noise_size, width=1)
+                       for _ in range(20)]
+        total = ciphertexts[0]
+        for ciphertext in ciphertexts[1:]:
+            total = total + ciphertext
+
+        self.assertTrue(total.bit_bound == self.modulus_bits + 19)
+        self.assertTrue(total.values[0] >= self.public_key[0])
+        expected = sum(ciphertext.decrypt(self.private_key) for ciphertext in ciphertexts) % 2
+        self.assertTrue(total.decrypt(self.private_key) == expected)
+        self.assertTrue(total.reduce().values[0] < self.public_key[0])
+        self.assertTrue(total.reduce().decrypt(self.private_key) == expected)
+
+    def test_multiplication_reduced_past_max_bits(self):
+        a = Ciphertext.encrypt(1, self.public_key, self.secondary_noise_size, width=1)
+        b = Ciphertext.encrypt(1, self.public_key, self.secondary_noise_size, width=1)
+
+        product = a * b
+        self.assertTrue(product.bit_bound == 2 * self.modulus_bits)
+        self.assertTrue(product.bit_bound <= product.max_bits)
+
+        product = product * a
+        self.assertTrue(product.bit_bound == self.modulus_bits)
+        self.assertTrue(product.values[0] < self.public_key[0])
+        self.assertTrue(product.decrypt(self.private_key) == 1)
+
+    def test_max_bits(self):
+        a = Ciphertext.encrypt(1, self.public_key, self.secondary_noise_size, width=1, max_bits=self.modulus_bits)
+        b = Ciphertext.encrypt(0, self.public_key, self.secondary_noise_size, width=1, max_bits=self.modulus_bits)
+        self.assertTrue((a + b).bit_bound == self.modulus_bits)
+        self.assertTrue((a + b).decrypt(self.private_key) == 1)
+
+
+class NativeCiphertext(unittest.TestCase):
+
+    def test_reduced_before_overflow(self):
+        private_key, public_key = key(20, 6, 30, 1)
+        a = Ciphertext.encrypt(5, public_key, 1, width=3)
+        b = Ciphertext.encrypt(3, public_key, 1, width=3)
+        self.assertTrue(a.values.dtype == np.int64)
+
+        product = a * b * b
+        self.assertTrue(product.values.dtype == np.int64)
+        self.assertTrue(product.decrypt(private_key) == 1)
+
+    def test_noisy_x0_fresh(self):
+        private_key, public_key = key(120, 20, 600, 20)
+        budget = NoiseBudget(120, 20)
+        plaintexts = [randint(0, 2 ** 16) for _ in range(60)]
+        for plaintext in plaintexts:
+            ciphertext = Ciphertext.encrypt(plaintext, public_key, 20, width=16, budget=budget)
+            self.assertTrue(ciphertext.remaining_budget() > 0)
+            self.assertEqual(plaintext, ciphertext.decrypt(private_key))
+        ciphertexts = Ciphertext.encrypt_batch(plaintexts, public_key, 20, 16, budget=budget)
+        self.assertTrue(ciphertexts.remaining_budget() > 0)
+        self.assertEqual(plaintexts, list(ciphertexts.decrypt(private_key)))
+        self.assertEqual(plaintexts, list(decrypt_batch(ciphertexts.values, private_key)))
+
+    def test_private_key(self):
+        private_key = private_key_encryption.key(10)
+        a = Ciphertext(private_key_encryption.encrypt(6, private_key, 15, width=3))
+        b = Ciphertext(private_key_encryption.encrypt(3, private_key, 15, width=3))
+        self.assertTrue(a.values.dtype == np.int64)
+        self.assertTrue((a * b).decrypt(private_key) == 2)
+        self.assertTrue((a + b).decrypt(private_key) == 5)
+
+    def test_promoted_without_modulus(self):
+        a = Ciphertext(np.array([2 ** 40 + 1, 3], dtype=np.int64))
+        product = a * a
+        self.assertTrue(product.values.dtype == object)
+        self.assertEqual([(2 ** 40 + 1) ** 2, 9], list(product.values))
+
+
+class NoiseTracking(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.private_key, self.public_key = key(120, 16, 700, 8, error_free=True)
+        self.budget = NoiseBudget(120, 8, error_free=True)
+
+    def encrypt(self, plaintext: int, budget: NoiseBudget) -> Ciphertext:
+        return Ciphertext.encrypt(plaintext, self.public_key, 4, width=4, budget=budget)
+
+    def noise_bits(self, ciphertext: Ciphertext) -> int:
+        p = int(self.private_key)
+        noise = [int(value) % p for value in ciphertext.values]
+        return max(abs(n - p if n > p // 2 else n).bit_length() for n in noise)
+
+    def test_bound(self):
+        a, b = self.encrypt(0b1011, self.budget), self.encrypt(0b1110, self.budget)
+        self.assertTrue(a.remaining_budget() == self.budget.max_noise_bits - a.noise_bits)
+        result, expected = a, 0b1011
+        while (result * b + a).remaining_budget() >= 0:
+            result, expected = result * b + a, (expected & 0b1110) ^ 0b1011
+            self.assertTrue(self.noise_bits(result) <= result.noise_bits)
+            self.assertTrue(result.decrypt(self.private_key) == expected)
+        self.assertTrue(result.remaining_budget() < a.remaining_budget())
+
+    def test_plaintext_operands(self):
+        a = self.encrypt(0b1011, self.budget)
+        self.assertTrue((~a).noise_bits == a.noise_bits + 1)
+        self.assertTrue((a * np.array([1, 0, 1, 0])).noise_bits == a.noise_bits + 1)
+        self.assertTrue(a[1:].noise_bits == a.noise_bits)
+
+    def test_untracked(self):
+        a, b = self.encrypt(3, None), self.encrypt(3, self.budget)
+        self.assertTrue(a.remaining_budget() is None)
+        self.assertTrue((a * b).remaining_budget() is None)
+        self.assertTrue((b * b).remaining_budget() is not None)
+
+    def test_raise(self):
+        budget = NoiseBudget(120, 8, error_free=True, on_exceeded='raise')
+        a = self.encrypt(5, budget)
+        with self.assertRaises(ValueError):
+            for _ in range(10):
+                a = a * a
+
+    def test_warn(self):
+        budget = NoiseBudget(120, 8, error_free=True, on_exceeded='warn')
+        a = self.encrypt(5, budget)
+        for _ in range(2):
+            a = a * a
+        with self.assertWarns(RuntimeWarning):
+            a = a * a * a
+        with self.assertWarns(RuntimeWarning):
+            a.decrypt(self.private_key)
+
+    def test_noisy_x0(self):
+        private_key, public_key = key(120, 16, 700, 8)
+        budget = NoiseBudget(120, 8, on_exceeded='raise')
+        a = Ciphertext.encrypt(5, public_key, 4, width=4, budget=budget)
+        self.assertTrue((a * a).decrypt(private_key) == 5)
+        with self.assertRaises(ValueError):
+            (a * a * a).reduce()
+
+    def test_noisy_x0_fresh(self):
+        private_key, public_key = key(120, 20, 600, 20)
+        budget = NoiseBudget(120, 20)
+        plaintexts = [randint(0, 2 ** 16) for _ in range(60)]
+        for plaintext in plaintexts:
+            ciphertext = Ciphertext.encrypt(plaintext, public_key, 20, width=16, budget=budget)
+            self.assertTrue(ciphertext.remaining_budget() > 0)
+            self.assertEqual(plaintext, ciphertext.decrypt(private_key))
+        ciphertexts = Ciphertext.encrypt_batch(plaintexts, public_key, 20, 16, budget=budget)
+        self.assertTrue(ciphertexts.remaining_budget() > 0)
+        self.assertEqual(plaintexts, list(ciphertexts.decrypt(private_key)))
+        self.assertEqual(plaintexts, list(decrypt_batch(ciphertexts.values, private_key)))
+
+    def test_private_key(self):
+        private_key = private_key_encryption.key(60)
+        budget = NoiseBudget(60, on_exceeded='raise')
+        noise_bits = private_key_noise_bits(private_key)
+        a = Ciphertext(private_key_encryption.encrypt(6, private_key, 60, width=3), noise_bits=noise_bits,
+                       budget=budget)
+        self.assertTrue(noise_bits == 30)
+        self.assertTrue((a + a + a).remaining_budget() == 26)
+        with self.assertRaises(ValueError):
+            a * a
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import random
+from src.ciphertext_array import *
+from src import private_key_somewhat_homomorphic_encryption as private_key_encryption
+
+
+def random_ints(length: int, max_bits: int) -> list:
+    return [random.getrandbits(random.randint(1, max_bits)) for _ in range(length)]
+
+
+class Conversion(unittest.TestCase):
+    def test_round_trip(self):
+        integers = random_ints(100, 1000) + [0, 2 ** 64 - 1, 2 ** 64, 2 ** 999]
+        array = CiphertextArray.from_ints(integers)
+        self.assertTrue(array.limbs.dtype == np.uint64)
+        self.assertTrue(array.num_limbs == 16)
+        self.assertEqual(integers, list(array.to_ints()))
+
+    def test_fixed_limbs(self):
+        array = CiphertextArray.from_ints([1, 2], num_limbs=3)
+        self.assertTrue(array.limbs.shape == (2, 3))
+
+    def test_ciphertext(self):
+        k = private_key_encryption.key(100)
+        ciphertext = private_key_encryption.encrypt_batch([5, 1000], k, 300, 10)
+        array = from_ciphertext(ciphertext)
+        self.assertTrue(len(array) == 20)
+        self.assertEqual([5, 1000], list(private_key_encryption.decrypt_batch(to_ciphertext(array, (2, 10)), k)))
+
+
+class Arithmetic(unittest.TestCase):
+    def setUp(self) -> None:
+        self.a = random_ints(200, 700) + [2 ** 128 - 1]
+        self.b = random_ints(200, 500) + [1]
+
+    def test_add(self):
+        result = CiphertextArray.from_ints(self.a) + CiphertextArray.from_ints(self.b)
+        self.assertEqual([x + y for x, y in zip(self.a, self.b)], list(result.to_ints()))
+
+    def test_subtract(self):
+        large = [max(x, y) for x, y in zip(self.a, self.b)]
+        small = [min(x, y) for x, y in zip(self.a, self.b)]
+        result = CiphertextArray.from_ints(large) - CiphertextArray.from_ints(small)
+        self.assertEqual([x - y for x, y in zip(large, small)], list(result.to_ints()))
+
+    def test_subtract_negative(self):
+        with self.assertRaises(ValueError):
+            CiphertextArray.from_ints([1]) - CiphertextArray.from_ints([2])
+
+    def test_multiply(self):
+        for scalar in [0, 1, 2, 12345, 2 ** 32 - 1]:
+            result = CiphertextArray.from_ints(self.a) * scalar
+            self.assertEqual([x * scalar for x in self.a], list(result.to_ints()))
+
+    def test_multiply_too_large(self):
+        with self.assertRaises(ValueError):
+            CiphertextArray.from_ints(self.a) * 2 ** 32
+
+    def test_compare(self):
+        a = self.a + self.b
+        b = self.b + self.b
+        expected = [(x > y) - (x < y) for x, y in zip(a, b)]
+        self.assertEqual(expected, list(CiphertextArray.from_ints(a).compare(CiphertextArray.from_ints(b))))
+        self.assertTrue(np.all((CiphertextArray.from_ints(a) >= CiphertextArray.from_ints(b)) ==
+                               np.array([x >= y for x, y in zip(a, b)])))
+
+    def test_mod(self):
+        array = CiphertextArray.from_ints(self.a)
+        self.assertEqual([x % 2 for x in self.a], list(array.mod2()))
+        for modulus in [3, 2 ** 32 - 5, 2 ** 89 + 1]:
+            self.assertEqual([x % modulus for x in self.a], list(array.mod(modulus)))
+
+    def test_mod_multi_limb(self):
+        for modulus_bits in [33, 64, 65, 200, 1000]:
+            modulus = random.getrandbits(modulus_bits) | 2 ** (modulus_bits - 1)
+            integers = random_ints(50, 3000) + [0, modulus - 1, modulus, 2 ** 3000 - 1]
+            self.assertEqual([x % modulus for x in integers], list(CiphertextArray.from_ints(integers).mod(modulus)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import itertools
+from src.circuit import *
+from src.somewhat_homomorphic_encryption import key, randint
+
+
+def and_chain(wires: list) -> Wire:
+    result = wires[0]
+    for wire in wires[1:]:
+        result = result & wire
+    return result
+
+
+class Build(unittest.TestCase):
+
+    def test_common_subexpressions(self):
+        circuit = Circuit()
+        a, b = circuit.input('a'), circuit.input('b')
+        self.assertTrue((a ^ b).node == (b ^ a).node)
+        self.assertTrue((a & b).node == (b & a).node)
+        self.assertTrue(len(circuit.nodes) == 4)
+
+    def test_constant_folding(self):
+        circuit = Circuit()
+        a = circuit.input('a')
+        self.assertTrue((a ^ 0).node == a.node)
+        self.assertTrue((a & 1).node == a.node)
+        self.assertTrue((a & a).node == a.node)
+        self.assertTrue((a & 0).node == circuit.constant(0).node)
+        self.assertTrue((a ^ a).node == circuit.constant(0).node)
+        self.assertTrue((circuit.constant(1) ^ 1).node == circuit.constant(0).node)
+
+    def test_depth(self):
+        circuit = Circuit()
+        a, b, c = circuit.inputs('x', 3)
+        circuit.output('y', (a & b) ^ c)
+        circuit.output('z', a & b & c)
+        self.assertTrue(circuit.depth() == 2)
+        self.assertEqual({'xor': 1, 'and': 2}, circuit.gate_counts())
+
+
+class Optimize(unittest.TestCase):
+
+    def test_rebalance(self):
+        circuit = Circuit()
+        bits = circuit.inputs('x', 8)
+        circuit.output('y', and_chain(bits))
+        self.assertTrue(circuit.depth() == 7)
+
+        optimized = circuit.optimize()
+        self.assertTrue(optimized.depth() == 3)
+        self.assertEqual({'xor': 0, 'and': 7}, optimized.gate_counts())
+
+    def test_rebalance_by_depth(self):
+        circuit = Circuit()
+        bits = circuit.inputs('x', 6)
+        deep = and_chain(bits[:4])
+        circuit.output('deep', deep)
+        circuit.output('y', deep & bits[4] & bits[5])
+
+        # The shared chain is kept, and the two shallow inputs are combined before the deep one.
+        optimized = circuit.optimize()
+        self.assertTrue(optimized.depth() == 3)
+        self.assertEqual({'xor': 0, 'and': 5}, optimized.gate_counts())
+
+    def test_xor_cancellation(self):
+        circuit = Circuit()
+        a, b, c = circuit.inputs('x', 3)
+        circuit.output('y', (a ^ b) ^ (a ^ c))
+        self.assertEqual({'xor': 1, 'and': 0}, circuit.optimize().gate_counts())
+
+    def test_dead_gates(self):
+        circuit = Circuit()
+        a, b = circuit.inputs('x', 2)
+        a & b
+        circuit.output('y', a ^ b)
+        self.assertEqual({'xor': 1, 'and': 0}, circuit.optimize().gate_counts())
+
+    def test_known_inputs(self):
+        circuit = Circuit()
+        x = circuit.inputs('x', 2)
+        y = circuit.inputs('y', 2)
+        circuit.output('z', [x[0] & y[0], x[1] & y[1] ^ x[0]])
+
+        optimized = circuit.optimize(known={'y': 0b10})
+        self.assertEqual({'xor': 0, 'and': 0}, optimized.gate_counts())
+        for value in range(4):
+            self.assertEqual(list(circuit.evaluate({'x': np.array(list(map(int, format(value, '02b')))),
+                                                   'y': np.array([1, 0])})['z']),
+                             list(optimized.evaluate({'x': np.array(list(map(int, format(value, '02b'))))})['z']))
+
+    def test_equivalent(self):
+        circuit = Circuit()
+        a, b, c, d = circuit.inputs('x', 4)
+        circuit.output('y', [((a & b) & (c & d)) ^ (a & b), (a | b) & ~(c ^ d ^ a), and_chain([a, b, c]) ^ d ^ 1])
+        optimized = circuit.optimize()
+
+        for bits in itertools.product([0, 1], repeat=4):
+            x = np.array(bits)
+            self.assertEqual(list(circuit.evaluate({'x': x})['y']), list(optimized.evaluate({'x': x})['y']))
+
+
+class Evaluate(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.secondary_noise_size = 2
+        self.private_key, self.public_key = key(60, 8, 200, 1)
+
+    def test_plaintext(self):
+        circuit = Circuit()
+        a, b = circuit.input('a'), circuit.input('b')
+        circuit.output('xor', a ^ b)
+        circuit.output('and', a & b)
+        circuit.output('or', a | b)
+        for a, b in itertools.product([0, 1], repeat=2):
+            outputs = circuit.evaluate({'a': a, 'b': b})
+            self.assertEqual((a ^ b, a & b, a | b), (outputs['xor'], outputs['and'], outputs['or']))
+
+    def test_ciphertext(self):
+        circuit = Circuit()
+        bits = circuit.inputs('x', 4)
+        circuit.output('y', [and_chain(bits), bits[0] ^ bits[1], circuit.constant(1), ~bits[3]])
+        circuit = circuit.optimize()
+
+        for i in range(20):
+            plaintext = randint(0, 16)
+            ciphertext = Ciphertext.encrypt(plaintext, self.public_key, self.secondary_noise_size, width=4)
+            bits = [(plaintext >> (3 - j)) & 1 for j in range(4)]
+            expected = [int(all(bits)), bits[0] ^ bits[1], 1, 1 - bits[3]]
+
+            output = circuit.evaluate({'x': ciphertext})['y']
+            self.assertTrue(isinstance(output, Ciphertext))
+            self.assertEqual(expected, list(output.decrypt_bits(self.private_key)))
+
+    def test_batch(self):
+        circuit = Circuit()
+        x = circuit.inputs('x', 3)
+        y = circuit.inputs('y', 3)
+        circuit.output('z', [x[i] & y[i] for i in range(3)])
+
+        plaintexts_x = [randint(0, 8) for _ in range(6)]
+        plaintexts_y = [randint(0, 8) for _ in range(6)]
+        outputs = circuit.evaluate(
+            {'x': Ciphertext.encrypt_batch(plaintexts_x, self.public_key, self.secondary_noise_size, 3),
+             'y': Ciphertext.encrypt_batch(plaintexts_y, self.public_key, self.secondary_noise_size, 3)})
+        self.assertEqual([a & b for a, b in zip(plaintexts_x, plaintexts_y)],
+                         list(outputs['z'].decrypt(self.private_key)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from src.compressed_public_key import *
+from src.somewhat_homomorphic_encryption import decrypt, decrypt_batch
+
+
+class CompressedKey(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.private_key, self.public_key = key(60, 20, 400, 1)
+
+    def test_integers(self):
+        expanded = self.public_key.expand()
+        self.assertTrue(expanded.shape == (20,))
+        self.assertTrue(expanded[0] == self.public_key.x0)
+        self.assertTrue(expanded[0] % 2 == 1)
+        self.assertTrue((expanded[0] % self.private_key) % 2 == 0)
+        self.assertTrue(2 ** 399 <= expanded[0] < 2 ** 400)
+        self.assertTrue(np.all(expanded % self.private_key < 2))
+        self.assertTrue(np.all(expanded[1:] < 2 ** 400))
+
+    def test_chunks(self):
+        chunks = list(self.public_key.chunks(chunk_size=6))
+        self.assertEqual([6, 6, 6, 1], [len(chunk) for chunk in chunks])
+        self.assertTrue(np.array_equal(self.public_key.expand()[1:], np.concatenate(chunks)))
+
+    def test_reproducible_from_seed(self):
+        chi = self.public_key.chi(range(3, 7))
+        self.assertTrue(np.array_equal(chi, CompressedPublicKey(self.public_key.seed, 400, 0, None).chi(range(3, 7))))
+
+    def test_smaller(self):
+        full_bytes = len(self.public_key) * 400 // 8
+        self.assertTrue(self.public_key.num_bytes() < full_bytes / 2)
+
+    def test_too_small(self):
+        with self.assertRaises(ValueError):
+            compressed_public_key(4, 20, 2, private_key(20))
+
+
+class EncryptDecrypt(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.secondary_noise_size = 2
+        self.private_key, self.public_key = key(60, 20, 400, 1)
+
+    def test_encrypt(self):
+        for i in range(20):
+            plaintext = randint(0, 2 ** 10)
+            ciphertext = encrypt(plaintext, self.public_key, self.secondary_noise_size, chunk_size=7)
+            self.assertTrue(np.all(ciphertext < self.public_key.x0))
+            self.assertTrue(decrypt(ciphertext, self.private_key) == plaintext)
+
+    def test_encrypt_batch(self):
+        plaintexts = [randint(-128, 128) for _ in range(10)]
+        ciphertexts = encrypt_batch(plaintexts, self.public_key, self.secondary_noise_size, 8, signed=True)
+        self.assertEqual(plaintexts, list(decrypt_batch(ciphertexts, self.private_key, signed=True)))
+
+    def test_homomorphic(self):
+        a = encrypt(1, self.public_key, self.secondary_noise_size, width=1)
+        b = encrypt(1, self.public_key, self.secondary_noise_size, width=1)
+        self.assertTrue(decrypt(a * b % self.public_key.x0, self.private_key) == 1)
+        self.assertTrue(decrypt((a + b) % self.public_key.x0, self.private_key) == 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
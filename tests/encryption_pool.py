@@ -0,0 +1,58 @@
+import unittest
+from src.encryption_pool import *
+from src.somewhat_homomorphic_encryption import key, decrypt, decrypt_batch, randint
+
+
+class EncryptionPoolTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.secondary_noise_size = 2
+        self.private_key, self.public_key = key(20, 4, 40, 1)
+
+    def test_fills_in_background(self):
+        with EncryptionPool(self.public_key, self.secondary_noise_size, capacity=64, batch_size=16) as pool:
+            self.assertTrue(pool.wait_until_full(timeout=60))
+            self.assertTrue(pool.size() == 64)
+            self.assertTrue(pool.stats()['generated'] == 64)
+            self.assertTrue(pool.refill_rate() > 0)
+
+    def test_encryptions_of_zero(self):
+        with EncryptionPool(self.public_key, self.secondary_noise_size, capacity=64, batch_size=16) as pool:
+            pool.wait_until_full(timeout=60)
+            zeros = pool.take(100)
+            self.assertTrue(zeros.shape == (100,))
+            self.assertTrue(np.all(zeros % self.private_key % 2 == 0))
+
+    def test_hits_and_misses(self):
+        pool = EncryptionPool(self.public_key, self.secondary_noise_size, capacity=32, batch_size=8)
+        pool.wait_until_full(timeout=60)
+        pool.stop()
+
+        pool.take(40)
+        stats = pool.stats()
+        self.assertTrue(stats['hits'] == 32)
+        self.assertTrue(stats['misses'] == 8)
+        self.assertTrue(stats['size'] == 0)
+
+    def test_synchronous_fallback(self):
+        pool = EncryptionPool(self.public_key, self.secondary_noise_size, start=False)
+        plaintext = 0b1011001
+        self.assertEqual(plaintext, decrypt(pool.encrypt(plaintext), self.private_key))
+        self.assertTrue(pool.stats()['misses'] == 7)
+
+    def test_encrypt(self):
+        with EncryptionPool(self.public_key, self.secondary_noise_size, capacity=256, batch_size=32) as pool:
+            for i in range(100):
+                plaintext = randint(0, 2 ** 16)
+                self.assertEqual(plaintext, decrypt(pool.encrypt(plaintext, width=16), self.private_key))
+
+    def test_encrypt_batch(self):
+        with EncryptionPool(self.public_key, self.secondary_noise_size) as pool:
+            plaintexts = [randint(0, 2 ** 12) for _ in range(50)]
+            ciphertexts = pool.encrypt_batch(plaintexts, 12)
+            self.assertTrue(ciphertexts.shape == (50, 12))
+            self.assertEqual(plaintexts, list(decrypt_batch(ciphertexts, self.private_key)))
+
+
+if __name__ == '__main__':
+    unittest.main()
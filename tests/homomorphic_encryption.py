@@ -0,0 +1,173 @@
+import unittest
+from src.homomorphic_encryption import *
+from src import randomness, somewhat_homomorphic_encryption
+from src.bit_codec import int2binary_matrix, binary_matrix2int
+
+
+class PrivateKey(unittest.TestCase):
+
+    def test_boxes(self):
+        key = private_key(40, 5)
+        self.assertEqual([0, 1, 2, 3, 4], list(key // 8))
+
+    def test_invalid_boxes(self):
+        with self.assertRaises(ValueError):
+            private_key(15, 4)
+        with self.assertRaises(ValueError):
+            private_key(16, 0)
+
+
+class SecondaryPublicKey(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.p = somewhat_homomorphic_encryption.private_key(60)
+        self.private_key = private_key(40, 5)
+        self.int_size = 300
+        self.secondary_public_key = secondary_public_key(40, self.int_size, self.private_key, self.p)
+
+    def test_integers(self):
+        self.assertTrue(self.secondary_public_key.dtype == object)
+        self.assertTrue(np.all(self.secondary_public_key >= 0))
+        self.assertTrue(np.all(self.secondary_public_key < 2 ** (self.int_size + 1)))
+
+    def test_subset_sum(self):
+        total = int(np.sum(self.secondary_public_key[self.private_key])) % 2 ** (self.int_size + 1)
+        self.assertTrue(abs(total - 2 ** self.int_size / self.p) <= 1 / 2)
+
+
+class ExpandCiphertext(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.int_size = 300
+        self.p, self.public_key = somewhat_homomorphic_encryption.key(60, 20, 250, 1)
+        self.private_key = private_key(40, 5)
+        self.secondary_public_key = secondary_public_key(40, self.int_size, self.private_key, self.p)
+        self.ciphertext = somewhat_homomorphic_encryption.encrypt(randint(0, 2 ** 16), self.public_key, 2, width=16)
+
+    def test_exact(self):
+        expanded = expand_ciphertext(self.ciphertext, self.secondary_public_key, self.int_size)
+        self.assertTrue(expanded.shape == (16, 40))
+        c, u = int(self.ciphertext[3]), int(self.secondary_public_key[7])
+        self.assertTrue(expanded[3, 7] == c * u % 2 ** (self.int_size + 1))
+
+    def test_truncated(self):
+        exact = expand_ciphertext(self.ciphertext, self.secondary_public_key, self.int_size)
+        expanded = expand_ciphertext(self.ciphertext, self.secondary_public_key, self.int_size, 6)
+        self.assertTrue(expanded.dtype == np.int64)
+        self.assertTrue(np.all(expanded < 2 ** 7))
+        self.assertTrue(np.all(expanded == exact >> (self.int_size - 6)))
+
+    def test_decrypt_expanded(self):
+        bits = (backend.asarray(self.ciphertext) % self.p) % 2
+        for precision in [self.int_size, 6]:
+            expanded = expand_ciphertext(self.ciphertext, self.secondary_public_key, self.int_size, precision)
+            decrypted = decrypt_expanded(self.ciphertext, expanded, self.private_key, precision)
+            self.assertTrue(np.array_equal(bits, decrypted))
+
+    def test_decrypt_expanded_batch(self):
+        ciphertexts = somewhat_homomorphic_encryption.encrypt_batch([3, 200, 77], self.public_key, 2, 8)
+        expanded = expand_ciphertext(ciphertexts, self.secondary_public_key, self.int_size, 6)
+        self.assertTrue(expanded.shape == (3, 8, 40))
+        bits = decrypt_expanded(ciphertexts, expanded, self.private_key, 6)
+        self.assertEqual([3, 200, 77], list(binary_matrix2int(bits)))
+
+
+class Recrypt(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.int_size = 412
+        self.p = somewhat_homomorphic_encryption.private_key(200)
+        self.primary_public_key = primary_public_key(10, 400, 1, self.p)
+        self.private_key = private_key(16, 4)
+        self.secondary_public_key = secondary_public_key(16, self.int_size, self.private_key, self.p)
+        self.engine = recrypt_engine(self.private_key, self.primary_public_key, self.secondary_public_key,
+                                     self.int_size, 1)
+
+    def decrypt(self, ciphertext: Ciphertext) -> np.ndarray:
+        expanded = expand_ciphertext(ciphertext.values, self.secondary_public_key, self.int_size)
+        return decrypt_expanded(ciphertext.values, expanded, self.private_key, self.int_size)
+
+    def noise_bits(self, ciphertext: Ciphertext) -> int:
+        remainders = ciphertext.values % self.p
+        return max(int(min(r, self.p - r)).bit_length() for r in remainders.reshape(-1))
+
+    def test_error_free_x0(self):
+        self.assertTrue(self.primary_public_key[0] % self.p == 0)
+        self.assertTrue(int(self.primary_public_key[0]).bit_length() == 400)
+        self.assertTrue(np.all(self.primary_public_key[1:] < self.primary_public_key[0]))
+
+    def test_noise(self):
+        public_key = primary_public_key(20, 400, 20, self.p)
+        self.assertTrue(np.all(public_key[1:] % self.p < 2 ** 20))
+        plaintexts = [randint(0, 2 ** 16) for _ in range(10)]
+        ciphertexts = somewhat_homomorphic_encryption.encrypt_batch(plaintexts, public_key, 20, 16)
+        self.assertEqual(plaintexts, list(somewhat_homomorphic_encryption.decrypt_batch(ciphertexts, self.p)))
+
+    def test_workers(self):
+        keys = []
+        for workers in [None, 1, 2]:
+            randomness.seed(2024)
+            keys.append(primary_public_key(10, 400, 20, self.p, workers=workers))
+        randomness.seed(None)
+        self.assertTrue(np.array_equal(keys[1], keys[2]))
+        for public_key in keys:
+            self.assertTrue(public_key.dtype == object)
+            self.assertTrue(public_key[0] == keys[0][0])
+            self.assertTrue(np.all(public_key[1:] < public_key[0]))
+            self.assertTrue(np.all(public_key[1:] % self.p < 2 ** 20))
+        self.assertEqual(1, primary_public_key(10, 400, 20, self.p, return_attempts=True, workers=2)[1])
+
+    def test_too_few_fractional_bits(self):
+        with self.assertRaises(ValueError):
+            recrypt_engine(self.private_key, self.primary_public_key, self.secondary_public_key, 404, 1)
+
+    def test_decryption_circuit(self):
+        circuit = decryption_circuit(4, 5)
+        self.assertTrue(circuit.depth() <= 5)
+        boxes = [randint(0, 64, length=100) for _ in range(4)]
+        parity = randint(0, 2, length=100)
+        inputs = {'box%d' % k: int2binary_matrix(boxes[k], 6) for k in range(4)}
+        inputs['parity'] = parity
+        expected = [(((sum(row) + 16) >> 5) + c) % 2 for *row, c in zip(*boxes, parity)]
+        self.assertEqual(expected, list(circuit.evaluate(inputs)['bit']))
+
+    def test_encrypt_decrypt(self):
+        for plaintext in [0, 0b1011, 0b1111]:
+            ciphertext = encrypt(plaintext, self.primary_public_key, 1, width=4)
+            self.assertEqual(plaintext, decrypt(self.p, ciphertext))
+            self.assertEqual(plaintext, decrypt(self.p, ciphertext.values))
+        self.assertEqual(-3, decrypt(self.p, encrypt(-3, self.primary_public_key, 1, width=4, signed=True), True))
+
+    def test_recrypt(self):
+        ciphertext = encrypt(0b1011, self.primary_public_key, 1, width=4)
+        recrypted = self.engine.recrypt(ciphertext)
+        self.assertTrue(recrypted.shape == (4,))
+        self.assertEqual([1, 0, 1, 1], list(self.decrypt(recrypted)))
+        self.assertTrue(self.noise_bits(recrypted) < self.p.bit_length() // 2)
+
+    def test_unbounded_depth(self):
+        a = encrypt(0b1111, self.primary_public_key, 1, width=4)
+        b = encrypt(0b1101, self.primary_public_key, 1, width=4)
+        for i in range(20):
+            a = self.engine.recrypt(a * b)
+        self.assertEqual([1, 1, 0, 1], list(self.decrypt(a)))
+
+    def test_batch(self):
+        ciphertexts = Ciphertext(somewhat_homomorphic_encryption.encrypt_batch([5, 9, 12], self.primary_public_key,
+                                                                              1, 4),
+                                 self.primary_public_key[0])
+        recrypted = self.engine.recrypt(ciphertexts)
+        self.assertEqual([5, 9, 12], list(binary_matrix2int(self.decrypt(recrypted))))
+
+    def test_stats(self):
+        self.engine.recrypt(encrypt(3, self.primary_public_key, 1, width=2))
+        self.engine.recrypt(encrypt(3, self.primary_public_key, 1, width=3))
+        stats = self.engine.stats()
+        self.assertEqual(2, stats['recrypts'])
+        self.assertEqual(5, stats['bits'])
+        self.assertTrue(stats['seconds'] > 0)
+        self.assertTrue(abs(stats['seconds'] - stats['expand'] - stats['subset'] - stats['circuit']) < 1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import itertools
+import numpy as np
+from src.integer_arithmetic import *
+from src.bit_codec import int2binary_matrix, binary_matrix2int
+from src.somewhat_homomorphic_encryption import key, randint
+
+
+def evaluate_plaintexts(operation: str, width: int, signed: bool) -> tuple:
+    """
+    Evaluate an operation in the clear on every pair of integers of "width" bits.
+    """
+    if signed:
+        integers = list(range(-2 ** (width - 1), 2 ** (width - 1)))
+    else:
+        integers = list(range(2 ** width))
+    pairs = list(itertools.product(integers, repeat=2))
+    a = int2binary_matrix([x for x, _ in pairs], width, signed)
+    b = int2binary_matrix([y for _, y in pairs], width, signed)
+    return pairs, compiled_circuit(operation, width, signed).evaluate({'a': a, 'b': b})['result']
+
+
+class Exhaustive(unittest.TestCase):
+
+    def check(self, operation: str, expected, signed: bool = False, width: int = 4, result_width: int = 4):
+        pairs, result = evaluate_plaintexts(operation, width, signed)
+        if np.ndim(result) == 2:
+            self.assertTrue(result.shape[1] == result_width)
+            result = binary_matrix2int(result, signed)
+        self.assertEqual([expected(x, y) for x, y in pairs], list(result))
+
+    def test_add(self):
+        self.check('add', lambda x, y: (x + y) % 16)
+
+    def test_subtract(self):
+        self.check('subtract', lambda x, y: (x - y) % 16)
+
+    def test_signed_add(self):
+        self.check('add', lambda x, y: (x + y + 8) % 16 - 8, signed=True)
+
+    def test_compare(self):
+        self.check('less_than', lambda x, y: int(x < y))
+        self.check('greater_than', lambda x, y: int(x > y))
+        self.check('equal', lambda x, y: int(x == y))
+
+    def test_signed_compare(self):
+        self.check('less_than', lambda x, y: int(x < y), signed=True)
+        self.check('equal', lambda x, y: int(x == y), signed=True)
+
+    def test_minimum_maximum(self):
+        self.check('minimum', min)
+        self.check('maximum', max)
+        self.check('minimum', min, signed=True)
+        self.check('maximum', max, signed=True)
+
+    def test_multiply(self):
+        self.check('multiply', lambda x, y: x * y, result_width=8)
+        self.check('multiply', lambda x, y: x * y, signed=True, result_width=8)
+
+    def test_multiply_width(self):
+        circuit = Circuit()
+        a, b = circuit.inputs('a', 5), circuit.inputs('b', 3)
+        circuit.output('result', multiply(circuit, a, b, width=6))
+        for x, y in itertools.product(range(32), range(8)):
+            result = circuit.evaluate({'a': int2binary_matrix([x], 5)[0], 'b': int2binary_matrix([y], 3)[0]})
+            self.assertTrue(binary_matrix2int(result['result'][None, :])[0] == (x * y) % 64)
+
+    def test_add_many(self):
+        circuit = Circuit()
+        integers = [circuit.inputs('x%d' % i, 5) for i in range(6)]
+        circuit.output('result', add_many(circuit, integers, constant=9))
+        circuit = circuit.optimize()
+        self.assertTrue(circuit.depth() <= 6)
+        values = [randint(0, 32, length=200) for _ in range(6)]
+        result = circuit.evaluate({'x%d' % i: int2binary_matrix(values[i], 5) for i in range(6)})['result']
+        self.assertEqual([(sum(row) + 9) % 32 for row in zip(*values)], list(binary_matrix2int(result)))
+
+
+class Report(unittest.TestCase):
+
+    def test_logarithmic_depth(self):
+        costs = report(32)
+        self.assertTrue(costs['add']['and_depth'] <= 6)
+        self.assertTrue(costs['less_than']['and_depth'] <= 6)
+        self.assertTrue(costs['equal']['and_depth'] == 5)
+        self.assertTrue(costs['multiply']['and_depth'] <= 16)
+
+    def test_fields(self):
+        costs = report(8, ['add', 'equal'])
+        self.assertEqual(['add', 'equal'], list(costs))
+        self.assertEqual({'and_depth', 'and_gates', 'xor_gates'}, set(costs['add']))
+        self.assertTrue(costs['equal']['and_gates'] == 7)
+
+
+class Encrypted(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.secondary_noise_size = 2
+        self.private_key, self.public_key = key(256, 8, 600, 1)
+
+    def encrypt(self, plaintexts: list, width: int) -> Ciphertext:
+        return Ciphertext.encrypt_batch(plaintexts, self.public_key, self.secondary_noise_size, width)
+
+    def test_operations(self):
+        width = 6
+        a = [randint(0, 2 ** width) for _ in range(4)]
+        b = [randint(0, 2 ** width) for _ in range(4)]
+        ciphertext_a, ciphertext_b = self.encrypt(a, width), self.encrypt(b, width)
+
+        self.assertEqual([(x + y) % 2 ** width for x, y in zip(a, b)],
+                         list(evaluate('add', ciphertext_a, ciphertext_b).decrypt(self.private_key)))
+        self.assertEqual([int(x < y) for x, y in zip(a, b)],
+                         list(evaluate('less_than', ciphertext_a, ciphertext_b).decrypt_bits(self.private_key)))
+        self.assertEqual([min(x, y) for x, y in zip(a, b)],
+                         list(evaluate('minimum', ciphertext_a, ciphertext_b).decrypt(self.private_key)))
+
+    def test_multiply(self):
+        width = 3
+        a = [randint(0, 2 ** width) for _ in range(4)]
+        b = [randint(0, 2 ** width) for _ in range(4)]
+        product = evaluate('multiply', self.encrypt(a, width), self.encrypt(b, width))
+        self.assertEqual([x * y for x, y in zip(a, b)], list(product.decrypt(self.private_key)))
+
+    def test_single(self):
+        ciphertext_a = Ciphertext.encrypt(-3, self.public_key, self.secondary_noise_size, width=4, signed=True)
+        ciphertext_b = Ciphertext.encrypt(5, self.public_key, self.secondary_noise_size, width=4, signed=True)
+        self.assertTrue(evaluate('subtract', ciphertext_a, ciphertext_b).decrypt(self.private_key, signed=True) == -8)
+        self.assertTrue(evaluate('maximum', ciphertext_a, ciphertext_b, signed=True).decrypt(self.private_key) == 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from src.modulus_switching import *
+from src import somewhat_homomorphic_encryption
+
+
+class ModulusSwitching(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.secondary_noise_size = 2
+        self.private_key, self.public_key = somewhat_homomorphic_encryption.key(80, 20, 2000, 1)
+        self.security_parameter = 16
+        self.new_private_key, self.key = switching_key(self.private_key, 2000, self.security_parameter)
+
+    def test_switching_key(self):
+        self.assertTrue(self.key.modulus % self.new_private_key == 0)
+        self.assertEqual(33, self.new_private_key.bit_length())
+        self.assertEqual(33 ** 2, int(self.key.modulus).bit_length())
+        self.assertEqual(37, len(self.key.hints))
+        self.assertTrue(np.all(self.key.hints < 2 ** (self.key.precision + 1)))
+        self.assertTrue(np.all(self.key.sigma < self.key.modulus))
+
+    def test_switch(self):
+        for i in range(10):
+            plaintext = randint(0, 2 ** 16)
+            ciphertext = somewhat_homomorphic_encryption.encrypt(plaintext, self.public_key, self.secondary_noise_size)
+            switched = switch(ciphertext, self.key)
+            self.assertTrue(np.all(switched < 2 * self.key.modulus))
+            self.assertEqual(plaintext, decrypt(switched, self.new_private_key))
+
+    def test_switch_batch(self):
+        plaintexts = [randint(-128, 128) for _ in range(10)]
+        ciphertexts = somewhat_homomorphic_encryption.encrypt_batch(plaintexts, self.public_key,
+                                                                    self.secondary_noise_size, 8, signed=True)
+        switched = switch(ciphertexts, self.key)
+        self.assertTrue(switched.shape == (10, 8))
+        self.assertEqual(plaintexts, list(decrypt_batch(switched, self.new_private_key, signed=True)))
+
+    def test_switch_product(self):
+        a = somewhat_homomorphic_encryption.encrypt(0b1101, self.public_key, self.secondary_noise_size, width=4)
+        b = somewhat_homomorphic_encryption.encrypt(0b0111, self.public_key, self.secondary_noise_size, width=4)
+        switched = switch(a * b % self.public_key[0], self.key)
+        self.assertEqual(0b0101, decrypt(switched, self.new_private_key))
+
+    def test_add_switched(self):
+        a = switch(somewhat_homomorphic_encryption.encrypt(0b1101, self.public_key, 2, width=4), self.key)
+        b = switch(somewhat_homomorphic_encryption.encrypt(0b0111, self.public_key, 2, width=4), self.key)
+        self.assertEqual(0b1010, decrypt(a + b, self.new_private_key))
+
+    def test_report(self):
+        ciphertext = somewhat_homomorphic_encryption.encrypt(5, self.public_key, self.secondary_noise_size)
+        sizes = report(np.array([self.public_key[0]]), self.key)
+        self.assertEqual({'bytes_per_bit_before': 250, 'bytes_per_bit_after': 137, 'ratio': 250 / 137}, sizes)
+        self.assertTrue(report(ciphertext, self.key)['bytes_per_bit_before'] <= 250)
+
+    def test_smaller(self):
+        ciphertexts = somewhat_homomorphic_encryption.encrypt(randint(0, 2 ** 16), self.public_key,
+                                                              self.secondary_noise_size, width=16)
+        switched = switch(ciphertexts, self.key)
+        self.assertTrue(max(int(c).bit_length() for c in switched) < int(self.public_key[0]).bit_length())
+        with self.assertRaises(ValueError):
+            switching_key(self.private_key, 1000, self.security_parameter)
+        with self.assertRaises(ValueError):
+            switching_key(self.private_key, 2000, self.security_parameter, new_int_size=2000)
+
+    def test_too_small(self):
+        with self.assertRaises(ValueError):
+            switching_key(self.private_key, 2000, self.security_parameter, new_private_key_length=20)
+
+    def test_insecure(self):
+        with self.assertRaises(ValueError):
+            switching_key(self.private_key, 2000, self.security_parameter, noise_size=8)
+        with self.assertRaises(ValueError):
+            switching_key(self.private_key, 2000, self.security_parameter, new_int_size=128)
+        with self.assertRaises(ValueError):
+            switching_key(self.private_key, 2000, self.security_parameter, hint_count=16, hint_weight=4)
+        with self.assertRaises(ValueError):
+            switching_key(self.private_key, 2000, 64, new_private_key_length=64, new_int_size=128, noise_size=16,
+                          hint_count=64, hint_weight=8)
+
+
+if __name__ == '__main__':
+    unittest.main()
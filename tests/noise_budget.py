@@ -0,0 +1,39 @@
+import unittest
+from src.noise_budget import *
+
+
+class Budget(unittest.TestCase):
+    def test_remaining(self):
+        budget = NoiseBudget(100, 20)
+        self.assertTrue(budget.max_noise_bits == 98)
+        self.assertTrue(budget.remaining(90) == 8)
+        self.assertTrue(budget.remaining(100) == -2)
+
+    def test_fresh(self):
+        self.assertTrue(NoiseBudget(100, 20).fresh(15, 4) == 27)
+        self.assertTrue(NoiseBudget(100, 20).fresh(15, 30) == 33)
+
+    def test_reduced(self):
+        self.assertTrue(NoiseBudget(100, 20, error_free=True).reduced(30, 1300, 600) == 30)
+        self.assertTrue(NoiseBudget(100, 20).reduced(30, 604, 600) == 31)
+        self.assertTrue(NoiseBudget(100, 20).reduced(30, 1300, 600) == 722)
+
+    def test_check(self):
+        NoiseBudget(100, 20, on_exceeded='raise').check(98, 'addition')
+        NoiseBudget(100, 20).check(200, 'addition')
+        with self.assertRaises(ValueError):
+            NoiseBudget(100, 20, on_exceeded='raise').check(99, 'addition')
+        with self.assertWarns(RuntimeWarning):
+            NoiseBudget(100, 20, on_exceeded='warn').check(99, 'addition')
+
+    def test_unknown_on_exceeded(self):
+        with self.assertRaises(ValueError):
+            NoiseBudget(100, 20, on_exceeded='ignore')
+
+    def test_private_key_noise_bits(self):
+        self.assertTrue(private_key_noise_bits(2 ** 60 + 1) == 31)
+        self.assertTrue(private_key_noise_bits(2 ** 60 - 1) == 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from src.parallel import *
+from src.somewhat_homomorphic_encryption import key, randint, encrypt_batch, decrypt_batch
+from src.integer_arithmetic import compiled_circuit
+from src.noise_budget import NoiseBudget
+
+
+class Pack(unittest.TestCase):
+
+    def test_big_integers(self):
+        values = np.array([[2 ** 200 + 7, 3], [0, 2 ** 64]], dtype=object)
+        packed = pack(values)
+        self.assertTrue(packed[1].dtype == np.uint64)
+        self.assertTrue(np.array_equal(values, unpack(packed)))
+
+    def test_native(self):
+        values = np.arange(12, dtype=np.int64).reshape(3, 4)
+        self.assertTrue(unpack(pack(values)) is values)
+
+
+class Parallel(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.secondary_noise_size = 2
+        self.width = 8
+        self.private_key, self.public_key = key(60, 8, 200, 1)
+        self.plaintexts = [randint(0, 2 ** self.width) for _ in range(21)]
+
+    def tearDown(self) -> None:
+        randomness.seed(None)
+
+    def test_encrypt_decrypt(self):
+        with ParallelExecutor(2, self.public_key, self.secondary_noise_size) as executor:
+            ciphertexts = executor.encrypt_batch(self.plaintexts, self.width)
+            self.assertTrue(ciphertexts.shape == (len(self.plaintexts), self.width))
+            self.assertEqual(self.plaintexts, list(decrypt_batch(ciphertexts, self.private_key)))
+            self.assertEqual(self.plaintexts, list(executor.decrypt_batch(ciphertexts, self.private_key)))
+
+            stats = executor.stats()
+            self.assertTrue(sum(worker['items'] for worker in stats.values()) == 2 * len(self.plaintexts))
+            self.assertTrue(all(worker['items_per_second'] > 0 for worker in stats.values()))
+
+    def test_same_as_serial(self):
+        plaintexts = [randint(0, 2 ** self.width) for _ in range(2 * ENCRYPTION_CHUNK_SIZE + 5)]
+        for chunk_size in [None, 4]:
+            results = []
+            for workers in [1, 2, 3]:
+                randomness.seed(99)
+                with ParallelExecutor(workers, self.public_key, self.secondary_noise_size,
+                                      chunk_size=chunk_size) as executor:
+                    results.append(executor.encrypt_batch(plaintexts, self.width))
+            self.assertTrue(np.array_equal(results[0], results[1]))
+            self.assertTrue(np.array_equal(results[0], results[2]))
+
+    def test_global_source_untouched(self):
+        sources = []
+
+        class RecordingTable(SubsetSumTable):
+            def sample(self, num: int, source=None) -> np.ndarray:
+                sources.append(randomness.get_source())
+                return super().sample(num, source)
+
+        source = randomness.SeededRandomSource(7)
+        randomness.set_source(source)
+        table = RecordingTable(self.public_key[1:])
+        with ParallelExecutor(1, self.public_key, self.secondary_noise_size, table, chunk_size=4) as executor:
+            ciphertexts = executor.encrypt_batch(self.plaintexts, self.width)
+        self.assertEqual(self.plaintexts, list(decrypt_batch(ciphertexts, self.private_key)))
+        # Other threads keep drawing from the current source while chunks are encrypted with their own streams.
+        self.assertEqual(6, len(sources))
+        self.assertTrue(all(current is source for current in sources))
+
+    def test_signed_native(self):
+        private_key, public_key = key(10, 6, 24, 1)
+        plaintexts = [randint(-8, 8) for _ in range(10)]
+        with ParallelExecutor(2, public_key, 1) as executor:
+            ciphertexts = executor.encrypt_batch(plaintexts, 4, signed=True)
+            self.assertTrue(ciphertexts.dtype == np.int64)
+            self.assertEqual(plaintexts, list(executor.decrypt_batch(ciphertexts, private_key, signed=True)))
+
+    def test_evaluate(self):
+        circuit = compiled_circuit('add', self.width)
+        b = [randint(0, 2 ** self.width) for _ in self.plaintexts]
+        inputs = {'a': Ciphertext(encrypt_batch(self.plaintexts, self.public_key, self.secondary_noise_size,
+                                                self.width), self.public_key[0]),
+                  'b': Ciphertext(encrypt_batch(b, self.public_key, self.secondary_noise_size, self.width),
+                                  self.public_key[0])}
+
+        with ParallelExecutor(2) as executor:
+            result = executor.evaluate(circuit, inputs)['result']
+        serial = circuit.evaluate(inputs)['result']
+        self.assertTrue(np.array_equal(serial.values, result.values))
+        self.assertEqual([(x + y) % 2 ** self.width for x, y in zip(self.plaintexts, b)],
+                         list(result.decrypt(self.private_key)))
+
+    def test_evaluate_noise(self):
+        circuit = compiled_circuit('multiply', self.width)
+        budget = NoiseBudget(1000, 20)
+        inputs = {name: Ciphertext.encrypt_batch(self.plaintexts, self.public_key, self.secondary_noise_size,
+                                                 self.width, budget=budget)
+                  for name in 'ab'}
+
+        with ParallelExecutor(2) as executor:
+            result = executor.evaluate(circuit, inputs)['result']
+        serial = circuit.evaluate(inputs)['result']
+        self.assertTrue(result.budget is not None)
+        self.assertTrue(result.noise_bits == serial.noise_bits > inputs['a'].noise_bits)
+
+
+if __name__ == '__main__':
+    unittest.main()
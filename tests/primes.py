@@ -0,0 +1,89 @@
+import unittest
+from src.primes import *
+from src.primes import _cache
+
+
+def naive_is_prime(n: int) -> bool:
+    return n >= 2 and all(n % d != 0 for d in range(2, int(n ** 0.5) + 1))
+
+
+class Sieve(unittest.TestCase):
+
+    def test_sieve(self):
+        self.assertEqual([n for n in range(1000) if naive_is_prime(n)], list(sieve(1000)))
+
+    def test_small_primes(self):
+        self.assertEqual(6542, len(SMALL_PRIMES))
+        self.assertEqual(65521, SMALL_PRIMES[-1])
+
+    def test_residues(self):
+        n = 2 ** 1000 + 12345
+        self.assertEqual([n % int(q) for q in SMALL_PRIMES], list(residues(n)))
+        self.assertEqual([0] * 10, list(residues(0, SMALL_PRIMES[:10])))
+
+
+class IsProbablePrime(unittest.TestCase):
+
+    def test_small(self):
+        for n in range(-3, 2000):
+            self.assertEqual(naive_is_prime(n), is_probable_prime(n))
+
+    def test_large(self):
+        self.assertTrue(is_probable_prime(2 ** 127 - 1))
+        self.assertTrue(is_probable_prime(2 ** 521 - 1))
+        self.assertFalse(is_probable_prime((2 ** 127 - 1) * (2 ** 89 - 1)))
+        self.assertFalse(is_probable_prime(2 ** 521 + 1))
+
+    def test_carmichael(self):
+        for n in [561, 41041, 825265, 321197185, 5394826801]:
+            self.assertFalse(miller_rabin(n))
+
+
+class Primes(unittest.TestCase):
+
+    def setUp(self) -> None:
+        clear_cache()
+
+    def test_primes(self):
+        for num_bits in [17, 64, 256]:
+            generated = primes(num_bits, 10)
+            self.assertEqual(10, len(set(generated)))
+            for p in generated:
+                self.assertEqual(num_bits, p.bit_length())
+                self.assertTrue(is_probable_prime(p))
+
+    def test_small_bits(self):
+        self.assertEqual([5, 7], sorted(primes(3, 2)))
+        generated = primes(10, 5)
+        self.assertEqual(5, len(set(generated)))
+        self.assertTrue(all(512 <= p < 1024 and naive_is_prime(p) for p in generated))
+        with self.assertRaises(ValueError):
+            primes(3, 3)
+
+    def test_cache(self):
+        first = primes(128, 1)
+        cached = list(_cache[128])
+        self.assertTrue(len(cached) > 0)
+        self.assertEqual(cached[:1], primes(128, 1))
+        self.assertNotIn(first[0], _cache[128])
+        clear_cache()
+        self.assertEqual({}, _cache)
+
+    def test_independent(self):
+        generated = primes(128, 3, independent=True)
+        self.assertEqual(3, len(set(generated)))
+        self.assertNotIn(128, _cache)
+
+    def test_prime_in_range(self):
+        for i in range(20):
+            p = prime_in_range(2 ** 100, 2 ** 100 + 2 ** 20)
+            self.assertTrue(2 ** 100 <= p < 2 ** 100 + 2 ** 20 and is_probable_prime(p))
+        self.assertEqual(7, prime_in_range(7, 8))
+        self.assertIn(prime_in_range(4, 8), [5, 7])
+
+    def test_prime(self):
+        self.assertTrue(is_probable_prime(prime(100)))
+
+
+if __name__ == '__main__':
+    unittest.main()
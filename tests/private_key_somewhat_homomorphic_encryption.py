@@ -116,6 +116,21 @@ class Int2BinaryArray(unittest.TestCase):
         self.assertTrue(np.allclose(expected_array, actual_array))
 
 
+class BinaryMatrix(unittest.TestCase):
+    def test_int2binary_matrix(self):
+        integers = [47, 0, 1]
+        expected_matrix = np.array([[1, 0, 1, 1, 1, 1],
+                                    [0, 0, 0, 0, 0, 0],
+                                    [0, 0, 0, 0, 0, 1]])
+        actual_matrix = int2binary_matrix(integers, 6)
+        self.assertTrue(np.array_equal(expected_matrix, actual_matrix))
+
+    def test_round_trip_large(self):
+        width = 300
+        integers = [randint(0, 2 ** width) for _ in range(20)]
+        self.assertEqual(integers, list(binary_matrix2int(int2binary_matrix(integers, width))))
+
+
 class KeyMultiple(unittest.TestCase):
 
     def test_single_int(self):
@@ -220,6 +235,84 @@ class EncryptDecryptCorrectness(unittest.TestCase):
             self.assertTrue(plaintext == decrypted)
 
 
+class EncryptDecryptFixedWidth(unittest.TestCase):
+
+    def test_length(self):
+        k = key(80)
+        self.assertTrue(encrypt(1, k, 80, width=16).shape == (16,))
+        self.assertTrue(encrypt(2 ** 15, k, 80, width=16).shape == (16,))
+
+    def test_signed(self):
+        k = key(80)
+        for plaintext in [-300, -1, 0, 299]:
+            ciphertext = encrypt(plaintext, k, 80, width=10, signed=True)
+            self.assertEqual(plaintext, decrypt(ciphertext, k, signed=True))
+
+
+class NativeCiphertexts(unittest.TestCase):
+
+    def test_small_parameters_native(self):
+        k = key(12)
+        self.assertTrue(encrypt(45, k, 10).dtype == np.int64)
+        self.assertTrue(encrypt_batch([45, 3], k, 10, 6).dtype == np.int64)
+
+    def test_large_parameters_bigint(self):
+        k = key(20)
+        self.assertTrue(encrypt(45, k, 11).dtype == object)
+
+    def test_correctness(self):
+        trials = 1000
+
+        for _ in range(trials):
+            m0 = randint(0, 2 ** 16)
+            m1 = randint(0, 2 ** 16)
+            k = key(randint(8, 16))
+            q_num_bits = randint(1, 31 - k.bit_length())
+            c0 = encrypt(m0, k, q_num_bits, width=16)
+            c1 = encrypt(m1, k, q_num_bits, width=16)
+            self.assertEqual(m0, decrypt(c0, k))
+            self.assertEqual(m0 ^ m1, decrypt(c0 + c1, k))
+            self.assertEqual(m0 & m1, decrypt(c0 * c1, k))
+
+
+class EncryptDecryptBatch(unittest.TestCase):
+
+    def test_shape(self):
+        width = 9
+        plaintexts = [3, 0, 511, 17]
+        k = key(70)
+        ciphertexts = encrypt_batch(plaintexts, k, 80, width)
+        self.assertTrue(ciphertexts.shape == (len(plaintexts), width))
+
+    def test_general(self):
+        trials = 100
+        width = 128
+
+        for _ in range(trials):
+            plaintexts = [randint(0, 2 ** width) for _ in range(10)]
+            q_num_bits = randint(64, 128)
+            key_num_bits = randint(64, 128)
+
+            k = key(key_num_bits)
+            ciphertexts = encrypt_batch(plaintexts, k, q_num_bits, width)
+            decrypted = decrypt_batch(ciphertexts, k)
+
+            self.assertEqual(plaintexts, list(decrypted))
+
+    def test_signed(self):
+        width = 32
+        plaintexts = [-(2 ** 31), -1, 0, 2 ** 31 - 1]
+        k = key(80)
+        ciphertexts = encrypt_batch(plaintexts, k, 80, width, signed=True)
+        self.assertEqual(plaintexts, list(decrypt_batch(ciphertexts, k, signed=True)))
+
+    def test_matches_single(self):
+        plaintext = 0b101101
+        k = key(90)
+        ciphertexts = encrypt_batch([plaintext], k, 90, 6)
+        self.assertEqual(plaintext, decrypt(ciphertexts[0], k))
+
+
 class HomomorphicDecryptionCorrectness(unittest.TestCase):
 
     def test_addition_single_00(self):
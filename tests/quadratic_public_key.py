@@ -0,0 +1,60 @@
+import unittest
+from src.quadratic_public_key import *
+from src.somewhat_homomorphic_encryption import decrypt, decrypt_batch
+from src import primes, somewhat_homomorphic_encryption
+
+
+class QuadraticKey(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.private_key, self.public_key = key(60, 8, 300, 3)
+
+    def test_integers(self):
+        self.assertEqual(17, len(self.public_key))
+        self.assertEqual(64, self.public_key.num_products)
+        self.assertTrue(self.public_key.x0 % self.private_key == 0)
+        self.assertTrue(2 ** 299 <= self.public_key.x0 < 2 ** 300)
+        self.assertTrue(np.all(primes.residues(self.public_key.x0 // self.private_key) != 0))
+        self.assertTrue(np.all(self.public_key.first % self.private_key < 2 ** 3))
+        self.assertTrue(np.all(self.public_key.second % self.private_key < 2 ** 3))
+
+    def test_expand(self):
+        expanded = self.public_key.expand()
+        self.assertTrue(expanded.shape == (65,))
+        self.assertTrue(expanded[0] == self.public_key.x0)
+        self.assertTrue(expanded[1 + 8 * 2 + 5] == self.public_key.first[2] * self.public_key.second[5])
+        ciphertext = somewhat_homomorphic_encryption.encrypt(5, expanded, 2)
+        self.assertTrue(decrypt(ciphertext, self.private_key) == 5)
+
+    def test_too_small(self):
+        with self.assertRaises(ValueError):
+            quadratic_public_key(4, 20, 2, private_key(30))
+
+
+class EncryptDecrypt(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.secondary_noise_size = 2
+        self.private_key, self.public_key = key(60, 8, 300, 3)
+
+    def test_encrypt(self):
+        for i in range(20):
+            plaintext = randint(0, 2 ** 10)
+            ciphertext = encrypt(plaintext, self.public_key, self.secondary_noise_size)
+            self.assertTrue(np.all(ciphertext < self.public_key.x0))
+            self.assertTrue(decrypt(ciphertext, self.private_key) == plaintext)
+
+    def test_encrypt_batch(self):
+        plaintexts = [randint(-128, 128) for _ in range(10)]
+        ciphertexts = encrypt_batch(plaintexts, self.public_key, self.secondary_noise_size, 8, signed=True)
+        self.assertEqual(plaintexts, list(decrypt_batch(ciphertexts, self.private_key, signed=True)))
+
+    def test_homomorphic(self):
+        a = encrypt(1, self.public_key, self.secondary_noise_size, width=1)
+        b = encrypt(1, self.public_key, self.secondary_noise_size, width=1)
+        self.assertTrue(decrypt(a * b % self.public_key.x0, self.private_key) == 1)
+        self.assertTrue(decrypt((a + b) % self.public_key.x0, self.private_key) == 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from src.randomness import *
+
+
+class RandBelow(unittest.TestCase):
+    def test_range(self):
+        source = SystemRandomSource()
+        bound = 2 ** 200 + 12345
+        integers = source.randbelow(bound, 1000)
+        self.assertTrue(len(integers) == 1000)
+        self.assertTrue(all(0 <= integer < bound for integer in integers))
+
+    def test_small_bound(self):
+        source = SystemRandomSource()
+        integers = source.randbelow(3, 3000)
+        self.assertEqual({0, 1, 2}, set(integers))
+
+    def test_empty_range(self):
+        with self.assertRaises(ValueError):
+            SystemRandomSource().randbelow(0, 1)
+
+
+class RandRange(unittest.TestCase):
+    def test_single_int_type(self):
+        self.assertTrue(type(randrange(7, 18)) is int)
+
+    def test_multiple_int_type(self):
+        array = randrange(13, 19, length=4)
+        self.assertTrue(array.shape == (4,))
+        self.assertTrue(type(array[2]) is int)
+
+    def test_odd(self):
+        array = randrange(2 ** 99 + 1, 2 ** 100, step=2, length=1000)
+        self.assertTrue(np.all(array % 2 == 1))
+        self.assertTrue(np.all(2 ** 99 < array))
+        self.assertTrue(np.all(array < 2 ** 100))
+
+    def test_step(self):
+        array = randrange(-5, 20, step=5, length=1000)
+        self.assertEqual({-5, 0, 5, 10, 15}, set(array))
+
+    def test_empty_range(self):
+        with self.assertRaises(ValueError):
+            randrange(5, 5)
+
+    def test_native(self):
+        array = randrange(3, 2 ** 31, step=2, length=1000, dtype=np.int64)
+        self.assertTrue(array.dtype == np.int64)
+        self.assertTrue(np.all(array % 2 == 1))
+        self.assertTrue(np.all(3 <= array))
+        self.assertTrue(np.all(array < 2 ** 31))
+
+    def test_native_small_bound(self):
+        array = randrange(0, 3, length=3000, dtype=np.int64)
+        self.assertEqual({0, 1, 2}, set(array.tolist()))
+
+
+class Seeded(unittest.TestCase):
+    def tearDown(self) -> None:
+        seed(None)
+
+    def test_reproducible(self):
+        seed(2024)
+        first = randrange(0, 2 ** 300, length=10), random_bits((3, 7))
+        seed(2024)
+        second = randrange(0, 2 ** 300, length=10), random_bits((3, 7))
+        self.assertTrue(np.array_equal(first[0], second[0]))
+        self.assertTrue(np.array_equal(first[1], second[1]))
+
+    def test_different_seeds(self):
+        self.assertNotEqual(SeededRandomSource(1).randbelow(2 ** 128, 1), SeededRandomSource(2).randbelow(2 ** 128, 1))
+
+    def test_spawn(self):
+        source = SeededRandomSource(7)
+        child = source.spawn(1, 2).randbytes(16)
+        source.randbytes(100)
+        self.assertEqual(child, source.spawn(1, 2).randbytes(16))
+        self.assertNotEqual(child, source.spawn(2, 1).randbytes(16))
+        self.assertNotEqual(child, source.spawn(1).randbytes(16))
+        self.assertNotEqual(child, SeededRandomSource(8).spawn(1, 2).randbytes(16))
+
+    def test_explicit_source(self):
+        seed(2024)
+        drawn = (randrange(0, 2 ** 300, length=10, source=SeededRandomSource(5)),
+                 random_bits((3, 7), SeededRandomSource(5)))
+        self.assertTrue(np.array_equal(SeededRandomSource(5).randrange(0, 2 ** 300, length=10), drawn[0]))
+        self.assertTrue(np.array_equal(SeededRandomSource(5).bits((3, 7)), drawn[1]))
+        self.assertTrue(get_source()._counter == 0)
+
+    def test_system_after_reset(self):
+        seed(5)
+        seed(None)
+        self.assertTrue(isinstance(get_source(), SystemRandomSource))
+
+
+class RandomBits(unittest.TestCase):
+    def test_simple(self):
+        bits = random_bits((50, 13))
+        self.assertTrue(bits.shape == (50, 13))
+        self.assertEqual({0, 1}, set(np.unique(bits)))
+
+
+if __name__ == '__main__':
+    unittest.main()
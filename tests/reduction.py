@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+from src.reduction import *
+from src.somewhat_homomorphic_encryption import randint
+
+
+class Barrett(unittest.TestCase):
+    def test_barrett(self):
+        for modulus_bits, num_bits in [(2, 4), (61, 61), (64, 100), (200, 400), (1000, 1010), (1000, 2128)]:
+            modulus = randint(2 ** (modulus_bits - 1), 2 ** modulus_bits)
+            values = backend.asarray(randint(0, 2 ** num_bits, length=200))
+            values[:3] = [0, modulus - 1, 2 ** num_bits - 1]
+            reducer_ = BarrettReducer(modulus)
+            self.assertTrue(np.array_equal(reducer_.barrett(values, num_bits), values % modulus))
+
+    def test_reciprocal(self):
+        reducer_ = BarrettReducer(1000)
+        self.assertTrue(reducer_.reciprocal(20) == 2 ** 20 // 1000)
+        self.assertTrue(reducer_.reciprocal(20) is reducer_.reciprocal(20))
+
+    def test_uses_barrett(self):
+        min_bits = MIN_BITS[backend.get_backend()]
+        if min_bits is None:
+            self.assertFalse(BarrettReducer(2 ** 65535 + 1).uses_barrett(2 ** 17))
+            return
+        self.assertFalse(BarrettReducer(2 ** (min_bits - 2) + 1).uses_barrett(2 * min_bits))
+        reducer_ = BarrettReducer(2 ** (min_bits - 1) + 1)
+        self.assertTrue(reducer_.uses_barrett(2 * min_bits))
+        self.assertFalse(reducer_.uses_barrett(min_bits + 16))
+        self.assertFalse(reducer_.uses_barrett(2 * min_bits + SLACK_BITS + 1))
+
+
+class Reduce(unittest.TestCase):
+    def test_large(self):
+        num_bits = MIN_BITS['python']
+        modulus = randint(2 ** (num_bits - 1), 2 ** num_bits)
+        values = backend.asarray(randint(0, 2 ** (2 * num_bits), length=4))
+        reducer_ = reducer(modulus)
+        self.assertTrue(np.array_equal(reducer_.reduce(values), values % modulus))
+        self.assertTrue(np.array_equal(reducer_.reduce(values, 2 * num_bits), values % modulus))
+        self.assertTrue(reducer_.reduce(values[0]) == values[0] % modulus)
+        self.assertTrue(np.array_equal(reducer_.reduce(-values), -values % modulus))
+
+    def test_small(self):
+        values = randint(0, 2 ** 20, length=10, dtype=np.int64)
+        result = reducer(1009).reduce(values)
+        self.assertTrue(result.dtype == np.int64)
+        self.assertTrue(np.array_equal(result, values % 1009))
+        self.assertTrue(reducer(1009).reduce(-5) == 1004)
+
+    def test_centered(self):
+        reducer_ = reducer(1009)
+        values = np.array([0, 504, 505, 1008, 1009 * 7 - 3, -3])
+        self.assertEqual([0, 504, -504, -1, -3, -3], list(reducer_.centered(values)))
+        self.assertTrue(reducer_.centered(1008) == -1)
+        self.assertTrue(reducer(2 ** 100 + 1).centered(backend.asarray([2 ** 100, 5]))[0] == -1)
+
+    def test_reducer(self):
+        self.assertTrue(reducer(1009) is reducer(1009))
+        self.assertTrue(reducer(1009) is not reducer(1013))
+
+
+class Benchmark(unittest.TestCase):
+    def test_fields(self):
+        report = benchmark([64, 256], num=4, repeat=1)
+        self.assertEqual([64, 256], list(report))
+        self.assertEqual(['product', 'sum'], list(report[64]))
+        self.assertEqual({'modulo_seconds', 'barrett_seconds', 'speedup'}, set(report[256]['sum']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import os
+import tempfile
+from src.serialization import *
+from src.somewhat_homomorphic_encryption import key, randint, encrypt_batch, decrypt_batch
+from src.ciphertext_array import from_ciphertext
+
+
+class SerializationTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'integers.bin')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+
+class Keys(SerializationTest):
+
+    def test_private_key(self):
+        private_key, _ = key(100, 4, 300, 1)
+        save_private_key(self.path, private_key, private_key_length=100)
+        self.assertTrue(load_private_key(self.path) == private_key)
+        self.assertEqual({'private_key_length': 100}, load(self.path).parameters)
+
+    def test_public_key(self):
+        _, public_key = key(100, 10, 300, 1)
+        save_public_key(self.path, public_key, public_key_bits=300)
+
+        stored = load_public_key(self.path)
+        self.assertTrue(isinstance(stored, StoredIntegers))
+        self.assertTrue(isinstance(stored.limbs, np.memmap))
+        self.assertTrue(stored.shape == (10,))
+        self.assertTrue(stored[0] == public_key[0])
+        self.assertTrue(np.array_equal(public_key[2:5], stored[2:5]))
+        self.assertTrue(np.array_equal(public_key, load_public_key(self.path, mmap=False)))
+
+    def test_native_public_key(self):
+        _, public_key = key(10, 6, 24, 1)
+        save_public_key(self.path, public_key)
+        loaded = load_public_key(self.path, mmap=False)
+        self.assertTrue(loaded.dtype == np.int64)
+        self.assertTrue(np.array_equal(public_key, loaded))
+
+
+class Ciphertexts(SerializationTest):
+
+    def test_batch(self):
+        private_key, public_key = key(60, 8, 200, 1)
+        plaintexts = [randint(0, 2 ** 8) for _ in range(10)]
+        ciphertexts = encrypt_batch(plaintexts, public_key, 2, 8)
+        save_ciphertexts(self.path, ciphertexts, width=8)
+
+        stored = load_ciphertexts(self.path)
+        self.assertTrue(stored.shape == (10, 8))
+        self.assertTrue(stored.parameters['width'] == 8)
+        self.assertEqual(plaintexts[3:6], list(decrypt_batch(stored[3:6], private_key)))
+        self.assertEqual(plaintexts, list(decrypt_batch(load_ciphertexts(self.path, mmap=False), private_key)))
+
+    def test_ciphertext_array(self):
+        integers = [2 ** 130 + 5, 0, 2 ** 64]
+        save_ciphertexts(self.path, from_ciphertext(np.array(integers, dtype=object)))
+        array = load_ciphertexts(self.path).array()
+        self.assertEqual(integers, list(array.to_ints()))
+        self.assertEqual([1, 0, 0], list(array.mod2()))
+
+    def test_layout(self):
+        save_ciphertexts(self.path, np.array([1, 2 ** 64 + 3], dtype=object))
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        self.assertTrue(data[:4] == MAGIC)
+        self.assertTrue(int.from_bytes(data[4:6], 'little') == FORMAT_VERSION)
+        self.assertTrue((len(data) - 32) % ALIGNMENT == 0)
+        self.assertEqual([1, 0, 3, 1], list(np.frombuffer(data[-32:], dtype='<u8')))
+
+
+class Errors(SerializationTest):
+
+    def test_negative(self):
+        with self.assertRaises(ValueError):
+            save_ciphertexts(self.path, np.array([-1, 2], dtype=object))
+
+    def test_not_a_file_of_integers(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'\x80\x04 pickled')
+        with self.assertRaises(ValueError):
+            load(self.path)
+
+    def test_version(self):
+        save_ciphertexts(self.path, np.array([1], dtype=object))
+        with open(self.path, 'r+b') as file:
+            file.seek(4)
+            file.write((FORMAT_VERSION + 1).to_bytes(2, 'little'))
+        with self.assertRaises(ValueError):
+            load(self.path)
+
+    def test_kind(self):
+        save_ciphertexts(self.path, np.array([1], dtype=object))
+        with self.assertRaises(ValueError):
+            load_public_key(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 from src.somewhat_homomorphic_encryption import *
+from src import primes
 
 
 class RandInt(unittest.TestCase):
@@ -122,6 +123,15 @@ class SelectedSum(unittest.TestCase):
 
         self.assertTrue(np.all(np.any(sums[:, None] == possibilities, axis=1)))
 
+    def test_table(self):
+        numbers = np.array([25, 13])
+        num = 1000
+
+        possibilities = [0, 13, 25, 38]
+        sums = selected_sum(numbers, num, SubsetSumTable(numbers))
+
+        self.assertTrue(np.all(np.any(sums[:, None] == possibilities, axis=1)))
+
 
 class MoveMax(unittest.TestCase):
     def test_simple(self):
@@ -149,6 +159,13 @@ class Int2BinaryArray(unittest.TestCase):
         self.assertTrue(np.allclose(expected_array, actual_array))
 
 
+class BinaryMatrix(unittest.TestCase):
+    def test_round_trip(self):
+        width = 70
+        integers = [randint(0, 2 ** width) for _ in range(20)]
+        self.assertEqual(integers, list(binary_matrix2int(int2binary_matrix(integers, width))))
+
+
 class PrivateKey(unittest.TestCase):
     def test_simple(self):
         trials = 1000
@@ -201,6 +218,144 @@ class PublicKey(unittest.TestCase):
             self.assertTrue((key[0] % private_key) % 2 == 0)
 
 
+class SamplePublicKey(unittest.TestCase):
+    def test_large(self):
+        private_key_length = 100
+        int_size = 1000
+        size = 50
+        noise_size = 20
+        trials = 20
+
+        for i in range(trials):
+            k = private_key(private_key_length)
+            key, attempts = public_key(size, int_size, noise_size, k, return_attempts=True)
+            self.assertTrue(key.shape == (size,))
+            self.assertTrue(attempts >= 1)
+            self.assertTrue(np.all(key[0] >= key))
+            self.assertTrue(key[0] % 2 == 1)
+            self.assertTrue((key[0] % k) % 2 == 0)
+            self.assertTrue(np.all(key % k < 2 ** noise_size))
+            self.assertTrue(np.all(key < 2 ** int_size + 2 ** noise_size))
+
+    def test_distribution_of_max(self):
+        # With q from [0, 2^64 + 2) almost surely distinct, the largest of two integers is valid when its q is odd
+        # and its noise even. The other integer is unconditioned, so its q is odd about half of the time.
+        trials = 2000
+        k = 7
+        odd = 0
+
+        for i in range(trials):
+            key = sample_public_key(2, 2 ** 64 + 2, 0, 4, k, lambda k0: k0 % 2 == 1 and (k0 % k) % 2 == 0)[0]
+            self.assertTrue(key[0] > key[1])
+            self.assertTrue((key[0] // k) % 2 == 1)
+            odd += (key[1] // k) % 2
+
+        self.assertTrue(0.4 < odd / trials < 0.6)
+
+    def test_too_few_bits(self):
+        with self.assertRaises(ValueError):
+            public_key(4, 20, 2, private_key(20))
+
+
+class ErrorFreePublicKey(unittest.TestCase):
+    def test_x0(self):
+        for int_size, factor_bits in [(120, None), (121, None), (400, None), (1000, None), (1000, 64)]:
+            k = private_key(60)
+            x0 = error_free_x0(int_size, k, factor_bits)
+            self.assertTrue(x0.bit_length() == int_size)
+            self.assertTrue(x0 % k == 0)
+            self.assertTrue(np.all(primes.residues(x0 // k) != 0))
+
+    def test_q0(self):
+        multiple = private_key(60) * private_key(60)
+        q0 = error_free_q0(500, multiple, 60)
+        self.assertTrue((multiple * q0).bit_length() == 500)
+        self.assertTrue(np.all(primes.residues(q0) != 0))
+        with self.assertRaises(ValueError):
+            error_free_q0(178, multiple, 60)
+
+    def test_too_few_bits(self):
+        with self.assertRaises(ValueError):
+            error_free_x0(119, private_key(60))
+
+    def test_small_factors(self):
+        with self.assertRaises(ValueError):
+            error_free_x0(1000, private_key(60), factor_bits=59)
+        with self.assertRaises(ValueError):
+            public_key(10, 1000, 4, private_key(60), error_free=True, factor_bits=32)
+
+    def test_factors_not_cached(self):
+        primes.clear_cache()
+        error_free_x0(1000, private_key(60))
+        self.assertTrue(not primes._cache.get(60))
+
+    def test_public_key(self):
+        k = private_key(60)
+        key, attempts = public_key(30, 400, 4, k, return_attempts=True, error_free=True)
+        self.assertTrue(attempts == 1)
+        self.assertTrue(key.shape == (30,))
+        self.assertTrue(key[0] % k == 0)
+        self.assertTrue(np.all(key[0] > key[1:]))
+        self.assertTrue(np.all(key % k < 2 ** 4))
+
+    def test_native(self):
+        k, key_ = key(8, 10, 24, 2, error_free=True)
+        self.assertTrue(key_.dtype == np.int64)
+        self.assertTrue(key_[0] % k == 0)
+        for plaintext in range(16):
+            self.assertTrue(decrypt(encrypt(plaintext, key_, 1), k) == plaintext)
+
+    def test_reduce_products(self):
+        k, key_ = key(100, 20, 600, 1, error_free=True)
+        a, b = encrypt(0b1100, key_, 2, width=4), encrypt(0b1010, key_, 2, width=4)
+        product = a * b
+        self.assertTrue(decrypt(product % key_[0], k) == 0b1000)
+        self.assertTrue(decrypt((product * b) % key_[0], k) == 0b1000)
+
+
+class ParallelKey(unittest.TestCase):
+    def tearDown(self) -> None:
+        randomness.seed(None)
+
+    def test_same_key_for_any_number_of_workers(self):
+        keys = []
+        for workers in [1, 2, 3]:
+            randomness.seed(2024)
+            keys.append(key(100, 30, 1000, 20, workers=workers))
+
+        for k, public in keys[1:]:
+            self.assertTrue(k == keys[0][0])
+            self.assertTrue(np.array_equal(public, keys[0][1]))
+
+    def test_error_free(self):
+        keys = []
+        for workers in [1, 3]:
+            randomness.seed(2024)
+            keys.append(key(100, 30, 1000, 20, workers=workers, error_free=True))
+        self.assertTrue(keys[0][0] == keys[1][0])
+        self.assertTrue(np.array_equal(keys[0][1], keys[1][1]))
+        k, public = keys[0]
+        self.assertTrue(public[0] % k == 0)
+        self.assertTrue(np.all(public[1:] < public[0]))
+        self.assertTrue(np.all(public % k < 2 ** 20))
+
+    def test_valid(self):
+        for private_key_length, public_key_bits, primary_noise_size in [(100, 1000, 20), (20, 25, 2)]:
+            k, public = key(private_key_length, 10, public_key_bits, primary_noise_size, workers=2)
+            _, attempts = public_key(10, public_key_bits, primary_noise_size, k, return_attempts=True, workers=2)
+            self.assertTrue(public.shape == (10,))
+            self.assertTrue(attempts >= 1)
+            self.assertTrue(np.all(public[0] >= public))
+            self.assertTrue(public[0] % 2 == 1)
+            self.assertTrue((public[0] % k) % 2 == 0)
+            self.assertTrue(np.all(public % k < 2 ** primary_noise_size))
+
+    def test_native(self):
+        k, public = key(10, 4, 20, 1, workers=2)
+        self.assertTrue(public.dtype == np.int64)
+        self.assertTrue(decrypt(encrypt(5, public, 1), k) == 5)
+
+
 class EncryptDecrypt(unittest.TestCase):
 
     def setUp(self) -> None:
@@ -214,9 +369,11 @@ class EncryptDecrypt(unittest.TestCase):
         self.trials = 3
 
         self.private_key_length = 20
-        self.public_key_bits = 20
+        # public key integers need more bits than the private key to be odd multiples of it
+        self.public_key_bits = 40
         self.public_key_length = 4
-        self.primary_noise_size = 2
+        # the noise of k0 is even, so 1-bit noise keeps reducing modulo k0 from shifting decryption below 0
+        self.primary_noise_size = 1
         self.secondary_noise_size = 2
 
         self.private_key, self.public_key = key(self.private_key_length,
@@ -263,5 +420,60 @@ class EncryptDecrypt(unittest.TestCase):
             decrypted = decrypt(ciphertext0 * ciphertext1, self.private_key)
             self.assertTrue(decrypted == 0)
 
+class NativeCiphertexts(unittest.TestCase):
+
+    def test_native(self):
+        trials = 100
+
+        for i in range(trials):
+            private_key, public_key = key(10, 6, 24, 1)
+            self.assertTrue(public_key.dtype == np.int64)
+
+            plaintext = randint(0, 2 ** 12)
+            ciphertext = encrypt(plaintext, public_key, 2)
+            self.assertTrue(ciphertext.dtype == np.int64)
+            self.assertEqual(plaintext, decrypt(ciphertext, private_key))
+
+    def test_large_noise_bigint(self):
+        private_key, public_key = key(10, 6, 24, 1)
+        self.assertTrue(ciphertext_dtype(public_key, 100) == object)
+
+
+class EncryptDecryptBatch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.secondary_noise_size = 2
+        # 2-bit primary noise makes x0 noisy, so reducing modulo x0 may leave negative noise, which decryption centers.
+        self.private_key, self.public_key = key(20, 4, 40, 2)
+
+    def test_shape(self):
+        width = 5
+        plaintexts = [0, 31, 9]
+        ciphertexts = encrypt_batch(plaintexts, self.public_key, self.secondary_noise_size, width)
+        self.assertTrue(ciphertexts.shape == (len(plaintexts), width))
+
+    def test_table(self):
+        width = 16
+        table = subset_sum_table(self.public_key, group_size=3)
+
+        for i in range(100):
+            plaintexts = [randint(0, 2 ** width) for _ in range(8)]
+            ciphertexts = encrypt_batch(plaintexts, self.public_key, self.secondary_noise_size, width, table=table)
+            self.assertEqual(plaintexts, list(decrypt_batch(ciphertexts, self.private_key)))
+
+            ciphertext = encrypt(plaintexts[0], self.public_key, self.secondary_noise_size, table=table)
+            self.assertEqual(plaintexts[0], decrypt(ciphertext, self.private_key))
+
+    def test_general(self):
+        width = 16
+        trials = 100
+
+        for i in range(trials):
+            plaintexts = [randint(0, 2 ** width) for _ in range(8)]
+            ciphertexts = encrypt_batch(plaintexts, self.public_key, self.secondary_noise_size, width)
+            decrypted = decrypt_batch(ciphertexts, self.private_key)
+            self.assertEqual(plaintexts, list(decrypted))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import random
+from src.subset_sum import *
+
+
+class Tables(unittest.TestCase):
+    def test_simple(self):
+        table = SubsetSumTable(np.array([25, 13]), group_size=2)
+        self.assertEqual([0, 25, 13, 38], list(table.tables[0]))
+
+    def test_padding(self):
+        table = SubsetSumTable(np.array([1, 2, 4, 8, 16]), group_size=2)
+        self.assertTrue(table.tables.shape == (3, 4))
+        self.assertEqual([0, 16, 0, 16], list(table.tables[2]))
+
+
+class SubsetSum(unittest.TestCase):
+    def test_matches_matmul(self):
+        for group_size in [1, 3, 4, 8]:
+            numbers = np.array([random.randrange(0, 2 ** 200) for _ in range(23)], dtype=object)
+            selection = np.random.randint(0, 2, size=(50, 23))
+            table = SubsetSumTable(numbers, group_size)
+            self.assertTrue(np.all(table.subset_sum(selection) == selection.astype(object) @ numbers))
+
+    def test_native(self):
+        numbers = np.random.randint(0, 2 ** 30, size=10)
+        selection = np.random.randint(0, 2, size=(50, 10))
+        table = SubsetSumTable(numbers)
+        self.assertTrue(table.tables.dtype == np.int64)
+        self.assertTrue(np.array_equal(table.subset_sum(selection), selection @ numbers))
+
+
+class Sample(unittest.TestCase):
+    def test_possibilities(self):
+        numbers = np.array([25, 13, 100])
+        possibilities = [0, 13, 25, 38, 100, 113, 125, 138]
+        sums = SubsetSumTable(numbers, group_size=2).sample(1000)
+
+        self.assertTrue(sums.shape == (1000,))
+        self.assertEqual(set(possibilities), set(sums.tolist()))
+
+
+if __name__ == '__main__':
+    unittest.main()